@@ -0,0 +1,48 @@
+"""add notification coalescing fields
+
+Revision ID: 3f6c2a9d81b4
+Revises: d793da79649c
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3f6c2a9d81b4'
+down_revision = 'd793da79649c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """新增通知合併欄位"""
+    # 合併分組鍵（None 表示不參與合併）
+    op.add_column('notifications', sa.Column('group_key', sa.String(length=100), nullable=True))
+
+    # 合併事件數（現有通知皆視為 1 筆）
+    op.add_column('notifications', sa.Column(
+        'group_count',
+        sa.Integer(),
+        nullable=False,
+        server_default='1'
+    ))
+
+    # 最後一次合併時間
+    op.add_column('notifications', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+
+    # 查詢可合併通知：WHERE user_id = ? AND group_key = ? AND created_at >= ?
+    op.create_index(
+        'idx_notifications_user_group',
+        'notifications',
+        ['user_id', 'group_key', 'created_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """移除通知合併欄位"""
+    op.drop_index('idx_notifications_user_group', table_name='notifications')
+    op.drop_column('notifications', 'updated_at')
+    op.drop_column('notifications', 'group_count')
+    op.drop_column('notifications', 'group_key')
@@ -0,0 +1,41 @@
+"""add photo review claims
+
+Revision ID: 3f8d2c6a1b57
+Revises: e1a7c3f95d04
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '3f8d2c6a1b57'
+down_revision = 'e1a7c3f95d04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """新增照片審核租約欄位與待審核 keyset 部分索引"""
+    op.add_column('photos', sa.Column('review_claimed_by', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('photos', sa.Column('review_claim_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_foreign_key(
+        'fk_photos_review_claimed_by_users', 'photos', 'users',
+        ['review_claimed_by'], ['id'], ondelete='SET NULL'
+    )
+    op.create_index(
+        'idx_photos_pending_created',
+        'photos',
+        ['created_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text("moderation_status = 'PENDING'")
+    )
+
+
+def downgrade() -> None:
+    """移除照片審核租約欄位與索引"""
+    op.drop_index('idx_photos_pending_created', table_name='photos')
+    op.drop_constraint('fk_photos_review_claimed_by_users', 'photos', type_='foreignkey')
+    op.drop_column('photos', 'review_claim_expires_at')
+    op.drop_column('photos', 'review_claimed_by')
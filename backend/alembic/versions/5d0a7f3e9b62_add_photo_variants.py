@@ -0,0 +1,26 @@
+"""add photo variants manifest
+
+Revision ID: 5d0a7f3e9b62
+Revises: c52d9e0f7a13
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '5d0a7f3e9b62'
+down_revision = 'c52d9e0f7a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """新增照片響應式變體清單（既有照片為 NULL，回退使用 url）"""
+    op.add_column('photos', sa.Column('variants', postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    """移除照片響應式變體清單"""
+    op.drop_column('photos', 'variants')
@@ -0,0 +1,56 @@
+"""add moderation rescan jobs
+
+Revision ID: 7b2e9d4c1f36
+Revises: 3f8d2c6a1b57
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '7b2e9d4c1f36'
+down_revision = '3f8d2c6a1b57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """新增敏感詞重新掃描工作表"""
+    op.create_table(
+        'moderation_rescan_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('target', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('word_ids', sa.Text(), nullable=True),
+        sa.Column('since', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('until', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('cursor_sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('cursor_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('scanned_count', sa.BigInteger(), nullable=False),
+        sa.Column('flagged_count', sa.BigInteger(), nullable=False),
+        sa.Column('lease_owner', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_by', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column(
+            'created_at', sa.DateTime(timezone=True),
+            server_default=sa.text('now()'), nullable=False
+        ),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_moderation_rescan_jobs_status'), 'moderation_rescan_jobs', ['status'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """移除敏感詞重新掃描工作表"""
+    op.drop_index(op.f('ix_moderation_rescan_jobs_status'), table_name='moderation_rescan_jobs')
+    op.drop_table('moderation_rescan_jobs')
@@ -0,0 +1,40 @@
+"""add notification retention index
+
+Revision ID: 8b1e4d7c2a90
+Revises: 3f6c2a9d81b4
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8b1e4d7c2a90'
+down_revision = '3f6c2a9d81b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """新增保留期限清理用的部分索引
+
+    定期清理任務查詢：WHERE is_read = true AND created_at < :cutoff
+    部分索引只包含已讀通知，讓清理不需要掃描整張表
+    """
+    op.create_index(
+        'idx_notifications_read_created',
+        'notifications',
+        ['created_at'],
+        unique=False,
+        postgresql_where=sa.text('is_read = true')
+    )
+
+    # ix_notifications_is_read（單欄位布林索引）選擇性低，
+    # 查詢皆已由 idx_notifications_user_unread 與上述部分索引涵蓋
+    op.drop_index('ix_notifications_is_read', table_name='notifications')
+
+
+def downgrade() -> None:
+    """移除保留期限清理用的部分索引"""
+    op.create_index('ix_notifications_is_read', 'notifications', ['is_read'], unique=False)
+    op.drop_index('idx_notifications_read_created', table_name='notifications')
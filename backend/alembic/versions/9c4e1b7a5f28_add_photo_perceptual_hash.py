@@ -0,0 +1,43 @@
+"""add photo perceptual hash and hash blocklist
+
+Revision ID: 9c4e1b7a5f28
+Revises: 5d0a7f3e9b62
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '9c4e1b7a5f28'
+down_revision = '5d0a7f3e9b62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """新增照片 pHash 欄位與已拒絕照片的雜湊黑名單"""
+    op.add_column('photos', sa.Column('perceptual_hash', sa.BigInteger(), nullable=True))
+
+    op.create_table(
+        'photo_hash_blocklist',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('perceptual_hash', sa.BigInteger(), nullable=False),
+        sa.Column('reason', sa.String(length=20), nullable=False),
+        sa.Column('photo_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        op.f('ix_photo_hash_blocklist_user_id'), 'photo_hash_blocklist', ['user_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """移除照片 pHash 欄位與雜湊黑名單"""
+    op.drop_index(op.f('ix_photo_hash_blocklist_user_id'), table_name='photo_hash_blocklist')
+    op.drop_table('photo_hash_blocklist')
+    op.drop_column('photos', 'perceptual_hash')
@@ -0,0 +1,146 @@
+"""partition messages by sent_at
+
+Revision ID: c52d9e0f7a13
+Revises: 8b1e4d7c2a90
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'c52d9e0f7a13'
+down_revision = '8b1e4d7c2a90'
+branch_labels = None
+depends_on = None
+
+# 升級時預先建立的未來月份數（之後由 message_partitions 維護任務接手）
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    """將 messages 轉換為依 sent_at 月份分區的分區表
+
+    步驟：
+    1. 舊表更名為 messages_unpartitioned（移除索引、更名主鍵避免名稱衝突）
+    2. 建立分區表 messages，主鍵改為 (id, sent_at)（分區鍵必須包含在主鍵中）
+    3. 建立既有資料涵蓋的所有月份分區 + 未來 MONTHS_AHEAD 個月 + 預設分區
+    4. 複製資料後刪除舊表，最後建立索引（載入後建索引較快）
+
+    注意：資料量大時此遷移會長時間持有 messages 的排他鎖，請安排維護時段執行。
+    """
+    op.execute("DROP INDEX IF EXISTS ix_messages_match_sender_read")
+    op.execute("DROP INDEX IF EXISTS ix_messages_match_sent")
+    op.execute("DROP INDEX IF EXISTS ix_messages_sent_at")
+    op.execute("DROP INDEX IF EXISTS ix_messages_match_id")
+    op.execute("ALTER TABLE messages RENAME TO messages_unpartitioned")
+    op.execute(
+        "ALTER TABLE messages_unpartitioned "
+        "RENAME CONSTRAINT messages_pkey TO messages_unpartitioned_pkey"
+    )
+
+    op.execute("""
+        CREATE TABLE messages (
+            id UUID NOT NULL,
+            match_id UUID NOT NULL REFERENCES matches (id) ON DELETE CASCADE,
+            sender_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            content TEXT NOT NULL,
+            message_type VARCHAR(20) DEFAULT 'TEXT',
+            is_read TIMESTAMP WITH TIME ZONE,
+            deleted_at TIMESTAMP WITH TIME ZONE,
+            sent_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT messages_pkey PRIMARY KEY (id, sent_at)
+        ) PARTITION BY RANGE (sent_at)
+    """)
+
+    op.execute(f"""
+        DO $$
+        DECLARE
+            first_month DATE;
+            last_month DATE :=
+                (date_trunc('month', now()) + interval '{MONTHS_AHEAD} months')::date;
+            month DATE;
+        BEGIN
+            SELECT COALESCE(date_trunc('month', MIN(sent_at)), date_trunc('month', now()))::date
+            INTO first_month
+            FROM messages_unpartitioned;
+
+            month := first_month;
+            WHILE month <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF messages FOR VALUES FROM (%L) TO (%L)',
+                    'messages_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+                    month,
+                    (month + interval '1 month')::date
+                );
+                month := (month + interval '1 month')::date;
+            END LOOP;
+        END $$;
+    """)
+    op.execute("CREATE TABLE messages_default PARTITION OF messages DEFAULT")
+
+    op.execute("""
+        INSERT INTO messages (
+            id, match_id, sender_id, content, message_type, is_read, deleted_at, sent_at
+        )
+        SELECT id, match_id, sender_id, content, message_type, is_read, deleted_at,
+               COALESCE(sent_at, now())
+        FROM messages_unpartitioned
+    """)
+    op.execute("DROP TABLE messages_unpartitioned")
+
+    # 分區表上的索引會自動建立到每個分區
+    op.create_index('ix_messages_match_id', 'messages', ['match_id'], unique=False)
+    op.create_index('ix_messages_sent_at', 'messages', ['sent_at'], unique=False)
+    op.create_index('ix_messages_match_sent', 'messages', ['match_id', 'sent_at'], unique=False)
+    op.create_index(
+        'ix_messages_match_sender_read',
+        'messages',
+        ['match_id', 'sender_id', 'is_read'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """將 messages 還原為一般資料表"""
+    op.execute("ALTER TABLE messages RENAME TO messages_partitioned")
+    op.execute(
+        "ALTER TABLE messages_partitioned "
+        "RENAME CONSTRAINT messages_pkey TO messages_partitioned_pkey"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_messages_match_sender_read")
+    op.execute("DROP INDEX IF EXISTS ix_messages_match_sent")
+    op.execute("DROP INDEX IF EXISTS ix_messages_sent_at")
+    op.execute("DROP INDEX IF EXISTS ix_messages_match_id")
+
+    op.execute("""
+        CREATE TABLE messages (
+            id UUID NOT NULL,
+            match_id UUID NOT NULL REFERENCES matches (id) ON DELETE CASCADE,
+            sender_id UUID NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            content TEXT NOT NULL,
+            message_type VARCHAR(20) DEFAULT 'TEXT',
+            is_read TIMESTAMP WITH TIME ZONE,
+            deleted_at TIMESTAMP WITH TIME ZONE,
+            sent_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            CONSTRAINT messages_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("""
+        INSERT INTO messages (
+            id, match_id, sender_id, content, message_type, is_read, deleted_at, sent_at
+        )
+        SELECT id, match_id, sender_id, content, message_type, is_read, deleted_at, sent_at
+        FROM messages_partitioned
+    """)
+    # 刪除分區表會一併刪除所有分區
+    op.execute("DROP TABLE messages_partitioned")
+
+    op.create_index('ix_messages_match_id', 'messages', ['match_id'], unique=False)
+    op.create_index('ix_messages_sent_at', 'messages', ['sent_at'], unique=False)
+    op.create_index('ix_messages_match_sent', 'messages', ['match_id', 'sent_at'], unique=False)
+    op.create_index(
+        'ix_messages_match_sender_read',
+        'messages',
+        ['match_id', 'sender_id', 'is_read'],
+        unique=False
+    )
@@ -0,0 +1,51 @@
+"""add photo moderation queue
+
+Revision ID: e1a7c3f95d04
+Revises: 9c4e1b7a5f28
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'e1a7c3f95d04'
+down_revision = '9c4e1b7a5f28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """新增照片自動審核佇列，並將尚未自動審核的待審核照片排入"""
+    op.create_table(
+        'photo_moderation_queue',
+        sa.Column('photo_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            'enqueued_at', sa.DateTime(timezone=True),
+            server_default=sa.text('now()'), nullable=False
+        ),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['photo_id'], ['photos.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('photo_id'),
+    )
+    op.create_index(
+        op.f('ix_photo_moderation_queue_enqueued_at'), 'photo_moderation_queue', ['enqueued_at'],
+        unique=False
+    )
+
+    op.execute("""
+        INSERT INTO photo_moderation_queue (photo_id, enqueued_at)
+        SELECT id, COALESCE(created_at, now())
+        FROM photos
+        WHERE moderation_status = 'PENDING' AND perceptual_hash IS NULL
+    """)
+
+
+def downgrade() -> None:
+    """移除照片自動審核佇列"""
+    op.drop_index(
+        op.f('ix_photo_moderation_queue_enqueued_at'), table_name='photo_moderation_queue'
+    )
+    op.drop_table('photo_moderation_queue')
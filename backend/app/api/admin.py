@@ -11,7 +11,6 @@ from app.core.database import get_db
 from app.core.dependencies import get_current_admin_user
 from app.core.utils import mask_email
 from app.models.user import User
-from app.models.match import Match, BlockedUser, Message
 from app.models.report import Report
 from app.schemas.admin import (
     DashboardStatsResponse,
@@ -22,6 +21,8 @@ from app.schemas.admin import (
     UnbanUserRequest
 )
 from app.services.trust_score import TrustScoreService
+from app.services.photo_hashing import photo_hash_index
+from app.services.admin_stats import AdminStatsService, STATS_DASHBOARD
 
 logger = logging.getLogger(__name__)
 
@@ -42,58 +43,13 @@ async def get_dashboard_stats(
     - 訊息統計
     - 舉報統計（總數、待處理）
     - 封鎖統計
-    """
-    # 用戶統計
-    total_users_result = await db.execute(select(func.count(User.id)))
-    total_users = total_users_result.scalar()
-
-    active_users_result = await db.execute(
-        select(func.count(User.id)).where(User.is_active.is_(True))
-    )
-    active_users = active_users_result.scalar()
 
-    banned_users_result = await db.execute(
-        select(func.count(User.id)).where(User.is_active.is_(False))
-    )
-    banned_users = banned_users_result.scalar()
-
-    # 配對統計
-    total_matches_result = await db.execute(select(func.count(Match.id)))
-    total_matches = total_matches_result.scalar()
-
-    active_matches_result = await db.execute(
-        select(func.count(Match.id)).where(Match.status == "ACTIVE")
-    )
-    active_matches = active_matches_result.scalar()
-
-    # 訊息統計
-    total_messages_result = await db.execute(select(func.count(Message.id)))
-    total_messages = total_messages_result.scalar()
-
-    # 舉報統計
-    total_reports_result = await db.execute(select(func.count(Report.id)))
-    total_reports = total_reports_result.scalar()
-
-    pending_reports_result = await db.execute(
-        select(func.count(Report.id)).where(Report.status == "PENDING")
-    )
-    pending_reports = pending_reports_result.scalar()
-
-    # 封鎖統計
-    total_blocked_result = await db.execute(select(func.count(BlockedUser.id)))
-    total_blocked_users = total_blocked_result.scalar()
-
-    return DashboardStatsResponse(
-        total_users=total_users,
-        active_users=active_users,
-        banned_users=banned_users,
-        total_matches=total_matches,
-        active_matches=active_matches,
-        total_messages=total_messages,
-        total_reports=total_reports,
-        pending_reports=pending_reports,
-        total_blocked_users=total_blocked_users
+    單次聚合查詢，結果快取 ADMIN_STATS_CACHE_SECONDS 秒。
+    """
+    stats = await AdminStatsService.get_cached(
+        STATS_DASHBOARD, lambda: AdminStatsService.get_dashboard_stats(db)
     )
+    return DashboardStatsResponse(**stats)
 
 
 @router.get("/reports", response_model=List[ReportDetailResponse])
@@ -214,10 +170,13 @@ async def review_report(
             if request.action == "BAN_USER":
                 user.is_active = False
                 user.ban_reason = f"舉報: {report.reason}"
+                # 被封禁帳號的照片納入自動審核比對
+                photo_hash_index.invalidate()
             elif request.action == "WARNING":
                 user.warning_count += 1
 
     await db.commit()
+    await AdminStatsService.invalidate(STATS_DASHBOARD)
 
     # 舉報被確認時（APPROVED），額外扣分 -10
     if request.status == "APPROVED":
@@ -359,6 +318,10 @@ async def ban_user(
 
     await db.commit()
 
+    # 被封禁帳號的照片納入自動審核比對
+    photo_hash_index.invalidate()
+    await AdminStatsService.invalidate(STATS_DASHBOARD)
+
     return {
         "success": True,
         "message": "用戶已被封禁",
@@ -394,6 +357,8 @@ async def unban_user(
     user.banned_until = None
 
     await db.commit()
+    photo_hash_index.invalidate()
+    await AdminStatsService.invalidate(STATS_DASHBOARD)
 
     return {
         "success": True,
@@ -37,15 +37,18 @@ from dateutil.relativedelta import relativedelta
 import uuid
 import logging
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.user import User
 from app.models.profile import Profile
 from app.models.match import Like, Match, BlockedUser, Message, Pass
 from app.models.notification import Notification
-from app.schemas.discovery import ProfileCard, LikeResponse, MatchSummary
+from app.schemas.discovery import ProfileCard, LikeResponse, MatchSummary, PhotoSources
+from app.services.file_storage import pick_variant_url, build_srcset
 from app.services.matching_service import matching_service
 from app.services.trust_score import TrustScoreService
+from app.services.notification_service import NotificationService, GROUP_KEY_LIKED
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +58,31 @@ MIN_MATCH_SCORE = 15.0
 router = APIRouter(prefix="/api/discovery", tags=["discovery"])
 
 
+def _card_photos(profile: Profile) -> tuple[List[str], List[PhotoSources]]:
+    """取得卡片尺寸的照片 URL 與響應式來源
+
+    卡片只需 DISCOVERY_CARD_PHOTO_WIDTH 寬度的圖片，不下載 1200px 主圖；
+    尚無變體的舊照片回退使用原圖 URL。
+
+    Args:
+        profile: 已載入 photos 的 Profile
+
+    Returns:
+        (照片 URL 列表, 響應式來源列表)，皆依 display_order 排序
+    """
+    photos = []
+    photo_sources = []
+    for photo in sorted(profile.photos, key=lambda p: p.display_order):
+        src = pick_variant_url(photo.variants, photo.url, settings.DISCOVERY_CARD_PHOTO_WIDTH)
+        photos.append(src)
+        photo_sources.append(PhotoSources(
+            src=src,
+            jpeg_srcset=build_srcset(photo.variants, "jpeg"),
+            webp_srcset=build_srcset(photo.variants, "webp"),
+        ))
+    return photos, photo_sources
+
+
 @router.get("/browse", response_model=List[ProfileCard])
 async def browse_users(
     limit: int = Query(20, ge=1, le=50, description="返回數量"),
@@ -205,8 +233,8 @@ async def browse_users(
         # 取得興趣標籤
         interests = [interest.name for interest in profile.interests]
 
-        # 取得照片
-        photos = [photo.url for photo in sorted(profile.photos, key=lambda p: p.display_order)]
+        # 取得照片（卡片尺寸）
+        photos, photo_sources = _card_photos(profile)
 
         # 建立候選人資料字典（用於計算分數）
         candidate_data = {
@@ -242,6 +270,7 @@ async def browse_users(
             distance_km=round(distance_km, 1) if distance_km else None,
             interests=interests,
             photos=photos,
+            photo_sources=photo_sources,
             match_score=round(match_score, 1)
         )
 
@@ -272,10 +301,10 @@ def _get_user_avatar(profile: Profile) -> Optional[str]:
         return None
     # 優先取 is_profile_picture 的照片
     profile_photo = next((p for p in profile.photos if p.is_profile_picture), None)
-    if profile_photo:
-        return profile_photo.url
     # 否則取第一張照片
-    return profile.photos[0].url if profile.photos else None
+    photo = profile_photo or profile.photos[0]
+    # 頭像顯示尺寸小，使用縮圖
+    return photo.thumbnail_url or photo.url
 
 
 async def _validate_like_request(
@@ -552,29 +581,28 @@ async def _send_like_notifications(
         # 【通知類型 2】有人喜歡你通知 (notification_liked)
         # 對方還沒喜歡我，發送「有人喜歡你」通知給對方
         # 注意：不透露是誰喜歡，保持神秘感
+        # 熱門用戶的 Like 會在窗口內合併為一筆（「N 人喜歡你！」），推送亦節流
 
-        # 持久化通知到資料庫
-        notification_liked = Notification(
-            user_id=target_user_id,
-            type="notification_liked",
-            title="有人喜歡你！",
-            content="有人對你心動了，快去探索看看吧！",
-            data={}
+        # 持久化通知到資料庫（建立或合併）
+        notification_liked = await NotificationService.record_liked(db, target_user_id)
+        logger.info(
+            f"Persisted notification_liked for user {target_user_id} "
+            f"(group_count={notification_liked.group_count})"
         )
-        db.add(notification_liked)
-        await db.commit()
-        logger.info(f"Persisted notification_liked for user {target_user_id}")
 
         # 發送 WebSocket 通知（包含 notification_id 讓前端可以標記已讀）
-        await manager.send_personal_message(
+        pushed = await NotificationService.push_coalesced(
             str(target_user_id),
+            GROUP_KEY_LIKED,
             {
                 "type": "notification_liked",
                 "notification_id": str(notification_liked.id),
+                "group_count": notification_liked.group_count,
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }
         )
-        logger.info(f"Sent notification_liked to user {target_user_id}")
+        if pushed:
+            logger.info(f"Sent notification_liked to user {target_user_id}")
 
 
 @router.post("/like/{user_id}", response_model=LikeResponse)
@@ -784,12 +812,7 @@ async def get_matches(
 
         # 取得興趣和照片
         interests = [interest.name for interest in matched_profile.interests]
-        photos = [
-            photo.url
-            for photo in sorted(
-                matched_profile.photos, key=lambda p: p.display_order
-            )
-        ]
+        photos, photo_sources = _card_photos(matched_profile)
 
         # 建立 ProfileCard
         profile_card = ProfileCard(
@@ -800,7 +823,8 @@ async def get_matches(
             bio=matched_profile.bio,
             location_name=matched_profile.location_name,
             interests=interests,
-            photos=photos
+            photos=photos,
+            photo_sources=photo_sources
         )
 
         # 從批次載入的數據中獲取未讀數
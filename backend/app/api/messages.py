@@ -20,7 +20,7 @@ from app.schemas.message import (
     ChatImageUploadResponse
 )
 from app.websocket.manager import manager
-from app.services.file_storage import file_storage
+from app.services.file_storage import file_storage, InvalidImageError
 from app.core.config import settings
 
 router = APIRouter(prefix="/api/messages")
@@ -179,9 +179,12 @@ async def get_conversations(
     )
     profiles_by_user_id = {p.user_id: p for p in profiles_result.scalars().all()}
 
-    # 批次查詢 2：所有訊息（用於找最後一條訊息）
+    # 批次查詢 2：每個配對的最後一條訊息
+    # DISTINCT ON 讓資料庫只回傳每個 match 最新的一筆（走 ix_messages_match_sent），
+    # 不需把所有歷史訊息載入記憶體
     messages_result = await db.execute(
         select(Message)
+        .distinct(Message.match_id)
         .where(
             and_(
                 Message.match_id.in_(match_ids),
@@ -190,13 +193,7 @@ async def get_conversations(
         )
         .order_by(Message.match_id, desc(Message.sent_at))
     )
-    all_messages = messages_result.scalars().all()
-
-    # 整理每個 match 的最後一條訊息
-    last_messages_by_match = {}
-    for msg in all_messages:
-        if msg.match_id not in last_messages_by_match:
-            last_messages_by_match[msg.match_id] = msg
+    last_messages_by_match = {msg.match_id: msg for msg in messages_result.scalars().all()}
 
     # 批次查詢 3：所有未讀訊息數（1 次查詢取代 N 次）
     unread_counts_result = await db.execute(
@@ -230,11 +227,12 @@ async def get_conversations(
         # 獲取對方的頭像
         other_user_avatar = None
         if other_profile and other_profile.photos:
-            profile_photo = next((p for p in other_profile.photos if p.is_profile_picture), None)
-            if profile_photo:
-                other_user_avatar = profile_photo.url
-            elif other_profile.photos:
-                other_user_avatar = other_profile.photos[0].url
+            profile_photo = next(
+                (p for p in other_profile.photos if p.is_profile_picture),
+                other_profile.photos[0]
+            )
+            # 對話列表頭像顯示尺寸小，使用縮圖
+            other_user_avatar = profile_photo.thumbnail_url or profile_photo.url
 
         conversations.append(
             MatchWithLastMessageResponse(
@@ -509,7 +507,9 @@ async def upload_chat_image(
         )
 
     # 讀取檔案內容（流式讀取防止 DoS）
-    file_content = b""
+    # 使用 bytearray 原地累加，避免 bytes += 每次複製整段內容（O(n²)）；
+    # 超過上限時在加入該區塊前即中止，不會多讀整個檔案
+    file_content = bytearray()
     chunk_size = 64 * 1024  # 64KB
     max_size = settings.MAX_UPLOAD_SIZE
 
@@ -517,12 +517,12 @@ async def upload_chat_image(
         chunk = await file.read(chunk_size)
         if not chunk:
             break
-        file_content += chunk
-        if len(file_content) > max_size:
+        if len(file_content) + len(chunk) > max_size:
             raise HTTPException(
                 status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
                 detail=f"檔案過大，最大允許 {max_size // 1024 // 1024}MB"
             )
+        file_content += chunk
 
     if len(file_content) == 0:
         raise HTTPException(
@@ -537,10 +537,15 @@ async def upload_chat_image(
         ) = await file_storage.save_chat_image(
             match_id=match_id,
             user_id=str(current_user.id),
-            file_content=file_content,
+            file_content=bytes(file_content),
             filename=file.filename or "image",
             content_type=content_type
         )
+    except InvalidImageError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Failed to save chat image: {e}", exc_info=True)
         raise HTTPException(
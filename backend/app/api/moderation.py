@@ -1,9 +1,9 @@
 """內容審核管理 API - 敏感詞管理和申訴處理"""
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, desc
+from sqlalchemy import select, func, desc
 from typing import Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import uuid
 
 from app.core.database import get_db
@@ -11,6 +11,13 @@ from app.core.dependencies import get_current_admin_user, get_current_user
 from app.models.user import User
 from app.models.moderation import SensitiveWord, ContentAppeal, ModerationLog
 from app.services.content_moderation import ContentModerationService
+from app.services.admin_stats import AdminStatsService, STATS_MODERATION
+from app.services.moderation_rescan import (
+    moderation_rescan,
+    job_progress,
+    RESCAN_MESSAGES,
+    RESCAN_PROFILES,
+)
 from app.schemas.moderation import (
     SensitiveWordCreate,
     SensitiveWordUpdate,
@@ -22,7 +29,10 @@ from app.schemas.moderation import (
     ContentAppealListResponse,
     ModerationLogResponse,
     ModerationLogListResponse,
-    ModerationStatsResponse
+    ModerationStatsResponse,
+    ModerationRescanJobCreate,
+    ModerationRescanJobResponse,
+    ModerationRescanJobListResponse
 )
 
 router = APIRouter()
@@ -111,11 +121,18 @@ async def create_sensitive_word(
     )
 
     db.add(new_word)
+    await db.flush()
+
+    # 回溯掃描既有個人檔案與近期訊息（只比對新詞）
+    await moderation_rescan.enqueue(db, word_ids=[new_word.id], created_by=current_admin.id)
+
     await db.commit()
     await db.refresh(new_word)
 
     # 清除快取
     await ContentModerationService.clear_cache()
+    await AdminStatsService.invalidate(STATS_MODERATION)
+    moderation_rescan.notify()
 
     return SensitiveWordResponse.model_validate(new_word)
 
@@ -166,16 +183,24 @@ async def update_sensitive_word(
 
     # 更新欄位
     update_data = word_data.model_dump(exclude_unset=True)
+    reactivated = update_data.get("is_active") is True and not word.is_active
     for field, value in update_data.items():
         setattr(word, field, value)
 
     word.updated_at = func.now()
 
+    # 重新啟用的詞停用期間未審核新內容：回溯掃描
+    if reactivated:
+        await moderation_rescan.enqueue(db, word_ids=[word.id], created_by=current_admin.id)
+
     await db.commit()
     await db.refresh(word)
 
     # 清除快取
     await ContentModerationService.clear_cache()
+    await AdminStatsService.invalidate(STATS_MODERATION)
+    if reactivated:
+        moderation_rescan.notify()
 
     return SensitiveWordResponse.model_validate(word)
 
@@ -210,6 +235,87 @@ async def delete_sensitive_word(
 
     # 清除快取
     await ContentModerationService.clear_cache()
+    await AdminStatsService.invalidate(STATS_MODERATION)
+
+
+# ============ 敏感詞重新掃描 API（管理員）============
+
+@router.post(
+    "/rescan-jobs",
+    response_model=ModerationRescanJobListResponse,
+    status_code=status.HTTP_201_CREATED
+)
+async def create_rescan_jobs(
+    job_data: ModerationRescanJobCreate,
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    建立敏感詞重新掃描工作（管理員）
+
+    新增或重新啟用敏感詞時會自動建立；此端點用於手動全面重新掃描。
+    """
+    invalid = set(job_data.targets) - {RESCAN_PROFILES, RESCAN_MESSAGES}
+    if invalid or not job_data.targets:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"無效的掃描對象: {', '.join(sorted(invalid)) or '（空）'}"
+        )
+
+    since = None
+    if job_data.since_days is not None:
+        since = datetime.now(timezone.utc) - timedelta(days=job_data.since_days)
+
+    jobs = await moderation_rescan.enqueue(
+        db,
+        word_ids=job_data.word_ids,
+        targets=list(dict.fromkeys(job_data.targets)),
+        since=since,
+        created_by=current_admin.id
+    )
+    await db.commit()
+    for job in jobs:
+        await db.refresh(job)
+    moderation_rescan.notify()
+
+    return ModerationRescanJobListResponse(
+        jobs=[ModerationRescanJobResponse(**job_progress(job)) for job in jobs]
+    )
+
+
+@router.get("/rescan-jobs", response_model=ModerationRescanJobListResponse)
+async def get_rescan_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    取得重新掃描工作進度（管理員）
+
+    包含狀態（失敗達上限為 FAILED）、已掃描 / 違規筆數、平均吞吐量、目前游標與失敗次數。
+    """
+    jobs = await moderation_rescan.list_jobs(db, limit)
+    return ModerationRescanJobListResponse(
+        jobs=[ModerationRescanJobResponse(**job_progress(job)) for job in jobs]
+    )
+
+
+@router.post("/rescan-jobs/{job_id}/cancel", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_rescan_job(
+    job_id: uuid.UUID,
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    取消重新掃描工作（管理員）
+
+    執行中的工作在目前這一段提交前停止，已提交的違規記錄保留。
+    """
+    if not await moderation_rescan.cancel(db, job_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="工作不存在或已結束"
+        )
 
 
 # ============ 內容申訴 API ============
@@ -235,6 +341,7 @@ async def create_appeal(
     db.add(appeal)
     await db.commit()
     await db.refresh(appeal)
+    await AdminStatsService.invalidate(STATS_MODERATION)
 
     return ContentAppealResponse.model_validate(appeal)
 
@@ -346,6 +453,7 @@ async def review_appeal(
 
     await db.commit()
     await db.refresh(appeal)
+    await AdminStatsService.invalidate(STATS_MODERATION)
 
     return ContentAppealResponse.model_validate(appeal)
 
@@ -408,84 +516,18 @@ async def get_moderation_stats(
 ):
     """
     取得審核統計數據（管理員）
-    """
-    # 敏感詞統計
-    total_words_result = await db.execute(select(func.count(SensitiveWord.id)))
-    total_sensitive_words = total_words_result.scalar()
-
-    active_words_result = await db.execute(
-        select(func.count(SensitiveWord.id)).where(SensitiveWord.is_active.is_(True))
-    )
-    active_sensitive_words = active_words_result.scalar()
-
-    # 申訴統計
-    total_appeals_result = await db.execute(select(func.count(ContentAppeal.id)))
-    total_appeals = total_appeals_result.scalar()
-
-    pending_appeals_result = await db.execute(
-        select(func.count(ContentAppeal.id)).where(ContentAppeal.status == "PENDING")
-    )
-    pending_appeals = pending_appeals_result.scalar()
-
-    approved_appeals_result = await db.execute(
-        select(func.count(ContentAppeal.id)).where(ContentAppeal.status == "APPROVED")
-    )
-    approved_appeals = approved_appeals_result.scalar()
 
-    rejected_appeals_result = await db.execute(
-        select(func.count(ContentAppeal.id)).where(ContentAppeal.status == "REJECTED")
-    )
-    rejected_appeals = rejected_appeals_result.scalar()
-
-    # 違規統計
-    now = datetime.now()
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    week_start = now - timedelta(days=7)
-    month_start = now - timedelta(days=30)
-
-    today_violations_result = await db.execute(
-        select(func.count(ModerationLog.id)).where(
-            and_(
-                ModerationLog.is_approved.is_(False),
-                ModerationLog.created_at >= today_start
-            )
-        )
-    )
-    total_violations_today = today_violations_result.scalar()
-
-    week_violations_result = await db.execute(
-        select(func.count(ModerationLog.id)).where(
-            and_(
-                ModerationLog.is_approved.is_(False),
-                ModerationLog.created_at >= week_start
-            )
-        )
-    )
-    total_violations_this_week = week_violations_result.scalar()
-
-    month_violations_result = await db.execute(
-        select(func.count(ModerationLog.id)).where(
-            and_(
-                ModerationLog.is_approved.is_(False),
-                ModerationLog.created_at >= month_start
-            )
-        )
+    單次聚合查詢，結果快取 ADMIN_STATS_CACHE_SECONDS 秒。
+    """
+    stats = await AdminStatsService.get_cached(
+        STATS_MODERATION, lambda: AdminStatsService.get_moderation_stats(db)
     )
-    total_violations_this_month = month_violations_result.scalar()
 
     # 最常觸發的敏感詞（簡化版，返回空列表）
     # 實際應該分析 triggered_word_ids 欄位
     most_triggered_words = []
 
     return ModerationStatsResponse(
-        total_sensitive_words=total_sensitive_words,
-        active_sensitive_words=active_sensitive_words,
-        total_appeals=total_appeals,
-        pending_appeals=pending_appeals,
-        approved_appeals=approved_appeals,
-        rejected_appeals=rejected_appeals,
-        total_violations_today=total_violations_today,
-        total_violations_this_week=total_violations_this_week,
-        total_violations_this_month=total_violations_this_month,
+        **stats,
         most_triggered_words=most_triggered_words
     )
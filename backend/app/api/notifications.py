@@ -1,11 +1,13 @@
 """通知 API - 持久化通知管理"""
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, update
+from sqlalchemy import select, func, update, and_, or_
+from typing import Optional
 import uuid
 
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
+from app.core.pagination import encode_cursor, decode_cursor
 from app.models.user import User
 from app.models.notification import Notification
 from app.schemas.notification import (
@@ -21,12 +23,23 @@ router = APIRouter(prefix="/api/notifications", tags=["通知"])
 @router.get("", response_model=NotificationListResponse)
 async def get_notifications(
     limit: int = Query(default=20, ge=1, le=100, description="每頁數量"),
-    offset: int = Query(default=0, ge=0, description="偏移量"),
+    offset: int = Query(default=0, ge=0, description="偏移量（舊版分頁，建議改用 cursor）"),
+    cursor: Optional[str] = Query(default=None, description="Cursor: 載入比此游標更早的通知"),
+    include_total: bool = Query(default=True, description="是否計算總通知數與未讀數"),
     unread_only: bool = Query(default=False, description="只取未讀"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """取得通知列表（分頁）"""
+    """取得通知列表
+
+    支援兩種分頁方式：
+    - Cursor-based（建議）：傳入上次回應的 next_cursor，以 (created_at, id) 做 keyset 查詢，
+      走 idx_notifications_user_created 索引，深度捲動仍是 O(page)
+    - Offset-based（舊版）：傳入 offset，深度分頁成本隨 offset 增加
+
+    total 與 unread_count 各需要額外的 COUNT 查詢，使用 cursor 時一律省略（回傳 null），
+    第一頁也可用 include_total=false 關閉；未讀數請改用 /unread-count。
+    """
     # 基礎查詢
     query = select(Notification).where(Notification.user_id == current_user.id)
 
@@ -34,35 +47,63 @@ async def get_notifications(
     if unread_only:
         query = query.where(Notification.is_read == False)  # noqa: E712
 
-    # 排序（最新優先）
-    query = query.order_by(Notification.created_at.desc())
+    # 取得總數與未讀數（僅 offset 分頁且需要時）
+    total = None
+    unread_count = None
+    if include_total and cursor is None:
+        count_query = select(func.count()).select_from(
+            query.subquery()
+        )
+        total_result = await db.execute(count_query)
+        total = total_result.scalar() or 0
 
-    # 取得總數
-    count_query = select(func.count()).select_from(
-        query.subquery()
-    )
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
+        # idx_notifications_user_unread 索引，合併後未讀筆數有限
+        unread_query = select(func.count()).where(
+            Notification.user_id == current_user.id,
+            Notification.is_read == False  # noqa: E712
+        )
+        unread_result = await db.execute(unread_query)
+        unread_count = unread_result.scalar() or 0
+
+    # Keyset 條件：取比游標更早的通知（相同時間以 id 排序）
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            or_(
+                Notification.created_at < cursor_created_at,
+                and_(
+                    Notification.created_at == cursor_created_at,
+                    Notification.id < cursor_id
+                )
+            )
+        )
+    elif offset:
+        query = query.offset(offset)
 
-    # 分頁
-    query = query.offset(offset).limit(limit)
+    # 排序（最新優先），多取一筆判斷 has_more
+    query = query.order_by(
+        Notification.created_at.desc(), Notification.id.desc()
+    ).limit(limit + 1)
     result = await db.execute(query)
     notifications = result.scalars().all()
 
-    # 取得未讀數量
-    unread_query = select(func.count()).where(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False  # noqa: E712
-    )
-    unread_result = await db.execute(unread_query)
-    unread_count = unread_result.scalar() or 0
+    has_more = len(notifications) > limit
+    if has_more:
+        notifications = notifications[:limit]
+
+    next_cursor = None
+    if has_more and notifications:
+        last = notifications[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
 
     return NotificationListResponse(
         notifications=[
             NotificationResponse.model_validate(n) for n in notifications
         ],
         total=total,
-        unread_count=unread_count
+        unread_count=unread_count,
+        has_more=has_more,
+        next_cursor=next_cursor
     )
 
 
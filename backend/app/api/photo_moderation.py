@@ -11,8 +11,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
 from app.core.dependencies import get_current_admin_user
+from app.core.pagination import encode_cursor, decode_cursor
 from app.models.user import User
-from app.services.photo_moderation import PhotoModerationService
+from app.services.admin_stats import AdminStatsService, STATS_PHOTOS
+from app.services.photo_moderation import PhotoModerationService, PhotoReviewConflictError
+from app.services.photo_moderation_queue import photo_moderation_queue
 
 router = APIRouter()
 
@@ -66,6 +69,26 @@ class PendingPhotosListResponse(BaseModel):
     page_size: int
 
 
+class ClaimedPhotosResponse(BaseModel):
+    """領取的待審核照片回應"""
+    photos: list[PendingPhotoResponse]
+    lease_expires_at: str
+    next_cursor: Optional[str] = None
+
+
+class ReleaseClaimsRequest(BaseModel):
+    """釋放領取照片請求"""
+    photo_ids: Optional[list[UUID]] = Field(
+        None,
+        description="要釋放的照片（不傳表示釋放全部）"
+    )
+
+
+class ReleaseClaimsResponse(BaseModel):
+    """釋放領取照片回應"""
+    released: int
+
+
 class PhotoStatsResponse(BaseModel):
     """照片審核統計回應"""
     total_photos: int
@@ -76,6 +99,18 @@ class PhotoStatsResponse(BaseModel):
     today_reviewed: int
 
 
+class PhotoModerationQueueMetricsResponse(BaseModel):
+    """自動審核佇列指標回應"""
+    queue_depth: int
+    oldest_job_age_seconds: Optional[float]
+    processed_total: int
+    failed_total: int
+    auto_rejected_total: int
+    latency_p50_ms: Optional[float]
+    latency_p95_ms: Optional[float]
+    last_batch_ms: Optional[float]
+
+
 # ========== API Endpoints ==========
 
 
@@ -97,6 +132,8 @@ async def get_pending_photos(
     - 預設只顯示待審核（PENDING）照片
     - 可透過 status 參數篩選其他狀態
     - 按上傳時間排序（最舊優先）
+
+    多位管理員同時審核時請改用 POST /claim 領取照片，避免重複審核。
     """
     photos, total = await PhotoModerationService.get_pending_photos(
         db=db,
@@ -113,6 +150,54 @@ async def get_pending_photos(
     )
 
 
+@router.post("/claim", response_model=ClaimedPhotosResponse)
+async def claim_pending_photos(
+    limit: int = Query(20, ge=1, le=100, description="領取數量"),
+    cursor: Optional[str] = Query(None, description="略過目前這批：傳入上次回應的 next_cursor"),
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    領取待審核照片
+
+    - 依上傳時間領取最舊的待審核照片，租約期間不會分配給其他管理員
+    - 重新呼叫會續約自己已領取、尚未審核的照片
+    - 審核後自動釋放；租約到期未審核的照片可被其他管理員領取
+    """
+    after = decode_cursor(cursor) if cursor else None
+    photos, lease_expires_at, next_key = await PhotoModerationService.claim_pending_photos(
+        db=db,
+        admin_id=current_admin.id,
+        limit=limit,
+        after=after
+    )
+
+    return ClaimedPhotosResponse(
+        photos=[PendingPhotoResponse(**photo) for photo in photos],
+        lease_expires_at=lease_expires_at.isoformat(),
+        next_cursor=encode_cursor(*next_key) if next_key else None
+    )
+
+
+@router.post("/release", response_model=ReleaseClaimsResponse)
+async def release_claims(
+    request: ReleaseClaimsRequest,
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    釋放領取的照片
+
+    讓其他管理員可立即領取（例如離開審核頁面時）。
+    """
+    released = await PhotoModerationService.release_claims(
+        db=db,
+        admin_id=current_admin.id,
+        photo_ids=request.photo_ids
+    )
+    return ReleaseClaimsResponse(released=released)
+
+
 @router.get("/stats", response_model=PhotoStatsResponse)
 async def get_photo_stats(
     current_admin: User = Depends(get_current_admin_user),
@@ -128,11 +213,33 @@ async def get_photo_stats(
     - 已拒絕數
     - 今日新增待審核數
     - 今日已審核數
+
+    單次聚合查詢，結果快取 ADMIN_STATS_CACHE_SECONDS 秒（審核後立即失效）。
     """
-    stats = await PhotoModerationService.get_stats(db)
+    stats = await AdminStatsService.get_cached(
+        STATS_PHOTOS, lambda: PhotoModerationService.get_stats(db)
+    )
     return PhotoStatsResponse(**stats)
 
 
+@router.get("/queue-metrics", response_model=PhotoModerationQueueMetricsResponse)
+async def get_queue_metrics(
+    current_admin: User = Depends(get_current_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    取得自動審核佇列指標
+
+    返回：
+    - 佇列深度與最舊記錄等待秒數（所有副本共用）
+    - 處理數、失敗數、自動拒絕數（本行程）
+    - 排入到處理完成的延遲 p50 / p95（本行程最近樣本）
+    - 最近一批處理耗時
+    """
+    metrics = await photo_moderation_queue.get_metrics(db)
+    return PhotoModerationQueueMetricsResponse(**metrics)
+
+
 @router.get("/{photo_id}")
 async def get_photo_detail(
     photo_id: UUID,
@@ -178,13 +285,19 @@ async def review_photo(
             detail="拒絕照片時必須提供原因"
         )
 
-    success, message = await PhotoModerationService.review_photo(
-        db=db,
-        photo_id=photo_id,
-        admin_id=current_admin.id,
-        status=request.status,
-        rejection_reason=request.rejection_reason
-    )
+    try:
+        success, message = await PhotoModerationService.review_photo(
+            db=db,
+            photo_id=photo_id,
+            admin_id=current_admin.id,
+            status=request.status,
+            rejection_reason=request.rejection_reason
+        )
+    except PhotoReviewConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
 
     if not success:
         raise HTTPException(
@@ -192,6 +305,8 @@ async def review_photo(
             detail=message
         )
 
+    await AdminStatsService.invalidate(STATS_PHOTOS)
+
     return PhotoReviewResponse(
         success=True,
         message=message,
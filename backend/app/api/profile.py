@@ -7,10 +7,8 @@ from geoalchemy2.functions import ST_MakePoint, ST_SetSRID
 from datetime import date
 from dateutil.relativedelta import relativedelta
 from typing import List
-from PIL import Image
 import uuid
 import logging
-import io
 
 from app.core.database import get_db
 from app.core.dependencies import get_current_user, get_current_admin_user
@@ -28,7 +26,8 @@ from app.schemas.profile import (
     PhotoOrderRequest,
 )
 from app.services.content_moderation import ContentModerationService
-from app.services.file_storage import file_storage
+from app.services.file_storage import file_storage, InvalidImageError
+from app.services.photo_moderation_queue import photo_moderation_queue
 
 router = APIRouter(prefix="/api/profile")
 logger = logging.getLogger(__name__)
@@ -85,22 +84,12 @@ async def create_profile(
             detail="個人檔案已存在"
         )
 
-    # 內容審核：檢查個人簡介
-    if request.bio:
-        is_approved, violations, action = await ContentModerationService.check_profile_content(
-            db=db,
-            user_id=current_user.id,
-            bio=request.bio
-        )
-        if not is_approved:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail={
-                    "message": "個人簡介包含不當內容",
-                    "violations": violations,
-                    "action": action
-                }
-            )
+    # 內容審核：顯示名稱與個人簡介一次檢查
+    is_valid, status_code, error = await _validate_profile_content(
+        db, current_user.id, display_name=request.display_name, bio=request.bio
+    )
+    if not is_valid:
+        raise HTTPException(status_code=status_code, detail=error)
 
     # 建立檔案
     new_profile = Profile(
@@ -172,28 +161,34 @@ async def get_my_profile(
 # ========== update_profile 輔助函數 ==========
 
 
-async def _validate_bio_content(
-    db: AsyncSession, user_id: uuid.UUID, bio: str | None
+async def _validate_profile_content(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    display_name: str | None = None,
+    bio: str | None = None,
+    interests: list[str] | None = None
 ) -> tuple[bool, int, str | dict]:
-    """驗證個人簡介內容
+    """驗證個人檔案內容（所有欄位一次掃描）
 
     Args:
         db: 資料庫 session
         user_id: 用戶 ID
+        display_name: 顯示名稱
         bio: 個人簡介內容
+        interests: 興趣標籤名稱
 
     Returns:
         (is_valid, status_code, error_detail)
     """
-    if bio is None:
+    if not (display_name or bio or interests):
         return True, 0, ""
 
     is_approved, violations, action = await ContentModerationService.check_profile_content(
-        db=db, user_id=user_id, bio=bio
+        db=db, user_id=user_id, bio=bio, interests=interests, display_name=display_name
     )
     if not is_approved:
         return False, status.HTTP_400_BAD_REQUEST, {
-            "message": "個人簡介包含不當內容",
+            "message": "個人檔案包含不當內容",
             "violations": violations,
             "action": action
         }
@@ -255,6 +250,7 @@ def _build_profile_response(
             id=str(photo.id),
             url=photo.url,
             thumbnail_url=photo.thumbnail_url,
+            variants=photo.variants or [],
             display_order=photo.display_order,
             is_profile_picture=photo.is_profile_picture,
             moderation_status=photo.moderation_status,
@@ -317,8 +313,8 @@ async def update_profile(
         )
 
     # 2. 內容審核
-    is_valid, status_code, error = await _validate_bio_content(
-        db, current_user.id, request.bio
+    is_valid, status_code, error = await _validate_profile_content(
+        db, current_user.id, display_name=request.display_name, bio=request.bio
     )
     if not is_valid:
         raise HTTPException(status_code=status_code, detail=error)
@@ -372,6 +368,13 @@ async def update_interests(
             detail="部分興趣標籤不存在"
         )
 
+    # 內容審核：所選標籤一次檢查
+    is_valid, status_code, error = await _validate_profile_content(
+        db, current_user.id, interests=[tag.name for tag in tags]
+    )
+    if not is_valid:
+        raise HTTPException(status_code=status_code, detail=error)
+
     # 更新興趣標籤
     profile.interests = list(tags)
 
@@ -446,30 +449,6 @@ async def _read_file_with_size_limit(
     return True, 0, "", file_content
 
 
-def _validate_image_format(file_content: bytes) -> tuple[bool, int, str]:
-    """驗證實際圖片格式（使用 PIL，防止偽造 Content-Type）
-
-    Args:
-        file_content: 檔案二進制內容
-
-    Returns:
-        (is_valid, status_code, error_detail)
-    """
-    ALLOWED_FORMATS = {"JPEG", "PNG", "GIF", "WEBP"}
-    try:
-        img = Image.open(io.BytesIO(file_content))
-        img.verify()
-        if img.format not in ALLOWED_FORMATS:
-            return False, status.HTTP_400_BAD_REQUEST, "無效的圖片格式"
-    except (Image.UnidentifiedImageError, IOError, ValueError):
-        return (
-            False,
-            status.HTTP_400_BAD_REQUEST,
-            "無效的圖片檔案，請上傳有效的圖片",
-        )
-    return True, 0, ""
-
-
 async def _get_profile_with_photos(
     user_id: uuid.UUID, db: AsyncSession
 ) -> tuple[bool, int, str, Profile | None]:
@@ -502,7 +481,7 @@ async def _save_photo_file(
     filename: str | None,
     content_type: str | None,
 ) -> tuple[bool, int, str, tuple | None]:
-    """儲存照片到本地儲存
+    """驗證圖片內容並儲存照片到本地儲存
 
     Args:
         user_id: 用戶 ID
@@ -511,16 +490,18 @@ async def _save_photo_file(
         content_type: MIME 類型
 
     Returns:
-        (success, status_code, error_detail, (photo_id, photo_url, thumbnail_url))
+        (success, status_code, error_detail, (photo_id, photo_url, thumbnail_url, variants))
     """
     try:
-        photo_id, photo_url, thumbnail_url = await file_storage.save_photo(
+        photo_id, photo_url, thumbnail_url, variants = await file_storage.save_photo(
             user_id=str(user_id),
             file_content=file_content,
             filename=filename or "photo.jpg",
             content_type=content_type,
         )
-        return True, 0, "", (photo_id, photo_url, thumbnail_url)
+        return True, 0, "", (photo_id, photo_url, thumbnail_url, variants)
+    except InvalidImageError as e:
+        return False, status.HTTP_400_BAD_REQUEST, str(e), None
     except Exception as e:
         logger.error(f"Failed to save photo for user {user_id}: {e}")
         return (
@@ -535,6 +516,7 @@ async def _create_photo_record(
     profile: Profile,
     photo_url: str,
     thumbnail_url: str,
+    variants: list[dict],
     content_type: str | None,
     db: AsyncSession,
 ) -> tuple[bool, int, str, Photo | None]:
@@ -544,6 +526,7 @@ async def _create_photo_record(
         profile: 個人檔案對象
         photo_url: 照片 URL
         thumbnail_url: 縮圖 URL
+        variants: 響應式變體清單（最後一個為主圖）
         content_type: MIME 類型
         db: 資料庫 session
 
@@ -551,10 +534,14 @@ async def _create_photo_record(
         (success, status_code, error_detail, photo)
     """
     existing_count = len(profile.photos)
+    main_variant = variants[-1] if variants else {}
     new_photo = Photo(
         profile_id=profile.id,
         url=photo_url,
         thumbnail_url=thumbnail_url,
+        variants=variants or None,
+        width=main_variant.get("width"),
+        height=main_variant.get("height"),
         display_order=existing_count,
         is_profile_picture=(existing_count == 0),
         mime_type=content_type,
@@ -564,6 +551,7 @@ async def _create_photo_record(
     try:
         db.add(new_photo)
         await db.flush()
+        photo_moderation_queue.enqueue(db, new_photo.id)
         await db.refresh(profile, ["photos", "interests"])
         profile.is_complete = check_profile_completeness(profile)
         await db.commit()
@@ -593,10 +581,10 @@ async def upload_photo(
     流程：
     1. 驗證 Content-Type
     2. 流式讀取並驗證大小
-    3. 驗證圖片格式（PIL）
-    4. 取得個人檔案並檢查照片數量
-    5. 儲存照片檔案
-    6. 建立資料庫記錄
+    3. 取得個人檔案並檢查照片數量
+    4. 驗證圖片格式並儲存照片檔案（單次解碼，驗證與縮圖共用同一份像素）
+    5. 建立資料庫記錄
+    6. 排入自動審核佇列（背景 worker 比對已拒絕照片、被封禁帳號照片，近似者直接拒絕）
 
     安全措施：
     - 檔案大小限制（5MB）
@@ -613,38 +601,37 @@ async def upload_photo(
     if not is_valid:
         raise HTTPException(status_code=status_code, detail=error)
 
-    # 3. 驗證圖片格式（PIL）
-    is_valid, status_code, error = _validate_image_format(file_content)
-    if not is_valid:
-        raise HTTPException(status_code=status_code, detail=error)
-
-    # 4. 取得個人檔案並檢查照片數量
+    # 3. 取得個人檔案並檢查照片數量
     is_valid, status_code, error, profile = await _get_profile_with_photos(
         current_user.id, db
     )
     if not is_valid:
         raise HTTPException(status_code=status_code, detail=error)
 
-    # 5. 儲存照片檔案
+    # 4. 驗證圖片格式並儲存照片檔案
     success, status_code, error, photo_data = await _save_photo_file(
         current_user.id, file_content, file.filename, file.content_type
     )
     if not success:
         raise HTTPException(status_code=status_code, detail=error)
 
-    _, photo_url, thumbnail_url = photo_data
+    _, photo_url, thumbnail_url, variants = photo_data
 
-    # 6. 建立資料庫記錄
+    # 5. 建立資料庫記錄
     success, status_code, error, new_photo = await _create_photo_record(
-        profile, photo_url, thumbnail_url, file.content_type, db
+        profile, photo_url, thumbnail_url, variants, file.content_type, db
     )
     if not success:
         raise HTTPException(status_code=status_code, detail=error)
 
+    # 6. 通知自動審核 worker（佇列記錄已與照片同一事務寫入）
+    photo_moderation_queue.notify()
+
     return PhotoResponse(
         id=str(new_photo.id),
         url=new_photo.url,
         thumbnail_url=new_photo.thumbnail_url,
+        variants=new_photo.variants or [],
         display_order=new_photo.display_order,
         is_profile_picture=new_photo.is_profile_picture,
         moderation_status=new_photo.moderation_status,
@@ -797,6 +784,7 @@ async def reorder_photos(
             id=str(photo.id),
             url=photo.url,
             thumbnail_url=photo.thumbnail_url,
+            variants=photo.variants or [],
             display_order=photo.display_order,
             is_profile_picture=photo.is_profile_picture,
             moderation_status=photo.moderation_status,
@@ -872,6 +860,7 @@ async def set_profile_picture(
         id=str(target_photo.id),
         url=target_photo.url,
         thumbnail_url=target_photo.thumbnail_url,
+        variants=target_photo.variants or [],
         display_order=target_photo.display_order,
         is_profile_picture=target_photo.is_profile_picture,
         moderation_status=target_photo.moderation_status,
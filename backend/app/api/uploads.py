@@ -0,0 +1,236 @@
+"""上傳檔案 API - 提供本地儲存的照片與聊天圖片
+
+取代 StaticFiles（僅 STORAGE_BACKEND=local 時掛載）：
+- 檔名皆為 uuid、內容永不變更：Cache-Control 帶 immutable，瀏覽器不再重新驗證
+- 強 ETag 取自檔案內容的 sha256（依 inode 快取，同內容的硬連結只計算一次），
+  處理 If-None-Match 回傳 304
+- 支援單一 Range 請求（206 / 416；格式無效的 Range 依 RFC 9110 忽略，回傳完整內容）
+- ASGI 伺服器支援 http.response.zerocopysend 擴充時以 sendfile 傳送
+
+前端代理可完全略過本路由：
+- 直接由代理提供 UPLOAD_DIR 下的 photos/、chat/（路徑與 URL 一致）
+- 或設定 UPLOADS_ACCEL_REDIRECT_PREFIX，由本路由回傳 X-Accel-Redirect，
+  代理（nginx internal location）以 sendfile 傳送檔案內容
+"""
+from collections import OrderedDict
+from email.utils import formatdate
+from mimetypes import guess_type
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import asyncio
+import hashlib
+import os
+import stat
+
+import anyio
+from fastapi import APIRouter, Request, Response
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+from app.services.file_storage import file_storage
+from app.services.storage_backends import IMMUTABLE_CACHE_CONTROL
+
+router = APIRouter()
+
+# 可對外提供的物件鍵前綴（內容物件與處理結果快取不對外提供）
+SERVABLE_PREFIXES = ("photos/", "chat/")
+
+# ETag 快取上限（以 inode 為鍵）
+ETAG_CACHE_SIZE = 10000
+
+_etag_cache: "OrderedDict[Tuple[int, int, int, int], str]" = OrderedDict()
+
+
+def _hash_file(path: Path) -> str:
+    """計算檔案 sha256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def _get_etag(path: Path, stat_result: os.stat_result) -> str:
+    """取得強 ETag（內容 sha256），依 inode、大小與修改時間快取"""
+    cache_key = (
+        stat_result.st_dev, stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns
+    )
+    etag = _etag_cache.get(cache_key)
+    if etag is None:
+        etag = f'"{await asyncio.to_thread(_hash_file, path)}"'
+        _etag_cache[cache_key] = etag
+        if len(_etag_cache) > ETAG_CACHE_SIZE:
+            _etag_cache.popitem(last=False)
+    else:
+        _etag_cache.move_to_end(cache_key)
+    return etag
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match 比對（弱比較）"""
+    if header.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in header.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    解析單一 bytes Range
+
+    Returns:
+        (start, end)，end 不含；多重範圍或格式無效（例如 bytes=5-3）回傳 None
+        （依 RFC 9110 忽略 Range，改回傳完整內容）
+
+    Raises:
+        ValueError: 範圍無法滿足（416）
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+
+    start_str, _, end_str = ranges.strip().partition("-")
+    if not (start_str or end_str) or not all(s.isdigit() for s in (start_str, end_str) if s):
+        return None
+
+    if not start_str:
+        # 後綴範圍：bytes=-500 表示最後 500 bytes
+        suffix_length = int(end_str)
+        if suffix_length == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - suffix_length, 0), size
+
+    start = int(start_str)
+    if end_str and int(end_str) < start:
+        return None
+    if start >= size:
+        raise ValueError("Unsatisfiable range")
+    end = int(end_str) + 1 if end_str else size
+    return start, min(end, size)
+
+
+class UploadFileResponse(Response):
+    """傳送檔案（或其中一段範圍）的回應"""
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        path: Path,
+        start: int,
+        end: int,
+        status_code: int,
+        headers: Dict[str, str],
+        media_type: str,
+    ):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+        self.headers["content-length"] = str(end - start)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if scope["method"].upper() == "HEAD" or self.start == self.end:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        # 伺服器支援零複製傳送時交給核心 sendfile
+        if "http.response.zerocopysend" in (scope.get("extensions") or {}):
+            with open(self.path, "rb") as f:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f.fileno(),
+                    "offset": self.start,
+                    "count": self.end - self.start,
+                    "more_body": False,
+                })
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as f:
+            await f.seek(self.start)
+            remaining = self.end - self.start
+            while True:
+                chunk = await f.read(min(self.chunk_size, remaining)) if remaining > 0 else b""
+                remaining -= len(chunk)
+                more_body = remaining > 0 and bool(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                if not more_body:
+                    break
+
+
+def _file_response(
+    request: Request, path: Path, size: int, headers: Dict[str, str], media_type: str
+) -> Response:
+    """依 Range / If-Range 回傳完整內容（200）、部分內容（206）或 416"""
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == headers["ETag"]):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(
+                status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"}
+            )
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+            return UploadFileResponse(path, start, end, 206, headers, media_type)
+
+    return UploadFileResponse(path, 0, size, 200, headers, media_type)
+
+
+@router.api_route("/uploads/{key:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_upload(key: str, request: Request) -> Response:
+    """
+    提供上傳的照片與聊天圖片
+
+    Args:
+        key: 物件鍵（photos/{user_id}/{filename} 或 chat/{match_id}/{filename}）
+    """
+    not_found = Response(status_code=404)
+
+    # 先解析路徑再檢查前綴，避免 photos/../objects/... 繞過
+    try:
+        backend = file_storage.backend
+        path = backend.path(key)
+        key = path.relative_to(backend.root.resolve()).as_posix()
+    except ValueError:
+        return not_found
+    if not key.startswith(SERVABLE_PREFIXES):
+        return not_found
+
+    try:
+        stat_result = await asyncio.to_thread(os.stat, path)
+    except OSError:
+        return not_found
+    if not stat.S_ISREG(stat_result.st_mode):
+        return not_found
+
+    etag = await _get_etag(path, stat_result)
+    headers = {
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "ETag": etag,
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    media_type = guess_type(path.name)[0] or "application/octet-stream"
+
+    # 交由前端代理傳送檔案內容（Range 亦由代理處理）
+    if settings.UPLOADS_ACCEL_REDIRECT_PREFIX:
+        headers["X-Accel-Redirect"] = f"{settings.UPLOADS_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{key}"
+        return Response(headers=headers, media_type=media_type)
+
+    return _file_response(request, path, stat_result.st_size, headers, media_type)
@@ -22,10 +22,11 @@ from app.websocket.manager import manager
 from app.models.match import Message, Match
 from app.models.user import User
 from app.models.profile import Profile
-from app.models.notification import Notification
 from app.services.content_moderation import ContentModerationService
 from app.services.trust_score import TrustScoreService
+from app.services.notification_service import NotificationService
 from app.services.redis_client import redis_client
+from app.services.spam_burst import SpamBurstDetector
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -401,6 +402,34 @@ async def _check_and_reward_positive_interaction(
         logger.error(f"Error processing positive interaction: {e}")
 
 
+async def _check_spam_burst(
+    match: Match,
+    sender_id: uuid.UUID,
+    parsed: dict,
+    db
+) -> None:
+    """偵測跨配對群發相似內容
+
+    每則文字訊息的指紋記錄在 Redis 滑動窗口，
+    相似內容在窗口內發送到過多配對時扣信任分數（每窗口一次）。
+
+    Args:
+        match: 配對對象
+        sender_id: 發送者 ID
+        parsed: 解析後的訊息資料
+        db: 資料庫 session
+    """
+    if parsed["message_type"] != "TEXT":
+        return
+
+    try:
+        redis = await redis_client.get_connection()
+        await SpamBurstDetector.check_message(redis, db, sender_id, match.id, parsed["content"])
+    except Exception as e:
+        # 不影響訊息發送
+        logger.error(f"Error checking spam burst: {e}")
+
+
 async def _send_message_notification(
     match: Match,
     sender_id: uuid.UUID,
@@ -438,21 +467,16 @@ async def _send_message_notification(
     else:
         preview = message.content[:50] + "..." if len(message.content) > 50 else message.content
 
-    # 持久化通知到資料庫
-    notification = Notification(
+    # 持久化通知到資料庫（同一配對的未讀訊息通知合併為一筆）
+    notification = await NotificationService.record_message(
+        db,
         user_id=receiver_id,
-        type="notification_message",
-        title=f"{sender_name} 傳來新訊息",
-        content=preview,
-        data={
-            "match_id": str(match.id),
-            "sender_id": str(sender_id),
-            "sender_name": sender_name,
-            "message_id": str(message.id)
-        }
+        match_id=match.id,
+        sender_id=sender_id,
+        sender_name=sender_name,
+        preview=preview,
+        message_id=message.id
     )
-    db.add(notification)
-    await db.commit()
     logger.info(f"Persisted notification_message for user {receiver_id_str}")
 
     # 發送 WebSocket 通知（包含 notification_id 讓前端可以標記已讀）
@@ -461,6 +485,7 @@ async def _send_message_notification(
         {
             "type": "notification_message",
             "notification_id": str(notification.id),
+            "group_count": notification.group_count,
             "match_id": str(match.id),
             "sender_id": str(sender_id),
             "sender_name": sender_name,
@@ -728,6 +753,9 @@ async def handle_chat_message(data: dict, sender_id: uuid.UUID):
             # 5.5 正向互動檢查與獎勵
             await _check_and_reward_positive_interaction(match, sender_id, db)
 
+            # 5.6 群發偵測
+            await _check_spam_burst(match, sender_id, parsed, db)
+
             # 6. 離線通知
             await _send_message_notification(match, sender_id, message, db)
 
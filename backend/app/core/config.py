@@ -46,6 +46,86 @@ class Settings(BaseSettings):
     # 檔案上傳
     MAX_UPLOAD_SIZE: int = 5 * 1024 * 1024  # 5MB
     UPLOAD_DIR: str = "uploads"
+    # 圖片處理行程池大小（0 表示不使用行程池，改用執行緒池）
+    IMAGE_PROCESS_WORKERS: int = int(os.getenv("IMAGE_PROCESS_WORKERS", "2"))
+    # 照片響應式變體長邊像素（主圖 1200px 與 200px 縮圖之外，逗號分隔）
+    PHOTO_VARIANT_SIZES: str = os.getenv("PHOTO_VARIANT_SIZES", "400,800")
+    # 探索卡片顯示的照片寬度（像素，已含 2x 裝置像素比）
+    DISCOVERY_CARD_PHOTO_WIDTH: int = int(os.getenv("DISCOVERY_CARD_PHOTO_WIDTH", "800"))
+
+    # 檔案儲存後端：local（UPLOAD_DIR，由應用程式提供 /uploads）或 s3（S3 相容物件儲存）
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "local")
+    S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL", "http://localhost:9000")
+    S3_BUCKET: str = os.getenv("S3_BUCKET", "mergemeet-uploads")
+    S3_ACCESS_KEY: str = os.getenv("S3_ACCESS_KEY", "")
+    S3_SECRET_KEY: str = os.getenv("S3_SECRET_KEY", "")
+    S3_REGION: str = os.getenv("S3_REGION", "us-east-1")
+    # 對外提供圖片的網址（CDN 或公開 bucket），空字串表示 {S3_ENDPOINT_URL}/{S3_BUCKET}
+    S3_PUBLIC_URL: str = os.getenv("S3_PUBLIC_URL", "")
+    # 本地後端由前端代理傳送檔案：設定 nginx internal location 前綴後回傳 X-Accel-Redirect
+    UPLOADS_ACCEL_REDIRECT_PREFIX: str = os.getenv("UPLOADS_ACCEL_REDIRECT_PREFIX", "")
+
+    # 照片自動審核（pHash 比對已拒絕照片與被封禁帳號的照片）
+    PHOTO_HASH_MAX_DISTANCE: int = int(os.getenv("PHOTO_HASH_MAX_DISTANCE", "10"))  # 標記門檻（漢明距離）
+    PHOTO_AUTO_REJECT_SCORE: int = int(os.getenv("PHOTO_AUTO_REJECT_SCORE", "95"))  # 自動拒絕門檻（0-100）
+    PHOTO_HASH_INDEX_TTL_SECONDS: int = int(os.getenv("PHOTO_HASH_INDEX_TTL_SECONDS", "300"))
+    # 管理後台統計快照快取秒數（0 表示不快取）
+    ADMIN_STATS_CACHE_SECONDS: int = int(os.getenv("ADMIN_STATS_CACHE_SECONDS", "60"))
+    # 人工審核租約：領取的待審核照片保留給該管理員的秒數
+    PHOTO_REVIEW_LEASE_SECONDS: int = int(os.getenv("PHOTO_REVIEW_LEASE_SECONDS", "600"))
+    # 自動審核佇列：背景 worker 每批領取的照片數與輪詢間隔（本行程上傳會立即喚醒 worker）、
+    # 領取租約秒數（讀檔失敗時即為重試間隔）、讀檔失敗的重試上限
+    PHOTO_MODERATION_BATCH_SIZE: int = int(os.getenv("PHOTO_MODERATION_BATCH_SIZE", "20"))
+    PHOTO_MODERATION_POLL_INTERVAL_SECONDS: int = int(
+        os.getenv("PHOTO_MODERATION_POLL_INTERVAL_SECONDS", "5")
+    )
+    PHOTO_MODERATION_LEASE_SECONDS: int = int(os.getenv("PHOTO_MODERATION_LEASE_SECONDS", "120"))
+    PHOTO_MODERATION_MAX_ATTEMPTS: int = int(os.getenv("PHOTO_MODERATION_MAX_ATTEMPTS", "5"))
+    # 審核日誌批次寫入：寫入間隔（毫秒）、每批筆數、緩衝上限（超過時丟棄最舊的日誌）
+    MODERATION_LOG_FLUSH_INTERVAL_MS: int = int(
+        os.getenv("MODERATION_LOG_FLUSH_INTERVAL_MS", "500")
+    )
+    MODERATION_LOG_BATCH_SIZE: int = int(os.getenv("MODERATION_LOG_BATCH_SIZE", "200"))
+    MODERATION_LOG_MAX_BUFFER: int = int(os.getenv("MODERATION_LOG_MAX_BUFFER", "10000"))
+    # 敏感詞重新掃描：比對行程池大小（0 表示改用執行緒池）、每段記錄數、回溯的訊息天數、
+    # 工作租約秒數、輪詢其他副本新工作的間隔
+    MODERATION_PROCESS_WORKERS: int = int(os.getenv("MODERATION_PROCESS_WORKERS", "1"))
+    MODERATION_RESCAN_CHUNK_SIZE: int = int(os.getenv("MODERATION_RESCAN_CHUNK_SIZE", "1000"))
+    MODERATION_RESCAN_MESSAGE_DAYS: int = int(os.getenv("MODERATION_RESCAN_MESSAGE_DAYS", "30"))
+    MODERATION_RESCAN_LEASE_SECONDS: int = int(os.getenv("MODERATION_RESCAN_LEASE_SECONDS", "300"))
+    MODERATION_RESCAN_MAX_ATTEMPTS: int = int(os.getenv("MODERATION_RESCAN_MAX_ATTEMPTS", "5"))
+    MODERATION_RESCAN_POLL_INTERVAL_SECONDS: int = int(
+        os.getenv("MODERATION_RESCAN_POLL_INTERVAL_SECONDS", "30")
+    )
+    # 群發偵測：滑動窗口秒數、相似內容發送到多少個不同配對即標記、列入偵測的最短訊息長度（正規化後字數）
+    SPAM_BURST_WINDOW_SECONDS: int = int(os.getenv("SPAM_BURST_WINDOW_SECONDS", "600"))
+    SPAM_BURST_MATCH_THRESHOLD: int = int(os.getenv("SPAM_BURST_MATCH_THRESHOLD", "10"))
+    SPAM_BURST_MIN_LENGTH: int = int(os.getenv("SPAM_BURST_MIN_LENGTH", "20"))
+
+    # 通知合併（同類通知在時間窗口內合併為一筆，減少寫入與推送）
+    NOTIFICATION_COALESCE_WINDOW_SECONDS: int = int(
+        os.getenv("NOTIFICATION_COALESCE_WINDOW_SECONDS", "3600")
+    )  # 儲存合併窗口（1 小時）
+    NOTIFICATION_PUSH_INTERVAL_SECONDS: int = int(
+        os.getenv("NOTIFICATION_PUSH_INTERVAL_SECONDS", "10")
+    )  # 同一分組的即時推送最小間隔
+
+    # 通知保留期限（定期批次刪除過期的已讀通知）
+    NOTIFICATION_RETENTION_DAYS: int = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+    NOTIFICATION_RETENTION_BATCH_SIZE: int = int(
+        os.getenv("NOTIFICATION_RETENTION_BATCH_SIZE", "1000")
+    )
+    NOTIFICATION_RETENTION_INTERVAL_SECONDS: int = int(
+        os.getenv("NOTIFICATION_RETENTION_INTERVAL_SECONDS", "3600")
+    )
+
+    # 訊息分區（messages 依 sent_at 每月一個分區）
+    MESSAGE_PARTITION_MONTHS_AHEAD: int = int(os.getenv("MESSAGE_PARTITION_MONTHS_AHEAD", "3"))
+    MESSAGE_PARTITION_HOT_MONTHS: int = int(os.getenv("MESSAGE_PARTITION_HOT_MONTHS", "6"))
+    MESSAGE_COLD_TABLESPACE: str = os.getenv("MESSAGE_COLD_TABLESPACE", "")  # 空字串表示停用冷熱分層
+    MESSAGE_PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = int(
+        os.getenv("MESSAGE_PARTITION_MAINTENANCE_INTERVAL_SECONDS", "86400")
+    )
 
     # WebSocket 訊息限制
     MAX_MESSAGE_LENGTH: int = int(os.getenv("MAX_MESSAGE_LENGTH", "2000"))  # 即時聊天訊息長度限制
@@ -91,5 +171,10 @@ class Settings(BaseSettings):
                     f"Current length: {len(self.SECRET_KEY)}"
                 )
 
+    @property
+    def photo_variant_sizes(self) -> list[int]:
+        """解析 PHOTO_VARIANT_SIZES 為整數列表"""
+        return [int(size) for size in self.PHOTO_VARIANT_SIZES.split(",") if size.strip()]
+
 
 settings = Settings()
@@ -0,0 +1,34 @@
+"""Keyset 分頁游標工具
+
+游標將排序鍵 (created_at, id) 編碼為不透明字串，
+供通知列表與照片審核佇列等 keyset 分頁共用。
+"""
+from datetime import datetime
+from typing import Tuple
+import base64
+import uuid
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(created_at: datetime, row_id: uuid.UUID) -> str:
+    """將 (created_at, id) 編碼為不透明的分頁游標"""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """解碼分頁游標
+
+    Raises:
+        HTTPException: 游標格式無效
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at_str, id_str = raw.split("|", 1)
+        return datetime.fromisoformat(created_at_str), uuid.UUID(id_str)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="無效的分頁游標"
+        )
@@ -9,9 +9,7 @@ TODO: 全局速率限制（上線前建議完成）
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
-from pathlib import Path
 import logging
 import asyncio
 
@@ -23,8 +21,20 @@ from app.services.redis_client import redis_client, get_redis
 from app.services.token_blacklist import token_blacklist
 from app.services.content_moderation import ContentModerationService
 from app.services.token_invalidator import TokenInvalidator
+from app.services.notification_service import NotificationService
+from app.services.notification_retention import notification_retention
+from app.services.photo_moderation_queue import photo_moderation_queue
+from app.services.moderation_log_writer import moderation_log_writer
+from app.services.moderation_rescan import moderation_rescan
+from app.services.admin_stats import AdminStatsService
+from app.services.message_partitions import message_partitions
+from app.services.process_executor import image_executor, moderation_executor
+from app.services.file_storage import file_storage
 from app.api.auth import verification_codes
-from app.api import auth, profile, discovery, safety, websocket, messages, admin, moderation, notifications, photo_moderation
+from app.api import (
+    auth, profile, discovery, safety, websocket, messages, admin, moderation, notifications,
+    photo_moderation, uploads,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -53,7 +63,10 @@ async def lifespan(app: FastAPI):
         # 設置 Token 全局失效服務 Redis 連線
         TokenInvalidator.set_redis(redis_conn)
 
-        logger.info("✅ Redis 已整合至 Token 黑名單、驗證碼存儲、內容審核快取、Token 失效服務")
+        # 設置管理後台統計快取 Redis 連線
+        AdminStatsService.set_redis(redis_conn)
+
+        logger.info("✅ Redis 已整合至 Token 黑名單、驗證碼存儲、內容審核快取、Token 失效服務、統計快取")
     except Exception as e:
         logger.warning(f"⚠️ Redis 連線失敗，服務將使用內存回退模式: {e}")
 
@@ -63,6 +76,25 @@ async def lifespan(app: FastAPI):
     # 啟動 WebSocket 心跳和清理任務
     await manager.start_background_tasks()
 
+    # 啟動通知保留期限清理任務
+    await notification_retention.start_cleanup_task()
+
+    # 啟動訊息分區維護任務（預建分區、冷熱分層）
+    await message_partitions.start_maintenance_task()
+
+    # 啟動圖片處理與審核比對行程池
+    image_executor.start()
+    moderation_executor.start()
+
+    # 啟動照片自動審核 worker（使用圖片處理行程池）
+    await photo_moderation_queue.start_worker()
+
+    # 啟動審核日誌批次寫入器
+    await moderation_log_writer.start_writer()
+
+    # 啟動敏感詞重新掃描 worker（使用審核比對行程池）
+    await moderation_rescan.start_worker()
+
     yield
     # 關閉時執行
     logger.info("👋 MergeMeet 關閉中...")
@@ -70,6 +102,31 @@ async def lifespan(app: FastAPI):
     # 停止 Token 黑名單清理任務
     await token_blacklist.stop_cleanup_task()
 
+    # 停止通知保留期限清理任務
+    await notification_retention.stop_cleanup_task()
+
+    # 停止訊息分區維護任務
+    await message_partitions.stop_maintenance_task()
+
+    # 停止照片自動審核 worker
+    await photo_moderation_queue.stop_worker()
+
+    # 停止敏感詞重新掃描 worker（未提交的一段於租約過期後續跑）
+    await moderation_rescan.stop_worker()
+
+    # 停止審核日誌寫入器（寫入剩餘日誌）
+    await moderation_log_writer.stop_writer()
+
+    # 關閉圖片處理與審核比對行程池
+    await image_executor.shutdown()
+    await moderation_executor.shutdown()
+
+    # 關閉儲存後端連線
+    await file_storage.close()
+
+    # 取消尚未補推的合併通知任務
+    await NotificationService.shutdown()
+
     await redis_client.close()
     await close_db()
 
@@ -106,11 +163,6 @@ app.add_middleware(
 # 在每個已認證請求成功後自動更新 Profile.last_active
 app.add_middleware(LastActiveMiddleware)
 
-# 靜態檔案（照片上傳）
-uploads_dir = Path(settings.UPLOAD_DIR)
-uploads_dir.mkdir(parents=True, exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=str(uploads_dir)), name="uploads")
-
 
 # ==================== 路由 ====================
 
@@ -182,6 +234,11 @@ app.include_router(moderation.router, prefix=f"{settings.API_V1_PREFIX}/moderati
 app.include_router(notifications.router, tags=["通知"])
 app.include_router(photo_moderation.router, prefix=f"{settings.API_V1_PREFIX}/admin/photos", tags=["照片審核"])
 
+# 上傳檔案（照片、聊天圖片）
+# 僅本地儲存後端由應用程式提供；s3 後端的圖片由物件儲存 / CDN 直接提供
+if settings.STORAGE_BACKEND == "local":
+    app.include_router(uploads.router, tags=["上傳檔案"])
+
 # 未來將加入的路由
 # app.include_router(matches.router, prefix=f"{settings.API_V1_PREFIX}/matches", tags=["配對管理"])
 
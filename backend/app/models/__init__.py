@@ -3,7 +3,10 @@ from app.models.user import User
 from app.models.profile import Profile, Photo, InterestTag, profile_interests
 from app.models.match import Like, Match, Message, BlockedUser
 from app.models.report import Report
-from app.models.moderation import SensitiveWord, ContentAppeal, ModerationLog
+from app.models.moderation import (
+    SensitiveWord, ContentAppeal, ModerationLog, PhotoHashBlocklist, PhotoModerationJob,
+    ModerationRescanJob,
+)
 from app.models.notification import Notification
 
 __all__ = [
@@ -20,5 +23,8 @@ __all__ = [
     "SensitiveWord",
     "ContentAppeal",
     "ModerationLog",
+    "PhotoHashBlocklist",
+    "PhotoModerationJob",
+    "ModerationRescanJob",
     "Notification",
 ]
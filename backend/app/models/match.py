@@ -1,8 +1,11 @@
 """配對相關資料模型"""
-from sqlalchemy import Column, String, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, Text
+from sqlalchemy import (
+    Column, String, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, Text, Index, DDL, event
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
 import uuid
 
 from app.core.database import Base
@@ -133,7 +136,13 @@ class Match(Base):
 
 
 class Message(Base):
-    """聊天訊息"""
+    """聊天訊息
+
+    依 sent_at 做月份 Range Partitioning（messages_yYYYYmMM），
+    近期聊天查詢只會命中少量熱分區，舊分區可移至較便宜的 tablespace。
+    分區鍵必須包含在主鍵中，因此主鍵為 (id, sent_at)。
+    分區的建立與冷熱分層由 app/services/message_partitions.py 維護。
+    """
     __tablename__ = "messages"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -157,16 +166,38 @@ class Message(Base):
     is_read = Column(DateTime(timezone=True), nullable=True)  # 讀取時間
     deleted_at = Column(DateTime(timezone=True), nullable=True)  # 刪除時間
 
-    # 時間戳記
-    sent_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # 時間戳記（分區鍵）
+    sent_at = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        index=True
+    )
 
     # 關聯
     match = relationship("Match", back_populates="messages")
 
+    __table_args__ = (
+        # 聊天記錄：WHERE match_id = ? ORDER BY sent_at DESC
+        Index('ix_messages_match_sent', 'match_id', 'sent_at'),
+        # 未讀計數：WHERE match_id = ? AND sender_id = ? AND is_read IS NULL
+        Index('ix_messages_match_sender_read', 'match_id', 'sender_id', 'is_read'),
+        {"postgresql_partition_by": "RANGE (sent_at)"},
+    )
+
     def __repr__(self):
         return f"<Message {self.id} from {self.sender_id}>"
 
 
+# 預設分區：接住尚未建立月份分區的訊息（正常情況下應保持為空）
+event.listen(
+    Message.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS messages_default PARTITION OF messages DEFAULT")
+)
+
+
 class BlockedUser(Base):
     """封鎖用戶記錄"""
     __tablename__ = "blocked_users"
@@ -1,5 +1,5 @@
 """內容審核相關資料模型"""
-from sqlalchemy import Column, String, DateTime, Text, Boolean, ForeignKey
+from sqlalchemy import Column, String, DateTime, Text, Boolean, ForeignKey, BigInteger, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import uuid
@@ -136,3 +136,120 @@ class ModerationLog(Base):
 
     def __repr__(self):
         return f"<ModerationLog {self.id} for user {self.user_id}>"
+
+
+class PhotoHashBlocklist(Base):
+    """照片感知雜湊黑名單 - 已拒絕照片的 pHash
+
+    照片被拒絕後使用者通常會刪除並重新上傳相同或微調過的圖片，
+    因此雜湊獨立保存，不隨照片記錄刪除。
+    """
+    __tablename__ = "photo_hash_blocklist"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # 64-bit pHash（以有號整數儲存）
+    perceptual_hash = Column(BigInteger, nullable=False)
+
+    # 來源（REJECTED）
+    reason = Column(String(20), nullable=False, default="REJECTED")
+
+    # 來源照片（照片可能已刪除，不設外鍵）
+    photo_id = Column(UUID(as_uuid=True), nullable=True)
+
+    # 上傳者
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True
+    )
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<PhotoHashBlocklist {self.perceptual_hash} ({self.reason})>"
+
+
+class PhotoModerationJob(Base):
+    """照片自動審核佇列 - 新上傳待自動審核的照片
+
+    與照片記錄在同一個事務寫入；背景 worker 以 FOR UPDATE SKIP LOCKED
+    批次領取並設定租約（lease_expires_at），處理完成後刪除。
+    讀取失敗的照片保留在佇列中，租約到期後重試，超過重試上限才放棄。
+    """
+    __tablename__ = "photo_moderation_queue"
+
+    photo_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("photos.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    enqueued_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
+
+    # 已領取次數與目前租約（NULL 表示尚未領取）
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<PhotoModerationJob {self.photo_id}>"
+
+
+class ModerationRescanJob(Base):
+    """敏感詞重新掃描工作 - 新增敏感詞後回溯檢查既有個人檔案與近期訊息
+
+    以 keyset（cursor_sent_at, cursor_id）分段處理，每段提交後更新游標，
+    中斷後可從游標續跑；執行中的工作以租約（lease_owner、lease_expires_at）
+    保留給單一 worker，租約過期後由其他 worker 接手；處理失敗累計達
+    MODERATION_RESCAN_MAX_ATTEMPTS 次後改為 FAILED，不再重試。
+    """
+    __tablename__ = "moderation_rescan_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # 掃描對象：PROFILES, MESSAGES
+    target = Column(String(20), nullable=False)
+
+    # 狀態：PENDING, RUNNING, COMPLETED, CANCELLED, FAILED
+    status = Column(String(20), nullable=False, default="PENDING", index=True)
+
+    # 只比對這些敏感詞（JSON array of UUIDs as string）；NULL 表示所有啟用的敏感詞
+    word_ids = Column(Text, nullable=True)
+
+    # 訊息掃描範圍（PROFILES 不使用）：起點，與終點（建立或最後一次併入新詞的時間）
+    since = Column(DateTime(timezone=True), nullable=True)
+    until = Column(DateTime(timezone=True), nullable=True)
+
+    # keyset 游標：最後處理的記錄（PROFILES 只使用 cursor_id）
+    cursor_sent_at = Column(DateTime(timezone=True), nullable=True)
+    cursor_id = Column(UUID(as_uuid=True), nullable=True)
+
+    # 進度
+    scanned_count = Column(BigInteger, nullable=False, default=0)
+    flagged_count = Column(BigInteger, nullable=False, default=0)
+
+    # 執行租約
+    lease_owner = Column(UUID(as_uuid=True), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    # 處理失敗次數與最近一次錯誤（重試成功後保留，供排查）
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text, nullable=True)
+
+    # 觸發者（管理員）
+    created_by = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True
+    )
+
+    # 時間戳記
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<ModerationRescanJob {self.id} {self.target} ({self.status})>"
@@ -1,8 +1,8 @@
 """通知模型 - 持久化用戶通知"""
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy import Column, String, Text, Boolean, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 import uuid
 from datetime import datetime, timezone
 
@@ -16,6 +16,11 @@ class Notification(Base):
     - notification_message: 新訊息通知
     - notification_match: 新配對通知
     - notification_liked: 有人喜歡你通知
+
+    同類通知合併（Coalescing）：
+    - group_key 相同的未讀通知在時間窗口內合併為一筆
+    - group_count 記錄合併的事件數（例如「12 人喜歡你！」）
+    - updated_at 記錄最後一次合併的時間
     """
     __tablename__ = "notifications"
 
@@ -43,8 +48,14 @@ class Notification(Base):
     # notification_liked: {} (保持神秘感，不透露是誰)
     data = Column(JSONB, default=dict)
 
+    # 合併分組（None 表示不參與合併，例如配對通知）
+    # notification_liked: "liked"
+    # notification_message: "message:{match_id}"
+    group_key = Column(String(100), nullable=True)
+    group_count = Column(Integer, nullable=False, default=1, server_default="1")
+
     # 狀態
-    is_read = Column(Boolean, default=False, index=True)
+    is_read = Column(Boolean, default=False)
 
     # 時間戳記
     created_at = Column(
@@ -52,6 +63,7 @@ class Notification(Base):
         default=lambda: datetime.now(timezone.utc),
         server_default=func.now()
     )
+    updated_at = Column(DateTime(timezone=True), nullable=True)
 
     # 關聯
     user = relationship("User", back_populates="notifications")
@@ -60,6 +72,13 @@ class Notification(Base):
     __table_args__ = (
         Index('idx_notifications_user_unread', 'user_id', 'is_read'),
         Index('idx_notifications_user_created', 'user_id', 'created_at'),
+        Index('idx_notifications_user_group', 'user_id', 'group_key', 'created_at'),
+        # 保留期限清理：只索引已讀通知
+        Index(
+            'idx_notifications_read_created',
+            'created_at',
+            postgresql_where=text('is_read = true')
+        ),
     )
 
     def __repr__(self):
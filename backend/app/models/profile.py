@@ -1,6 +1,8 @@
 """個人檔案相關資料模型"""
-from sqlalchemy import Column, String, Text, Integer, Boolean, ForeignKey, DateTime, Table
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    Column, String, Text, Integer, Boolean, ForeignKey, DateTime, Table, BigInteger, Index, text
+)
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from geoalchemy2 import Geography
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -87,6 +89,10 @@ class Photo(Base):
     height = Column(Integer)
     mime_type = Column(String(50))
 
+    # 響應式變體清單（由小到大，最後一個為主圖），None 表示舊照片僅有 url/thumbnail_url
+    # [{"width": 400, "height": 300, "jpeg": "/uploads/...", "webp": "/uploads/..."}]
+    variants = Column(JSONB, nullable=True)
+
     # 審核相關欄位
     moderation_status = Column(
         String(20),
@@ -102,9 +108,18 @@ class Photo(Base):
     )
     reviewed_at = Column(DateTime(timezone=True), nullable=True)
 
+    # 審核租約：管理員領取待審核照片後，租約期間其他管理員不會領到同一張
+    review_claimed_by = Column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True
+    )
+    review_claim_expires_at = Column(DateTime(timezone=True), nullable=True)
+
     # 預留自動審核擴展
     auto_moderation_score = Column(Integer, nullable=True)  # 0-100
     auto_moderation_labels = Column(Text, nullable=True)  # JSON 格式
+    perceptual_hash = Column(BigInteger, nullable=True)  # 64-bit pHash（有號整數）
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -112,6 +127,16 @@ class Photo(Base):
     profile = relationship("Profile", back_populates="photos")
     reviewer = relationship("User", foreign_keys=[reviewed_by])
 
+    __table_args__ = (
+        # 審核佇列：待審核照片依 (created_at, id) keyset 排序領取
+        Index(
+            'idx_photos_pending_created',
+            'created_at',
+            'id',
+            postgresql_where=text("moderation_status = 'PENDING'")
+        ),
+    )
+
     def __repr__(self):
         return f"<Photo {self.id}>"
 
@@ -5,6 +5,13 @@ from datetime import datetime
 from uuid import UUID
 
 
+class PhotoSources(BaseModel):
+    """照片的響應式來源（供 <picture> / srcset 使用）"""
+    src: str = Field(..., description="卡片尺寸的 JPEG URL")
+    jpeg_srcset: Optional[str] = Field(None, description="JPEG srcset")
+    webp_srcset: Optional[str] = Field(None, description="WebP srcset")
+
+
 class ProfileCard(BaseModel):
     """探索卡片顯示的個人檔案資訊"""
     model_config = ConfigDict(from_attributes=True)
@@ -17,7 +24,8 @@ class ProfileCard(BaseModel):
     location_name: Optional[str]
     distance_km: Optional[float] = Field(None, description="距離（公里）")
     interests: List[str] = []
-    photos: List[str] = []  # 照片 URL 列表
+    photos: List[str] = []  # 照片 URL 列表（卡片尺寸）
+    photo_sources: List[PhotoSources] = []  # 響應式來源，與 photos 一一對應
     match_score: Optional[float] = Field(None, description="配對分數（0-100）")
 
 
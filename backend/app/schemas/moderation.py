@@ -141,3 +141,36 @@ class ModerationStatsResponse(BaseModel):
     total_violations_this_week: int
     total_violations_this_month: int
     most_triggered_words: List[dict]  # [{word: str, count: int}]
+
+
+# ============ Rescan Job Schemas ============
+
+class ModerationRescanJobCreate(BaseModel):
+    """建立重新掃描工作請求"""
+    targets: List[str] = Field(["PROFILES", "MESSAGES"], description="掃描對象: PROFILES, MESSAGES")
+    word_ids: Optional[List[UUID]] = Field(None, description="只比對這些敏感詞（未指定時比對所有啟用的敏感詞）")
+    since_days: Optional[int] = Field(None, ge=1, le=3650, description="回溯的訊息天數")
+
+
+class ModerationRescanJobResponse(BaseModel):
+    """重新掃描工作進度回應"""
+    id: UUID
+    target: str
+    status: str
+    word_ids: Optional[List[str]]
+    since: Optional[datetime]
+    until: Optional[datetime]
+    scanned_count: int
+    flagged_count: int
+    items_per_second: Optional[float]
+    cursor: Optional[str]
+    attempts: int
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+
+class ModerationRescanJobListResponse(BaseModel):
+    """重新掃描工作列表回應"""
+    jobs: List[ModerationRescanJobResponse]
@@ -13,15 +13,24 @@ class NotificationResponse(BaseModel):
     title: str
     content: Optional[str] = None
     data: Dict[str, Any] = Field(default_factory=dict)
+    group_count: int = Field(default=1, description="合併的事件數（例如 12 人喜歡你）")
     is_read: bool
     created_at: datetime
+    updated_at: Optional[datetime] = Field(default=None, description="最後一次合併的時間")
 
 
 class NotificationListResponse(BaseModel):
-    """通知列表回應"""
+    """通知列表回應
+
+    支援 Cursor-based pagination：
+    - 初次載入：不傳 cursor，取最新 N 筆
+    - 載入更多：傳入 next_cursor，取更早的通知
+    """
     notifications: List[NotificationResponse]
-    total: int = Field(..., description="總通知數")
-    unread_count: int = Field(..., description="未讀通知數")
+    total: Optional[int] = Field(default=None, description="總通知數（使用 cursor 時省略）")
+    unread_count: Optional[int] = Field(default=None, description="未讀通知數（使用 cursor 時省略）")
+    has_more: bool = Field(default=False, description="是否還有更早的通知")
+    next_cursor: Optional[str] = Field(default=None, description="下一頁游標")
 
 
 class UnreadCountResponse(BaseModel):
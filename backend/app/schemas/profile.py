@@ -97,6 +97,14 @@ class PhotoModerationStatusEnum(str, Enum):
     REJECTED = "REJECTED"
 
 
+class PhotoVariant(BaseModel):
+    """照片響應式變體"""
+    width: int = Field(..., description="寬度（像素）")
+    height: int = Field(..., description="高度（像素）")
+    jpeg: str = Field(..., description="JPEG URL")
+    webp: Optional[str] = Field(None, description="WebP URL")
+
+
 class PhotoResponse(BaseModel):
     """照片回應"""
     model_config = ConfigDict(from_attributes=True)
@@ -104,6 +112,7 @@ class PhotoResponse(BaseModel):
     id: str = Field(..., description="照片 ID")
     url: str = Field(..., description="照片 URL")
     thumbnail_url: Optional[str] = Field(None, description="縮圖 URL")
+    variants: List[PhotoVariant] = Field(default=[], description="響應式變體（由小到大）")
     display_order: int = Field(..., description="顯示順序")
     is_profile_picture: bool = Field(..., description="是否為頭像")
     moderation_status: str = Field(..., description="審核狀態")
@@ -0,0 +1,196 @@
+"""管理後台統計服務 - 單次查詢聚合與短期快取
+
+每個統計面板只發出一條 SQL：每張表以 COUNT(*) FILTER (WHERE ...) 一次掃描
+算出所有分項，各表的單列聚合結果再以 CROSS JOIN 合併為一列。
+
+統計結果以快照形式快取 ADMIN_STATS_CACHE_SECONDS 秒：
+- 有 Redis 時快取於 Redis（所有副本共用，多位管理員同時刷新只計算一次）
+- Redis 不可用時退回本行程記憶體快取
+- 審核、封禁等會改變統計的操作呼叫 invalidate() 讓下次查詢重新計算
+
+Redis Key 設計：
+- admin_stats:{name} - JSON 快照（TTL: ADMIN_STATS_CACHE_SECONDS）
+"""
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import json
+import logging
+import time
+
+import redis.asyncio as aioredis
+from sqlalchemy import func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.match import BlockedUser, Match, Message
+from app.models.moderation import ContentAppeal, ModerationLog, SensitiveWord
+from app.models.report import Report
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# 統計快照名稱
+STATS_DASHBOARD = "dashboard"
+STATS_MODERATION = "moderation"
+STATS_PHOTOS = "photos"
+
+
+def _cross_join(*subqueries):
+    """將多個單列聚合子查詢合併為一列"""
+    joined = subqueries[0]
+    for subquery in subqueries[1:]:
+        joined = joined.join(subquery, true())
+    return select(*subqueries).select_from(joined)
+
+
+class AdminStatsService:
+    """管理後台統計服務"""
+
+    _redis: Optional[aioredis.Redis] = None
+
+    # 記憶體快取：{name: (過期時間 monotonic, 統計)}
+    _local_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    @classmethod
+    def set_redis(cls, redis_conn: aioredis.Redis) -> None:
+        """設置 Redis 連線"""
+        cls._redis = redis_conn
+        logger.info("AdminStatsService Redis connection configured")
+
+    @classmethod
+    def _get_key(cls, name: str) -> str:
+        """獲取 Redis Key"""
+        return f"admin_stats:{name}"
+
+    @classmethod
+    async def get_cached(
+        cls,
+        name: str,
+        loader: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """取得統計快照，過期時以 loader 重新計算
+
+        Args:
+            name: 快照名稱
+            loader: 計算統計的協程函式
+
+        Returns:
+            統計數據字典
+        """
+        ttl = settings.ADMIN_STATS_CACHE_SECONDS
+        if ttl <= 0:
+            return await loader()
+
+        if cls._redis:
+            try:
+                cached = await cls._redis.get(cls._get_key(name))
+                if cached is not None:
+                    return json.loads(cached)
+            except aioredis.RedisError as e:
+                logger.warning(f"Failed to read admin stats cache {name}: {e}")
+        else:
+            entry = cls._local_cache.get(name)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+
+        stats = await loader()
+
+        if cls._redis:
+            try:
+                await cls._redis.setex(cls._get_key(name), ttl, json.dumps(stats))
+            except aioredis.RedisError as e:
+                logger.warning(f"Failed to write admin stats cache {name}: {e}")
+        else:
+            cls._local_cache[name] = (time.monotonic() + ttl, stats)
+
+        return stats
+
+    @classmethod
+    async def invalidate(cls, *names: str) -> None:
+        """清除統計快照（不指定名稱時清除全部）"""
+        names = names or (STATS_DASHBOARD, STATS_MODERATION, STATS_PHOTOS)
+        for name in names:
+            cls._local_cache.pop(name, None)
+
+        if cls._redis:
+            try:
+                await cls._redis.delete(*[cls._get_key(name) for name in names])
+            except aioredis.RedisError as e:
+                logger.warning(f"Failed to invalidate admin stats cache: {e}")
+
+    @classmethod
+    async def get_dashboard_stats(cls, db: AsyncSession) -> Dict[str, int]:
+        """
+        計算管理後台統計（單次查詢）
+
+        Returns:
+            用戶、配對、訊息、舉報、封鎖統計
+        """
+        users = select(
+            func.count().label("total_users"),
+            func.count().filter(User.is_active.is_(True)).label("active_users"),
+            func.count().filter(User.is_active.is_(False)).label("banned_users"),
+        ).select_from(User).subquery()
+
+        matches = select(
+            func.count().label("total_matches"),
+            func.count().filter(Match.status == "ACTIVE").label("active_matches"),
+        ).select_from(Match).subquery()
+
+        messages = select(
+            func.count().label("total_messages"),
+        ).select_from(Message).subquery()
+
+        reports = select(
+            func.count().label("total_reports"),
+            func.count().filter(Report.status == "PENDING").label("pending_reports"),
+        ).select_from(Report).subquery()
+
+        blocked = select(
+            func.count().label("total_blocked_users"),
+        ).select_from(BlockedUser).subquery()
+
+        result = await db.execute(_cross_join(users, matches, messages, reports, blocked))
+        return dict(result.one()._mapping)
+
+    @classmethod
+    async def get_moderation_stats(cls, db: AsyncSession) -> Dict[str, int]:
+        """
+        計算內容審核統計（單次查詢）
+
+        Returns:
+            敏感詞、申訴、違規統計
+        """
+        now = datetime.now()
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        week_start = now - timedelta(days=7)
+        month_start = now - timedelta(days=30)
+
+        words = select(
+            func.count().label("total_sensitive_words"),
+            func.count().filter(SensitiveWord.is_active.is_(True)).label("active_sensitive_words"),
+        ).select_from(SensitiveWord).subquery()
+
+        appeals = select(
+            func.count().label("total_appeals"),
+            func.count().filter(ContentAppeal.status == "PENDING").label("pending_appeals"),
+            func.count().filter(ContentAppeal.status == "APPROVED").label("approved_appeals"),
+            func.count().filter(ContentAppeal.status == "REJECTED").label("rejected_appeals"),
+        ).select_from(ContentAppeal).subquery()
+
+        # 只掃描近 30 天的違規記錄（created_at 索引），今日 / 本週再以 FILTER 細分
+        violations = select(
+            func.count().filter(
+                ModerationLog.created_at >= today_start
+            ).label("total_violations_today"),
+            func.count().filter(
+                ModerationLog.created_at >= week_start
+            ).label("total_violations_this_week"),
+            func.count().label("total_violations_this_month"),
+        ).select_from(ModerationLog).where(
+            ModerationLog.is_approved.is_(False),
+            ModerationLog.created_at >= month_start,
+        ).subquery()
+
+        result = await db.execute(_cross_join(words, appeals, violations))
+        return dict(result.one()._mapping)
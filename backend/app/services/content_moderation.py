@@ -5,8 +5,12 @@
 
 Redis Key 設計：
 - moderation:words - 敏感詞列表 (value: JSON 序列化, TTL: 300 秒)
+- moderation:words:version - 敏感詞版本號（管理員增刪改時 INCR，不過期）
+
+編譯後的比對器保存在行程記憶體中，穩態審核不需任何網路呼叫；
+每 _version_poll_interval 秒讀取一次版本號，版本改變時才重新載入與編譯。
 """
-from typing import Tuple, List, Optional, Dict
+from typing import Tuple, List, Optional, Dict, Sequence
 from collections import OrderedDict
 import re
 from datetime import datetime
@@ -16,15 +20,28 @@ import uuid
 import json
 import asyncio
 import logging
+import time
 
 import redis.asyncio as aioredis
 
-from app.models.moderation import SensitiveWord, ModerationLog
+from app.models.moderation import SensitiveWord
+from app.services.moderation_log_writer import moderation_log_writer
+from app.services.text_normalizer import (
+    normalize_text, normalize_with_offsets, original_span, replace_spans
+)
+from app.services.word_matcher import SensitiveWordMatcher
 
 logger = logging.getLogger(__name__)
 
+# 清理內容時移除的連結
+URL_PATTERN = re.compile(r'(?:http|https)://\S+', re.IGNORECASE)
+
+# 審核動作的嚴重程度（合併多個結果時取最嚴重者）
+ACTION_PRIORITY = {"APPROVED": 0, "WARN": 1, "REJECT": 2, "AUTO_BAN": 3}
+
 # Redis Key 常量
 REDIS_KEY_SENSITIVE_WORDS = "moderation:words"
+REDIS_KEY_SENSITIVE_WORDS_VERSION = "moderation:words:version"
 
 
 class ContentModerationService:
@@ -45,6 +62,13 @@ class ContentModerationService:
     _max_cache_size: int = 500  # 最大快取項數
     _cache_lock: Optional[asyncio.Lock] = None  # 快取鎖（延遲初始化）
 
+    # 由目前快取世代的敏感詞編譯的比對器（clear_cache 或版本改變時重建）
+    _matcher: Optional[SensitiveWordMatcher] = None
+    _matcher_version: Optional[int] = None  # 比對器對應的 Redis 版本號
+    _matcher_built_at: float = 0.0  # 比對器載入時間（monotonic）
+    _matcher_checked_at: float = 0.0  # 上次確認版本的時間（monotonic）
+    _version_poll_interval: float = 5.0  # 版本號輪詢間隔（秒）
+
     # Session factory（供測試注入）
     _session_factory: Optional[async_sessionmaker] = None
 
@@ -57,6 +81,13 @@ class ContentModerationService:
         r'\$\d+|NT\$?\d+|USD?\d+',  # 金額
     ]
 
+    # 所有可疑模式合併為一個具名群組的正則，一次掃描即可得知命中哪些模式；
+    # 各模式的起始字元互不相同，同一位置最多只有一個模式能匹配
+    _suspicious_scanner = re.compile(
+        "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(SUSPICIOUS_PATTERNS)),
+        re.IGNORECASE
+    )
+
     @classmethod
     def _get_lock(cls) -> asyncio.Lock:
         """獲取或創建快取鎖（延遲初始化避免事件循環問題）"""
@@ -235,18 +266,7 @@ class ContentModerationService:
             words = result.scalars().all()
 
             # 序列化為字典（避免 SQLAlchemy DetachedInstanceError）
-            words_data = [
-                {
-                    "id": str(w.id),
-                    "word": w.word,
-                    "category": w.category,
-                    "severity": w.severity,
-                    "action": w.action,
-                    "is_regex": w.is_regex,
-                    "description": w.description
-                }
-                for w in words
-            ]
+            words_data = [cls.serialize_word(w) for w in words]
 
             # 4. 存入 Redis
             await cls._cache_to_redis(words_data)
@@ -256,61 +276,111 @@ class ContentModerationService:
 
             return words_data
 
+    @staticmethod
+    def serialize_word(word: SensitiveWord) -> Dict:
+        """將敏感詞序列化為比對器使用的字典"""
+        return {
+            "id": str(word.id),
+            "word": word.word,
+            "category": word.category,
+            "severity": word.severity,
+            "action": word.action,
+            "is_regex": word.is_regex,
+            "description": word.description
+        }
+
     @classmethod
     async def clear_cache(cls):
         """清除敏感詞快取（Redis + 內存）"""
-        # 清除 Redis 快取
+        # 清除 Redis 快取並遞增版本號，其他行程輪詢到新版本後重建比對器
         if cls._redis and cls._use_redis:
             try:
                 await cls._redis.delete(REDIS_KEY_SENSITIVE_WORDS)
+                await cls._redis.incr(REDIS_KEY_SENSITIVE_WORDS_VERSION)
                 logger.info("Redis cache cleared for sensitive words")
             except aioredis.RedisError as e:
                 logger.warning(f"Failed to clear Redis cache: {e}")
 
-        # 清除內存快取
+        # 清除內存快取與比對器
         async with cls._get_lock():
             cls._cache.clear()
             cls._cache_time.clear()
+            cls._matcher = None
             logger.info("Memory cache cleared")
 
     @classmethod
-    def _match_sensitive_word(
-        cls,
-        word_obj: Dict,
-        content: str,
-        content_lower: str
-    ) -> bool:
-        """匹配單個敏感詞
+    async def _get_words_version(cls) -> Optional[int]:
+        """讀取 Redis 中的敏感詞版本號
+
+        Returns:
+            版本號（尚未設定時為 0），未使用 Redis 時為 None
+        """
+        if not (cls._redis and cls._use_redis):
+            return None
+
+        try:
+            version = await cls._redis.get(REDIS_KEY_SENSITIVE_WORDS_VERSION)
+            return int(version) if version else 0
+        except aioredis.RedisError as e:
+            logger.warning(
+                f"Redis unavailable for sensitive word version, "
+                f"falling back to memory: {e}"
+            )
+            cls._use_redis = False
+            return None
+
+    @classmethod
+    async def _get_matcher(cls, db: AsyncSession) -> SensitiveWordMatcher:
+        """取得敏感詞比對器（行程內快取）
+
+        - 距上次確認未滿 _version_poll_interval 秒：直接使用，不需網路呼叫
+        - 之後讀取一次版本號；版本未變且未超過快取 TTL 時沿用
+        - 版本改變、超過 TTL（涵蓋直接修改資料庫的情況）或 clear_cache 後才重新載入；
+          載入的列表與目前相同時不重新編譯
 
         Args:
-            word_obj: 敏感詞字典
-            content: 原始內容
-            content_lower: 小寫內容
+            db: 資料庫 session
 
         Returns:
-            是否匹配成功
+            SensitiveWordMatcher
         """
-        if word_obj["is_regex"]:
-            try:
-                pattern = re.compile(word_obj["word"], re.IGNORECASE)
-                return bool(pattern.search(content))
-            except re.error:
-                return False
-        return word_obj["word"] in content_lower
+        now = time.monotonic()
+        matcher = cls._matcher
+        if matcher is not None and now - cls._matcher_checked_at < cls._version_poll_interval:
+            return matcher
+
+        # 先讀版本號再載入列表：載入期間版本若再改變，下次輪詢仍會重建
+        version = await cls._get_words_version()
+        if (
+            matcher is not None
+            and version == cls._matcher_version
+            and now - cls._matcher_built_at < cls._cache_ttl
+        ):
+            cls._matcher_checked_at = now
+            return matcher
+
+        words = await cls._load_sensitive_words(db)
+        if matcher is None or (matcher.words is not words and matcher.words != words):
+            matcher = SensitiveWordMatcher(words)
+            logger.info(f"Sensitive word matcher compiled ({len(words)} words, version {version})")
+
+        cls._matcher = matcher
+        cls._matcher_version = version
+        cls._matcher_built_at = now
+        cls._matcher_checked_at = now
+        return matcher
 
     @classmethod
     def _check_sensitive_words(
         cls,
-        sensitive_words: List[Dict],
-        content: str,
-        content_lower: str
+        matcher: SensitiveWordMatcher,
+        normalized: str
     ) -> Tuple[List[str], List[uuid.UUID], Optional[str], str]:
         """檢查所有敏感詞
 
         Args:
-            sensitive_words: 敏感詞列表
-            content: 原始內容
-            content_lower: 小寫內容
+            matcher: 敏感詞比對器
+            normalized: 正規化後的內容
 
         Returns:
             (violations, triggered_word_ids, max_severity, action_to_take)
@@ -321,9 +391,8 @@ class ContentModerationService:
         action_to_take = "APPROVED"
         severity_order = {"LOW": 1, "MEDIUM": 2, "HIGH": 3, "CRITICAL": 4}
 
-        for word_obj in sensitive_words:
-            if not cls._match_sensitive_word(word_obj, content, content_lower):
-                continue
+        for index in matcher.match(normalized):
+            word_obj = matcher.words[index]
 
             violations.append(f"{word_obj['category']}: {word_obj['word']}")
             triggered_word_ids.append(uuid.UUID(word_obj["id"]))
@@ -343,14 +412,14 @@ class ContentModerationService:
     @classmethod
     def _check_suspicious_patterns(
         cls,
-        content: str,
+        normalized: str,
         current_violations: List[str],
         current_action: str
     ) -> Tuple[List[str], str]:
         """檢查可疑模式
 
         Args:
-            content: 原始內容
+            normalized: 正規化後的內容
             current_violations: 當前違規列表
             current_action: 當前動作
 
@@ -360,15 +429,30 @@ class ContentModerationService:
         violations = current_violations.copy()
         action_to_take = current_action
 
-        for pattern in cls.SUSPICIOUS_PATTERNS:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            if matches:
-                violations.append(f"包含可疑內容: {pattern}")
-                if action_to_take == "APPROVED":
-                    action_to_take = "WARN"
+        for index in cls._find_suspicious_patterns(normalized):
+            violations.append(f"包含可疑內容: {cls.SUSPICIOUS_PATTERNS[index]}")
+            if action_to_take == "APPROVED":
+                action_to_take = "WARN"
 
         return violations, action_to_take
 
+    @classmethod
+    def _find_suspicious_patterns(cls, normalized: str) -> List[int]:
+        """以合併的正則掃描一次，回傳命中的可疑模式索引（依 SUSPICIOUS_PATTERNS 順序）
+
+        每次從上一個匹配的起點後一格繼續搜尋，重疊的匹配也不會遺漏；
+        所有模式都命中後即停止。
+        """
+        hits = set()
+        pos = 0
+        while len(hits) < len(cls.SUSPICIOUS_PATTERNS):
+            match = cls._suspicious_scanner.search(normalized, pos)
+            if match is None:
+                break
+            hits.add(int(match.lastgroup[1:]))
+            pos = match.start() + 1
+        return sorted(hits)
+
     @staticmethod
     def _should_log_moderation(
         user_id: Optional[uuid.UUID],
@@ -387,6 +471,32 @@ class ContentModerationService:
         """
         return bool(user_id and (violations or not is_approved))
 
+    @classmethod
+    def _scan(
+        cls,
+        matcher: SensitiveWordMatcher,
+        content: str,
+        suspicious_patterns: bool = True
+    ) -> Tuple[bool, List[str], List[uuid.UUID], str]:
+        """正規化並以比對器檢查單一內容（不記錄日誌）
+
+        Returns:
+            (is_approved, violations, triggered_word_ids, action)
+        """
+        # 正規化一次（全形、零寬字元、形近字、簡繁、空白拆字），所有比對共用
+        normalized = normalize_text(content)
+
+        violations, triggered_word_ids, _, action_to_take = cls._check_sensitive_words(
+            matcher, normalized
+        )
+        if suspicious_patterns:
+            violations, action_to_take = cls._check_suspicious_patterns(
+                normalized, violations, action_to_take
+            )
+
+        is_approved = action_to_take in ["APPROVED", "WARN"]
+        return is_approved, violations, triggered_word_ids, action_to_take
+
     @classmethod
     async def check_content(
         cls,
@@ -412,25 +522,13 @@ class ContentModerationService:
         if not content:
             return True, [], [], "APPROVED"
 
-        content_lower = content.lower()
+        # 1. 載入敏感詞比對器
+        matcher = await cls._get_matcher(db)
 
-        # 1. 載入敏感詞
-        sensitive_words = await cls._load_sensitive_words(db)
+        # 2. 檢查敏感詞與可疑模式
+        is_approved, violations, triggered_word_ids, action_to_take = cls._scan(matcher, content)
 
-        # 2. 檢查敏感詞
-        violations, triggered_word_ids, _, action_to_take = cls._check_sensitive_words(
-            sensitive_words, content, content_lower
-        )
-
-        # 3. 檢查可疑模式
-        violations, action_to_take = cls._check_suspicious_patterns(
-            content, violations, action_to_take
-        )
-
-        # 4. 判斷是否通過
-        is_approved = action_to_take in ["APPROVED", "WARN"]
-
-        # 5. 記錄審核日誌
+        # 3. 記錄審核日誌
         if cls._should_log_moderation(user_id, violations, is_approved):
             await cls._log_moderation(
                 db=db,
@@ -458,10 +556,10 @@ class ContentModerationService:
         action_taken: str
     ):
         """
-        記錄審核日誌（獨立事務，確保日誌永久保存）
+        記錄審核日誌（排入批次寫入器，以獨立事務寫入，確保日誌永久保存）
 
         Args:
-            db: 資料庫 session
+            db: 資料庫 session（未使用，日誌不隨主事務提交或回滾）
             user_id: 用戶 ID
             content_type: 內容類型
             content: 原始內容
@@ -470,34 +568,15 @@ class ContentModerationService:
             triggered_word_ids: 觸發的敏感詞 ID
             action_taken: 採取的動作
         """
-        SessionFactory = cls._get_session_factory()
-
-        # 使用獨立的資料庫 session 確保審核日誌永久保存
-        # 即使主事務回滾，審核記錄也會保留（審計需求）
-        async with SessionFactory() as log_db:
-            try:
-                log = ModerationLog(
-                    user_id=user_id,
-                    content_type=content_type,
-                    original_content=content,
-                    is_approved=is_approved,
-                    violations=(
-                        json.dumps(violations, ensure_ascii=False)
-                        if violations else None
-                    ),
-                    triggered_word_ids=(
-                        json.dumps([str(wid) for wid in triggered_word_ids])
-                        if triggered_word_ids else None
-                    ),
-                    action_taken=action_taken
-                )
-
-                log_db.add(log)
-                await log_db.commit()
-            except Exception as e:
-                # 日誌記錄失敗不應影響主流程
-                logger.error(f"Failed to log moderation: {e}", exc_info=True)
-                await log_db.rollback()
+        await moderation_log_writer.log(
+            user_id=user_id,
+            content_type=content_type,
+            content=content,
+            is_approved=is_approved,
+            violations=violations,
+            triggered_word_ids=triggered_word_ids,
+            action_taken=action_taken
+        )
 
     @classmethod
     async def sanitize_content(cls, content: str, db: AsyncSession) -> str:
@@ -514,27 +593,135 @@ class ContentModerationService:
         if not content:
             return content
 
-        sanitized = content
+        # 與 check_content 相同的正規化，並保留位置對照以便替換回原文
+        normalized, offsets = normalize_with_offsets(content)
+        matcher = await cls._get_matcher(db)
 
-        # 載入敏感詞
-        sensitive_words = await cls._load_sensitive_words(db)
+        # 一次掃描取得所有敏感詞位置（對回原文），連結在原文上比對，最後一次組出結果
+        spans = [
+            (*original_span(offsets, start, end), "***")
+            for start, end in matcher.spans(normalized)
+        ]
+        spans.extend((*m.span(), "[已移除連結]") for m in URL_PATTERN.finditer(content))
 
-        # 替換敏感詞為 ***
-        for word_obj in sensitive_words:
-            if word_obj["is_regex"]:
-                try:
-                    pattern = re.compile(word_obj["word"], re.IGNORECASE)
-                    sanitized = pattern.sub('***', sanitized)
-                except re.error:
-                    continue
-            else:
-                pattern = re.compile(re.escape(word_obj["word"]), re.IGNORECASE)
-                sanitized = pattern.sub('***', sanitized)
+        return replace_spans(content, spans)
 
-        # 移除可疑的 URL
-        sanitized = re.sub(r'(?:http|https)://\S+', '[已移除連結]', sanitized)
+    @classmethod
+    async def check_many(
+        cls,
+        items: Sequence[Tuple[str, str]],
+        db: AsyncSession,
+        user_id: Optional[uuid.UUID] = None,
+        content_type: str = "PROFILE"
+    ) -> List[Tuple[bool, List[str], List[uuid.UUID], str]]:
+        """
+        批次檢查多個欄位（個人檔案、批次匯入、重新掃描）
 
-        return sanitized
+        比對器只取得一次；有違規時只記錄一筆合併的審核日誌，
+        內容與違規項目以欄位標籤區分。
+
+        Args:
+            items: (標籤, 內容) 列表，如 [("個人簡介", bio), ("興趣標籤 '旅遊'", "旅遊")]
+            db: 資料庫 session
+            user_id: 用戶 ID（用於日誌記錄；None 時不記錄）
+            content_type: 內容類型（MESSAGE, PROFILE, PHOTO）
+
+        Returns:
+            與 items 對應的 (is_approved, violations, triggered_word_ids, action) 列表
+        """
+        if not any(content for _, content in items):
+            return [(True, [], [], "APPROVED") for _ in items]
+
+        matcher = await cls._get_matcher(db)
+        results = cls.scan_many(matcher, items)
+
+        entry = cls.consolidate(items, results)
+        if user_id and entry:
+            await cls._log_moderation(db=db, user_id=user_id, content_type=content_type, **entry)
+
+        return results
+
+    @classmethod
+    def scan_many(
+        cls,
+        matcher: SensitiveWordMatcher,
+        items: Sequence[Tuple[str, str]],
+        suspicious_patterns: bool = True
+    ) -> List[Tuple[bool, List[str], List[uuid.UUID], str]]:
+        """以比對器檢查多個欄位（純運算，不記錄日誌，可在行程池中執行）
+
+        Args:
+            matcher: 敏感詞比對器
+            items: (標籤, 內容) 列表
+            suspicious_patterns: 是否檢查可疑模式
+
+        Returns:
+            與 items 對應的 (is_approved, violations, triggered_word_ids, action) 列表
+        """
+        return [
+            cls._scan(matcher, content, suspicious_patterns)
+            if content else (True, [], [], "APPROVED")
+            for _, content in items
+        ]
+
+    @classmethod
+    def consolidate(
+        cls,
+        items: Sequence[Tuple[str, str]],
+        results: Sequence[Tuple[bool, List[str], List[uuid.UUID], str]]
+    ) -> Optional[Dict]:
+        """將違規欄位合併為一筆審核日誌的欄位
+
+        只有一個欄位時內容不加標籤；多個欄位時內容與違規項目以欄位標籤區分。
+
+        Returns:
+            _log_moderation 的 content、is_approved、violations、triggered_word_ids、
+            action_taken 參數；沒有違規時回傳 None
+        """
+        flagged = [
+            (label, content, result)
+            for (label, content), result in zip(items, results)
+            if result[1] or not result[0]
+        ]
+        if not flagged:
+            return None
+
+        is_approved, _, _, action = cls.merge_results([result for _, _, result in flagged])
+        if len(items) == 1:
+            content = flagged[0][1]
+            violations = list(flagged[0][2][1])
+        else:
+            content = "\n".join(f"[{label}] {content}" for label, content, _ in flagged)
+            violations = [f"{label} - {v}" for label, _, result in flagged for v in result[1]]
+
+        return {
+            "content": content,
+            "is_approved": is_approved,
+            "violations": violations,
+            "triggered_word_ids": list(dict.fromkeys(
+                word_id for _, _, result in flagged for word_id in result[2]
+            )),
+            "action_taken": action,
+        }
+
+    @staticmethod
+    def merge_results(
+        results: Sequence[Tuple[bool, List[str], List[uuid.UUID], str]]
+    ) -> Tuple[bool, List[str], List[uuid.UUID], str]:
+        """合併多個檢查結果，動作取最嚴重者
+
+        Returns:
+            (is_approved, violations, triggered_word_ids, action)
+        """
+        violations: List[str] = []
+        triggered_word_ids: List[uuid.UUID] = []
+        max_action = "APPROVED"
+        for _, item_violations, word_ids, action in results:
+            violations.extend(item_violations)
+            triggered_word_ids.extend(word_ids)
+            if ACTION_PRIORITY.get(action, 0) > ACTION_PRIORITY[max_action]:
+                max_action = action
+        return max_action in ["APPROVED", "WARN"], violations, triggered_word_ids, max_action
 
     @classmethod
     async def check_profile_content(
@@ -542,52 +729,36 @@ class ContentModerationService:
         db: AsyncSession,
         user_id: uuid.UUID,
         bio: str = None,
-        interests: List[str] = None
+        interests: List[str] = None,
+        display_name: str = None
     ) -> Tuple[bool, List[str], str]:
         """
-        檢查個人檔案內容
+        檢查個人檔案內容（所有欄位一次掃描，一筆合併日誌）
 
         Args:
             db: 資料庫 session
             user_id: 用戶 ID
             bio: 個人簡介
             interests: 興趣列表
+            display_name: 顯示名稱
 
         Returns:
             (is_approved, violations, action): (是否通過, 違規項目列表, 應採取的動作)
         """
-        all_violations = []
-        all_triggered_word_ids = []
-        max_action = "APPROVED"
-
-        # 檢查個人簡介
+        items: List[Tuple[str, str]] = []
+        if display_name:
+            items.append(("顯示名稱", display_name))
         if bio:
-            is_approved, violations, word_ids, action = await cls.check_content(
-                bio, db, user_id, "PROFILE"
-            )
-            if not is_approved or violations:
-                all_violations.extend([f"個人簡介 - {v}" for v in violations])
-                all_triggered_word_ids.extend(word_ids)
-                if action in ["AUTO_BAN", "REJECT"]:
-                    max_action = action
-                elif action == "WARN" and max_action == "APPROVED":
-                    max_action = "WARN"
-
-        # 檢查興趣標籤
-        if interests:
-            for interest in interests:
-                is_approved, violations, word_ids, action = await cls.check_content(
-                    interest, db, user_id, "PROFILE"
-                )
-                if not is_approved or violations:
-                    all_violations.extend([f"興趣標籤 '{interest}' - {v}" for v in violations])
-                    all_triggered_word_ids.extend(word_ids)
-                    if action in ["AUTO_BAN", "REJECT"]:
-                        max_action = action
-                    elif action == "WARN" and max_action == "APPROVED":
-                        max_action = "WARN"
-
-        is_approved = max_action in ["APPROVED", "WARN"]
+            items.append(("個人簡介", bio))
+        for interest in interests or []:
+            items.append((f"興趣標籤 '{interest}'", interest))
+
+        results = await cls.check_many(items, db, user_id, "PROFILE")
+
+        is_approved, _, _, max_action = cls.merge_results(results)
+        all_violations = [
+            f"{label} - {v}" for (label, _), result in zip(items, results) for v in result[1]
+        ]
         return is_approved, all_violations, max_action
 
     @classmethod
@@ -1,12 +1,24 @@
-"""本地檔案儲存服務"""
+"""檔案儲存服務
+
+照片與聊天圖片的處理（縮放、縮圖、響應式變體）與儲存。
+實際寫入交由儲存後端（見 storage_backends）：本地檔案系統或 S3 相容物件儲存。
+
+照片處理結果以「原始檔雜湊 + 變體尺寸」快取於 derived/，
+重複上傳相同照片時以後端的 copy 沿用已產生的變體，不再重新解碼與編碼，
+也不經應用程式下載再上傳內容（本地後端為硬連結，S3 為伺服器端複製）。
+"""
+import hashlib
+import json
 import uuid
 import logging
-from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from PIL import Image
+import httpx
 import io
 
 from app.core.config import settings
+from app.services.process_executor import image_executor
+from app.services.storage_backends import StorageBackend, create_storage_backend
 
 logger = logging.getLogger(__name__)
 
@@ -18,35 +30,314 @@ ALLOWED_MIME_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
 THUMBNAIL_SIZE = (200, 200)
 # 主圖最大尺寸
 MAX_IMAGE_SIZE = (1200, 1200)
+# WebP 變體品質
+WEBP_QUALITY = 80
+# 照片處理結果快取的物件鍵前綴
+DERIVED_PREFIX = "derived"
+
+# 響應式變體：(寬, 高, JPEG 內容, WebP 內容)
+RenderedVariant = Tuple[int, int, bytes, bytes]
+
+
+# 允許的實際圖片格式（以內容判斷，防止偽造 Content-Type）
+ALLOWED_FORMATS = {"JPEG", "PNG", "GIF", "WEBP"}
+
+
+class InvalidImageError(ValueError):
+    """圖片內容無效或格式不支援"""
+
+
+# ==================== 圖片處理函式 ====================
+# 模組層級純函式（可 pickle），由 image_executor 派送至行程池執行，
+# 避免 PIL 解碼、LANCZOS 縮放與 JPEG 編碼阻塞事件迴圈。
+#
+# 每次上傳只解碼一次：open_image 同時負責格式驗證與解碼，
+# 主圖與縮圖皆由同一份像素產生。
+
+
+def _fit_size(size: Tuple[int, int], max_size: Tuple[int, int]) -> Tuple[int, int]:
+    """計算等比例縮放後不超過 max_size 的尺寸"""
+    width, height = size
+    ratio = min(max_size[0] / width, max_size[1] / height, 1)
+    return max(1, round(width * ratio)), max(1, round(height * ratio))
+
+
+def open_image(
+    file_content: bytes, max_size: Optional[Tuple[int, int]] = None
+) -> Tuple[Image.Image, Tuple[int, int]]:
+    """
+    開啟、驗證並解碼圖片
+
+    JPEG 且目標尺寸遠小於原圖時，使用 Image.draft 讓解碼器直接以
+    1/2、1/4 或 1/8 比例解碼（DCT 縮放），省去大部分解碼與縮放成本。
+
+    Args:
+        file_content: 原始檔案內容
+        max_size: 後續縮放的目標上限（None 表示以原尺寸解碼）
+
+    Returns:
+        Tuple[已解碼圖片, 原始尺寸 (width, height)]
+
+    Raises:
+        InvalidImageError: 無法辨識、格式不支援或內容損毀
+    """
+    try:
+        img = Image.open(io.BytesIO(file_content))
+        if img.format not in ALLOWED_FORMATS:
+            raise InvalidImageError("無效的圖片格式")
+
+        original_size = img.size
+        if max_size is not None and img.format == "JPEG":
+            # draft 只會選擇不小於目標尺寸的縮放比例，畫質不受影響
+            img.draft("RGB", _fit_size(original_size, max_size))
+
+        # 實際解碼，截斷或損毀的檔案會在此拋出例外
+        img.load()
+    except InvalidImageError:
+        raise
+    except (Image.UnidentifiedImageError, Image.DecompressionBombError, OSError, ValueError) as e:
+        raise InvalidImageError("無效的圖片檔案，請上傳有效的圖片") from e
+
+    return img, original_size
+
+
+def _to_rgb(img: Image.Image) -> Image.Image:
+    """轉換為 RGB（處理 RGBA 或其他模式）"""
+    if img.mode in ("RGBA", "P"):
+        return img.convert("RGB")
+    return img
+
+
+def _encode_jpeg(img: Image.Image, quality: int) -> bytes:
+    """編碼為 JPEG"""
+    output = io.BytesIO()
+    img.save(output, format="JPEG", quality=quality, optimize=True)
+    return output.getvalue()
+
+
+def _encode_webp(img: Image.Image, quality: int = WEBP_QUALITY) -> bytes:
+    """編碼為 WebP"""
+    output = io.BytesIO()
+    img.save(output, format="WEBP", quality=quality, method=4)
+    return output.getvalue()
+
+
+def _resize_image(img: Image.Image, max_size: Tuple[int, int]) -> Image.Image:
+    """等比例縮小至不超過 max_size（原地修改並回傳）"""
+    img = _to_rgb(img)
+    img.thumbnail(max_size, Image.Resampling.LANCZOS)
+    return img
+
+
+def _square_thumbnail(img: Image.Image) -> bytes:
+    """從中心裁切為正方形並產生 JPEG 縮圖"""
+    img = _to_rgb(img)
+
+    # 建立縮圖（裁切為正方形）
+    width, height = img.size
+    min_dim = min(width, height)
+
+    # 從中心裁切
+    left = (width - min_dim) // 2
+    top = (height - min_dim) // 2
+    right = left + min_dim
+    bottom = top + min_dim
+
+    img = img.crop((left, top, right, bottom))
+    img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+
+    return _encode_jpeg(img, quality=80)
+
+
+def process_image(file_content: bytes, max_size: Tuple[int, int]) -> bytes:
+    """
+    處理圖片：調整大小並壓縮
+
+    Args:
+        file_content: 原始檔案內容
+        max_size: 最大尺寸 (width, height)
+
+    Returns:
+        處理後的圖片內容
+    """
+    img, _ = open_image(file_content, max_size)
+    return _encode_jpeg(_resize_image(img, max_size), quality=85)
+
+
+def create_thumbnail(file_content: bytes) -> bytes:
+    """
+    建立縮圖
+
+    Args:
+        file_content: 原始檔案內容
+
+    Returns:
+        縮圖內容
+    """
+    img, _ = open_image(file_content)
+    return _square_thumbnail(img)
+
+
+def process_gif_thumbnail(file_content: bytes) -> bytes:
+    """
+    建立 GIF 縮圖（使用第一幀）
+
+    Args:
+        file_content: 原始 GIF 檔案內容
+
+    Returns:
+        縮圖內容（JPEG 格式）
+    """
+    # 開啟後預設即為第一幀
+    img, _ = open_image(file_content)
+    return _square_thumbnail(img)
+
+
+def _render_variants(
+    main_image: Image.Image, variant_sizes: Sequence[int]
+) -> List[RenderedVariant]:
+    """
+    由主圖逐級縮小產生各尺寸變體（每個尺寸皆輸出 JPEG 與 WebP）
+
+    從上一級縮小而非每次從主圖縮小，較小尺寸的縮放成本可忽略。
+    不放大：大於等於目前長邊的尺寸會被略過。
+
+    Args:
+        main_image: 已縮放的主圖（RGB）
+        variant_sizes: 變體長邊像素
+
+    Returns:
+        變體清單（由小到大，最後一個為主圖）
+    """
+    variants = [(
+        main_image.width,
+        main_image.height,
+        _encode_jpeg(main_image, quality=85),
+        _encode_webp(main_image),
+    )]
+
+    current = main_image
+    for size in sorted(set(variant_sizes), reverse=True):
+        if size >= max(current.size):
+            continue
+        current = current.copy()
+        current.thumbnail((size, size), Image.Resampling.LANCZOS)
+        variants.append((
+            current.width,
+            current.height,
+            _encode_jpeg(current, quality=85),
+            _encode_webp(current),
+        ))
+
+    variants.reverse()
+    return variants
+
+
+def render_photo(
+    file_content: bytes, variant_sizes: Sequence[int] = ()
+) -> Tuple[List[RenderedVariant], bytes]:
+    """
+    產生個人照片的各尺寸變體與縮圖（單次解碼）
+
+    縮圖由縮小後的主圖裁切產生（主圖解析度仍遠高於 200px 縮圖，畫質不受影響），
+    省去一次全尺寸解碼與縮放。
+
+    Args:
+        file_content: 原始檔案內容
+        variant_sizes: 主圖以外的響應式變體長邊像素
+
+    Returns:
+        Tuple[變體清單（由小到大，最後一個為主圖）, 縮圖內容]
+
+    Raises:
+        InvalidImageError: 圖片無效
+    """
+    img, _ = open_image(file_content, MAX_IMAGE_SIZE)
+    main_image = _resize_image(img, MAX_IMAGE_SIZE)
+    return _render_variants(main_image, variant_sizes), _square_thumbnail(main_image)
+
+
+def pick_variant_url(
+    variants: Optional[List[Dict]], fallback_url: str, width: int
+) -> str:
+    """
+    取得最適合顯示寬度的 JPEG 變體 URL
+
+    Args:
+        variants: Photo.variants 清單（由小到大）
+        fallback_url: 無變體時使用的 URL（舊照片）
+        width: 顯示所需寬度（像素，已含裝置像素比）
+
+    Returns:
+        寬度不小於 width 的最小變體；皆不足時回傳最大變體
+    """
+    if not variants:
+        return fallback_url
+    for variant in variants:
+        if variant["width"] >= width:
+            return variant["jpeg"]
+    return variants[-1]["jpeg"]
+
+
+def build_srcset(variants: Optional[List[Dict]], fmt: str) -> Optional[str]:
+    """
+    組成 <img srcset> 字串，例如 "/a_400.webp 400w, /a.webp 1200w"
+
+    Args:
+        variants: Photo.variants 清單
+        fmt: "jpeg" 或 "webp"
+
+    Returns:
+        srcset 字串，無變體時為 None
+    """
+    if not variants:
+        return None
+    return ", ".join(f"{v[fmt]} {v['width']}w" for v in variants if v.get(fmt))
+
+
+def render_chat_image(file_content: bytes, is_gif: bool) -> Tuple[bytes, bytes, int, int]:
+    """
+    產生聊天圖片的主圖與縮圖（單次解碼）
+
+    Args:
+        file_content: 原始檔案內容
+        is_gif: 是否為 GIF（GIF 保留原檔，縮圖取第一幀）
+
+    Returns:
+        Tuple[主圖內容, 縮圖內容, 原始寬度, 原始高度]
+
+    Raises:
+        InvalidImageError: 圖片無效
+    """
+    if is_gif:
+        img, (original_width, original_height) = open_image(file_content)
+        return file_content, _square_thumbnail(img), original_width, original_height
+
+    img, (original_width, original_height) = open_image(file_content, MAX_IMAGE_SIZE)
+    main_image = _resize_image(img, MAX_IMAGE_SIZE)
+    return (
+        _encode_jpeg(main_image, quality=85),
+        _square_thumbnail(main_image),
+        original_width,
+        original_height,
+    )
 
 
 class FileStorageService:
-    """本地檔案儲存服務"""
-
-    def __init__(self):
-        """初始化儲存服務，建立上傳目錄"""
-        self.upload_dir = Path(settings.UPLOAD_DIR)
-        self.photos_dir = self.upload_dir / "photos"
-        self.chat_dir = self.upload_dir / "chat"
-        self._ensure_directories()
-
-    def _ensure_directories(self):
-        """確保上傳目錄存在"""
-        self.upload_dir.mkdir(parents=True, exist_ok=True)
-        self.photos_dir.mkdir(parents=True, exist_ok=True)
-        self.chat_dir.mkdir(parents=True, exist_ok=True)
-
-    def _get_user_photo_dir(self, user_id: str) -> Path:
-        """取得使用者照片目錄"""
-        user_dir = self.photos_dir / str(user_id)
-        user_dir.mkdir(parents=True, exist_ok=True)
-        return user_dir
-
-    def _get_chat_image_dir(self, match_id: str) -> Path:
-        """取得聊天圖片目錄"""
-        chat_image_dir = self.chat_dir / str(match_id)
-        chat_image_dir.mkdir(parents=True, exist_ok=True)
-        return chat_image_dir
+    """檔案儲存服務（照片與聊天圖片）"""
+
+    def __init__(self, backend: Optional[StorageBackend] = None):
+        """
+        初始化儲存服務
+
+        Args:
+            backend: 儲存後端（預設依 STORAGE_BACKEND 建立）
+        """
+        self.backend = backend or create_storage_backend()
+
+    async def close(self) -> None:
+        """關閉儲存後端連線"""
+        await self.backend.close()
 
     def _get_file_extension(self, filename: str, content_type: str) -> str:
         """取得檔案副檔名"""
@@ -72,67 +363,12 @@ class FileStorageService:
     def _process_image(
         self, file_content: bytes, max_size: Tuple[int, int]
     ) -> bytes:
-        """
-        處理圖片：調整大小並壓縮
-
-        Args:
-            file_content: 原始檔案內容
-            max_size: 最大尺寸 (width, height)
-
-        Returns:
-            處理後的圖片內容
-        """
-        img = Image.open(io.BytesIO(file_content))
-
-        # 轉換為 RGB（處理 RGBA 或其他模式）
-        if img.mode in ("RGBA", "P"):
-            img = img.convert("RGB")
-
-        # 調整大小（保持比例）
-        img.thumbnail(max_size, Image.Resampling.LANCZOS)
-
-        # 儲存到記憶體
-        output = io.BytesIO()
-        img.save(output, format="JPEG", quality=85, optimize=True)
-        output.seek(0)
-
-        return output.read()
+        """處理圖片：調整大小並壓縮（見 process_image）"""
+        return process_image(file_content, max_size)
 
     def _create_thumbnail(self, file_content: bytes) -> bytes:
-        """
-        建立縮圖
-
-        Args:
-            file_content: 原始檔案內容
-
-        Returns:
-            縮圖內容
-        """
-        img = Image.open(io.BytesIO(file_content))
-
-        # 轉換為 RGB
-        if img.mode in ("RGBA", "P"):
-            img = img.convert("RGB")
-
-        # 建立縮圖（裁切為正方形）
-        width, height = img.size
-        min_dim = min(width, height)
-
-        # 從中心裁切
-        left = (width - min_dim) // 2
-        top = (height - min_dim) // 2
-        right = left + min_dim
-        bottom = top + min_dim
-
-        img = img.crop((left, top, right, bottom))
-        img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
-
-        # 儲存到記憶體
-        output = io.BytesIO()
-        img.save(output, format="JPEG", quality=80, optimize=True)
-        output.seek(0)
-
-        return output.read()
+        """建立縮圖（見 create_thumbnail）"""
+        return create_thumbnail(file_content)
 
     async def save_photo(
         self,
@@ -140,9 +376,12 @@ class FileStorageService:
         file_content: bytes,
         filename: str,
         content_type: str,
-    ) -> Tuple[str, str, str]:
+    ) -> Tuple[str, str, str, List[Dict]]:
         """
-        儲存照片及縮圖
+        儲存照片、縮圖及響應式變體
+
+        主圖（{photo_id}.jpg）與縮圖（{photo_id}_thumb.jpg）維持原有命名，
+        變體依長邊命名為 {photo_id}_{size}.jpg / .webp，主圖的 WebP 為 {photo_id}.webp。
 
         Args:
             user_id: 使用者 ID
@@ -151,55 +390,74 @@ class FileStorageService:
             content_type: MIME 類型
 
         Returns:
-            Tuple[photo_id, photo_url, thumbnail_url]
+            Tuple[photo_id, photo_url, thumbnail_url, variants]
+            variants 為 [{"width", "height", "jpeg", "webp"}]（由小到大，最後一個為主圖）
         """
         # 產生唯一 ID
         photo_id = str(uuid.uuid4())
 
-        # 取得使用者目錄
-        user_dir = self._get_user_photo_dir(user_id)
-
-        # 處理主圖
-        processed_image = self._process_image(file_content, MAX_IMAGE_SIZE)
-        photo_filename = f"{photo_id}.jpg"
-        photo_path = user_dir / photo_filename
+        key_prefix = f"photos/{user_id}"
+        thumbnail_key = f"{key_prefix}/{photo_id}_thumb.jpg"
+
+        # 相同原始檔已處理過時複製快取的變體，否則交由圖片處理行程池
+        variant_sizes = tuple(sorted(set(settings.photo_variant_sizes)))
+        cache_key = "{}-{}".format(
+            hashlib.sha256(file_content).hexdigest(),
+            "_".join(str(size) for size in variant_sizes)
+        )
+        variants = await self._copy_derived(cache_key, key_prefix, photo_id)
+        if variants is None:
+            rendered, thumbnail_content = await image_executor.run(
+                render_photo, file_content, variant_sizes
+            )
+            sizes = [(width, height) for width, height, _, _ in rendered]
+            keys = self._photo_keys(key_prefix, photo_id, sizes)
+            files = [(thumbnail_key, thumbnail_content, "image/jpeg")]
+            for (jpeg_key, webp_key), (_, _, jpeg_content, webp_content) in zip(keys, rendered):
+                files.append((jpeg_key, jpeg_content, "image/jpeg"))
+                files.append((webp_key, webp_content, "image/webp"))
+
+            # 寫入儲存後端
+            try:
+                await self._store_files(files)
+            except Exception as e:
+                logger.error(f"Failed to save photo: {e}")
+                raise
 
-        # 建立縮圖
-        thumbnail_content = self._create_thumbnail(file_content)
-        thumbnail_filename = f"{photo_id}_thumb.jpg"
-        thumbnail_path = user_dir / thumbnail_filename
+            await self._save_derived(cache_key, thumbnail_key, sizes, keys)
+            variants = self._variant_urls(sizes, keys)
 
-        # 寫入檔案
-        try:
-            with open(photo_path, "wb") as f:
-                f.write(processed_image)
+        logger.info(f"Photo saved: {key_prefix}/{photo_id}.jpg ({len(variants)} variants)")
 
-            with open(thumbnail_path, "wb") as f:
-                f.write(thumbnail_content)
+        # 回傳公開 URL
+        photo_url = self.backend.url(f"{key_prefix}/{photo_id}.jpg")
+        thumbnail_url = self.backend.url(thumbnail_key)
 
-            logger.info(f"Photo saved: {photo_path}")
+        return photo_id, photo_url, thumbnail_url, variants
 
-        except Exception as e:
-            # 清理失敗的檔案
-            if photo_path.exists():
-                photo_path.unlink()
-            if thumbnail_path.exists():
-                thumbnail_path.unlink()
-            logger.error(f"Failed to save photo: {e}")
-            raise
+    async def read_photo(self, photo_url: str) -> Optional[bytes]:
+        """
+        讀取已儲存的照片內容
 
-        # 回傳 URL 路徑
-        photo_url = f"/uploads/photos/{user_id}/{photo_filename}"
-        thumbnail_url = f"/uploads/photos/{user_id}/{thumbnail_filename}"
+        Args:
+            photo_url: 照片 URL
 
-        return photo_id, photo_url, thumbnail_url
+        Returns:
+            檔案內容，URL 不屬於儲存後端或檔案不存在時為 None
+        """
+        key = self.backend.key_from_url(photo_url) if photo_url else None
+        if key is None:
+            return None
+        return await self.backend.read(key)
 
     async def delete_photo(self, photo_url: str) -> bool:
         """
-        刪除照片及其縮圖
+        刪除照片及其縮圖、響應式變體
+
+        本地後端只移除這張照片的參照；其他照片仍參照相同內容時，內容物件會保留。
 
         Args:
-            photo_url: 照片 URL 路徑
+            photo_url: 照片 URL
 
         Returns:
             是否刪除成功
@@ -208,31 +466,31 @@ class FileStorageService:
             return False
 
         try:
-            # 從 URL 路徑取得檔案路徑
-            # /uploads/photos/{user_id}/{filename} -> photos/{user_id}/{filename}
-            # 移除 /uploads/ 前綴
-            relative_path = photo_url.lstrip("/")
-            if relative_path.startswith("uploads/"):
-                relative_path = relative_path[8:]  # 移除 "uploads/"
-
-            photo_path = self.upload_dir / relative_path
+            # 從 URL 取得物件鍵：/uploads/photos/{user_id}/{filename} -> photos/{user_id}/{filename}
+            photo_key = self.backend.key_from_url(photo_url)
+            if photo_key is None:
+                logger.warning(f"Photo URL not managed by storage backend: {photo_url}")
+                return False
 
             # 刪除主圖
-            if photo_path.exists():
-                photo_path.unlink()
-                logger.info(f"Deleted photo: {photo_path}")
+            if await self.backend.delete(photo_key):
+                logger.info(f"Deleted photo: {photo_key}")
             else:
-                logger.warning(f"Photo not found: {photo_path}")
+                logger.warning(f"Photo not found: {photo_key}")
                 return False
 
             # 刪除縮圖（如果原本不是縮圖的話）
-            if "_thumb" not in photo_path.stem:
-                thumbnail_path = photo_path.with_name(
-                    photo_path.stem + "_thumb" + photo_path.suffix
-                )
-                if thumbnail_path.exists():
-                    thumbnail_path.unlink()
-                    logger.info(f"Deleted thumbnail: {thumbnail_path}")
+            stem, _, suffix = photo_key.rpartition(".")
+            if not stem.endswith("_thumb"):
+                thumbnail_key = f"{stem}_thumb.{suffix}"
+                if await self.backend.delete(thumbnail_key):
+                    logger.info(f"Deleted thumbnail: {thumbnail_key}")
+
+                # 刪除響應式變體（{stem}.webp、{stem}_{size}.jpg/.webp）
+                variant_keys = [f"{stem}.webp"]
+                variant_keys.extend(await self.backend.list(f"{stem}_"))
+                for variant_key in variant_keys:
+                    await self.backend.delete(variant_key)
 
             return True
 
@@ -264,44 +522,126 @@ class FileStorageService:
         return None
 
     def _process_gif_thumbnail(self, file_content: bytes) -> bytes:
+        """建立 GIF 縮圖（見 process_gif_thumbnail）"""
+        return process_gif_thumbnail(file_content)
+
+    async def _store_files(self, files: Sequence[Tuple[str, bytes, str]]) -> None:
         """
-        建立 GIF 縮圖（使用第一幀）
+        寫入多個物件，任一失敗時刪除已寫入的物件
 
         Args:
-            file_content: 原始 GIF 檔案內容
-
-        Returns:
-            縮圖內容（JPEG 格式）
+            files: [(物件鍵, 內容, MIME 類型)]
         """
-        img = Image.open(io.BytesIO(file_content))
-
-        # 取得第一幀
-        if hasattr(img, "n_frames") and img.n_frames > 1:
-            img.seek(0)
-
-        # 轉換為 RGB
-        if img.mode in ("RGBA", "P"):
-            img = img.convert("RGB")
+        stored = 0
+        try:
+            for key, content, content_type in files:
+                await self.backend.write(key, content, content_type)
+                stored += 1
+        except Exception:
+            for key, _, _ in files[:stored]:
+                await self.backend.delete(key)
+            raise
 
-        # 建立縮圖（裁切為正方形）
-        width, height = img.size
-        min_dim = min(width, height)
+    @staticmethod
+    def _photo_keys(
+        key_prefix: str, photo_id: str, sizes: Sequence[Tuple[int, int]]
+    ) -> List[Tuple[str, str]]:
+        """
+        取得各變體的 (JPEG, WebP) 物件鍵
 
-        # 從中心裁切
-        left = (width - min_dim) // 2
-        top = (height - min_dim) // 2
-        right = left + min_dim
-        bottom = top + min_dim
+        最大的變體為主圖（{photo_id}.jpg），其餘依長邊命名為 {photo_id}_{size}.jpg。
+        """
+        keys = []
+        for index, (width, height) in enumerate(sizes):
+            is_main = index == len(sizes) - 1
+            stem = photo_id if is_main else f"{photo_id}_{max(width, height)}"
+            keys.append((f"{key_prefix}/{stem}.jpg", f"{key_prefix}/{stem}.webp"))
+        return keys
+
+    def _variant_urls(
+        self, sizes: Sequence[Tuple[int, int]], keys: Sequence[Tuple[str, str]]
+    ) -> List[Dict]:
+        """組成 Photo.variants 清單"""
+        return [
+            {
+                "width": width,
+                "height": height,
+                "jpeg": self.backend.url(jpeg_key),
+                "webp": self.backend.url(webp_key),
+            }
+            for (width, height), (jpeg_key, webp_key) in zip(sizes, keys)
+        ]
+
+    @staticmethod
+    def _derived_key(cache_key: str) -> str:
+        """取得照片處理結果快取的物件鍵"""
+        return f"{DERIVED_PREFIX}/{cache_key[:2]}/{cache_key}.json"
+
+    async def _copy_derived(
+        self, cache_key: str, key_prefix: str, photo_id: str
+    ) -> Optional[List[Dict]]:
+        """
+        將照片處理結果快取複製為新照片的物件
 
-        img = img.crop((left, top, right, bottom))
-        img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+        快取只記錄第一次寫入時的物件鍵；任一來源物件已被刪除即視為未命中，
+        並移除已複製的物件。
 
-        # 儲存到記憶體
-        output = io.BytesIO()
-        img.save(output, format="JPEG", quality=80, optimize=True)
-        output.seek(0)
+        Returns:
+            新照片的 variants 清單，未命中回傳 None
+        """
+        copied: List[str] = []
+        try:
+            manifest_content = await self.backend.read(self._derived_key(cache_key))
+            if manifest_content is None:
+                return None
+            manifest = json.loads(manifest_content)
+
+            sizes = [(width, height) for width, height, _, _ in manifest["variants"]]
+            keys = self._photo_keys(key_prefix, photo_id, sizes)
+            pairs = [(manifest["thumbnail"], f"{key_prefix}/{photo_id}_thumb.jpg")]
+            for (_, _, jpeg, webp), (jpeg_key, webp_key) in zip(manifest["variants"], keys):
+                pairs.append((jpeg, jpeg_key))
+                pairs.append((webp, webp_key))
+
+            for source_key, key in pairs:
+                if not await self.backend.copy(source_key, key):
+                    raise FileNotFoundError(source_key)
+                copied.append(key)
+        except (OSError, ValueError, KeyError, httpx.HTTPError):
+            for key in copied:
+                await self.backend.delete(key)
+            return None
+
+        return self._variant_urls(sizes, keys)
+
+    async def _save_derived(
+        self,
+        cache_key: str,
+        thumbnail_key: str,
+        sizes: Sequence[Tuple[int, int]],
+        keys: Sequence[Tuple[str, str]],
+    ) -> None:
+        """
+        寫入照片處理結果快取
 
-        return output.read()
+        Args:
+            cache_key: 原始檔雜湊 + 變體尺寸
+            thumbnail_key: 縮圖物件鍵
+            sizes: 各變體尺寸（由小到大）
+            keys: 對應各變體的 (JPEG, WebP) 物件鍵
+        """
+        manifest = {
+            "thumbnail": thumbnail_key,
+            "variants": [
+                [width, height, jpeg_key, webp_key]
+                for (width, height), (jpeg_key, webp_key) in zip(sizes, keys)
+            ],
+        }
+        await self.backend.write(
+            self._derived_key(cache_key),
+            json.dumps(manifest).encode("utf-8"),
+            "application/json",
+        )
 
     async def save_chat_image(
         self,
@@ -327,78 +667,31 @@ class FileStorageService:
         # 產生唯一 ID
         image_id = str(uuid.uuid4())
 
-        # 取得聊天圖片目錄
-        chat_image_dir = self._get_chat_image_dir(match_id)
-
         # 判斷是否為 GIF
         is_gif = content_type == "image/gif"
 
-        # 取得原始圖片尺寸
-        img = Image.open(io.BytesIO(file_content))
-        original_width, original_height = img.size
-
-        if is_gif:
-            # GIF 保持原格式
-            image_filename = f"{image_id}.gif"
-            image_path = chat_image_dir / image_filename
+        # 解碼、縮放與編碼皆為 CPU 密集操作，交由圖片處理行程池執行
+        processed_image, thumbnail_content, original_width, original_height = (
+            await image_executor.run(render_chat_image, file_content, is_gif)
+        )
 
-            # 縮圖使用第一幀
-            thumbnail_content = self._process_gif_thumbnail(file_content)
-            thumbnail_filename = f"{image_id}_thumb.jpg"
-            thumbnail_path = chat_image_dir / thumbnail_filename
-
-            # 寫入檔案
-            try:
-                with open(image_path, "wb") as f:
-                    f.write(file_content)
+        # GIF 保持原格式，其他格式轉為 JPEG
+        image_key = f"chat/{match_id}/{image_id}.{'gif' if is_gif else 'jpg'}"
+        thumbnail_key = f"chat/{match_id}/{image_id}_thumb.jpg"
 
-                with open(thumbnail_path, "wb") as f:
-                    f.write(thumbnail_content)
-
-                logger.info(f"Chat GIF saved: {image_path}")
-
-            except Exception as e:
-                # 清理失敗的檔案
-                if image_path.exists():
-                    image_path.unlink()
-                if thumbnail_path.exists():
-                    thumbnail_path.unlink()
-                logger.error(f"Failed to save chat GIF: {e}")
-                raise
-
-        else:
-            # 一般圖片處理
-            processed_image = self._process_image(file_content, MAX_IMAGE_SIZE)
-            image_filename = f"{image_id}.jpg"
-            image_path = chat_image_dir / image_filename
-
-            # 建立縮圖
-            thumbnail_content = self._create_thumbnail(file_content)
-            thumbnail_filename = f"{image_id}_thumb.jpg"
-            thumbnail_path = chat_image_dir / thumbnail_filename
-
-            # 寫入檔案
-            try:
-                with open(image_path, "wb") as f:
-                    f.write(processed_image)
-
-                with open(thumbnail_path, "wb") as f:
-                    f.write(thumbnail_content)
-
-                logger.info(f"Chat image saved: {image_path}")
-
-            except Exception as e:
-                # 清理失敗的檔案
-                if image_path.exists():
-                    image_path.unlink()
-                if thumbnail_path.exists():
-                    thumbnail_path.unlink()
-                logger.error(f"Failed to save chat image: {e}")
-                raise
+        try:
+            await self._store_files([
+                (image_key, processed_image, "image/gif" if is_gif else "image/jpeg"),
+                (thumbnail_key, thumbnail_content, "image/jpeg"),
+            ])
+            logger.info(f"Chat image saved: {image_key}")
+        except Exception as e:
+            logger.error(f"Failed to save chat image: {e}")
+            raise
 
-        # 回傳 URL 路徑
-        image_url = f"/uploads/chat/{match_id}/{image_filename}"
-        thumbnail_url = f"/uploads/chat/{match_id}/{thumbnail_filename}"
+        # 回傳公開 URL
+        image_url = self.backend.url(image_key)
+        thumbnail_url = self.backend.url(thumbnail_key)
 
         return image_id, image_url, thumbnail_url, original_width, original_height, is_gif
 
@@ -0,0 +1,255 @@
+"""訊息分區維護服務 - messages 表月份分區的建立與冷熱分層
+
+messages 表依 sent_at 做 Range Partitioning，每月一個分區（messages_yYYYYmMM），
+另有 messages_default 預設分區接住尚未建立分區的資料。
+
+維護任務（每 MESSAGE_PARTITION_MAINTENANCE_INTERVAL_SECONDS 執行一次）：
+1. 預先建立未來 MESSAGE_PARTITION_MONTHS_AHEAD 個月的分區，
+   確保新訊息不會落入預設分區
+2. 若設定了 MESSAGE_COLD_TABLESPACE，將超過 MESSAGE_PARTITION_HOT_MONTHS 個月的分區
+   移至冷儲存 tablespace（近期分區保留在預設 tablespace 的快速磁碟上）
+
+分區命名與範圍：
+- messages_y2026m01: [2026-01-01, 2026-02-01)
+"""
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+import asyncio
+import logging
+import re
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "messages"
+DEFAULT_PARTITION = "messages_default"
+PARTITION_NAME_PATTERN = re.compile(r"^messages_y(\d{4})m(\d{2})$")
+
+
+def month_start(value: date) -> date:
+    """取得月份第一天"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """月份加減（回傳該月第一天）"""
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """取得月份分區名稱"""
+    return f"messages_y{month.year:04d}m{month.month:02d}"
+
+
+def parse_partition_month(name: str) -> Optional[date]:
+    """從分區名稱解析月份（非月份分區回傳 None）"""
+    matched = PARTITION_NAME_PATTERN.match(name)
+    if not matched:
+        return None
+    return date(int(matched.group(1)), int(matched.group(2)), 1)
+
+
+class MessagePartitionManager:
+    """訊息分區管理器"""
+
+    def __init__(self):
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._session_factory: Optional[async_sessionmaker] = None
+
+    def set_session_factory(self, factory: async_sessionmaker) -> None:
+        """設定 session factory（供測試注入）"""
+        self._session_factory = factory
+
+    def reset_session_factory(self) -> None:
+        """重設 session factory 為預設（正式環境）"""
+        self._session_factory = None
+
+    def _get_session_factory(self) -> async_sessionmaker:
+        """取得要使用的 session factory"""
+        if self._session_factory is not None:
+            return self._session_factory
+        from app.core.database import AsyncSessionLocal
+        return AsyncSessionLocal
+
+    @staticmethod
+    async def _is_partitioned(db: AsyncSession) -> bool:
+        """檢查 messages 是否為分區表"""
+        result = await db.execute(
+            text("SELECT relkind FROM pg_class WHERE relname = :name"),
+            {"name": PARENT_TABLE}
+        )
+        return result.scalar_one_or_none() == "p"
+
+    @staticmethod
+    async def list_partitions(db: AsyncSession) -> List[Tuple[str, Optional[str]]]:
+        """列出 messages 的所有分區
+
+        Returns:
+            [(分區名稱, tablespace 名稱或 None)]，依名稱排序
+        """
+        result = await db.execute(
+            text("""
+                SELECT child.relname, ts.spcname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                LEFT JOIN pg_tablespace ts ON ts.oid = child.reltablespace
+                WHERE parent.relname = :parent
+                ORDER BY child.relname
+            """),
+            {"parent": PARENT_TABLE}
+        )
+        return [(row[0], row[1]) for row in result.all()]
+
+    async def ensure_partitions(
+        self,
+        months_ahead: Optional[int] = None,
+        today: Optional[date] = None
+    ) -> List[str]:
+        """建立本月與未來數個月的分區（已存在則略過）
+
+        若預設分區中已有落在該月份範圍的資料，建立分區會與其衝突，
+        此時略過並記錄警告，需人工搬移資料後再建立。
+
+        Args:
+            months_ahead: 預先建立的月數（預設 MESSAGE_PARTITION_MONTHS_AHEAD）
+            today: 基準日期（預設今天，供測試使用）
+
+        Returns:
+            本次新建立的分區名稱
+        """
+        if months_ahead is None:
+            months_ahead = settings.MESSAGE_PARTITION_MONTHS_AHEAD
+        current = month_start(today or datetime.now(timezone.utc).date())
+
+        created = []
+        SessionFactory = self._get_session_factory()
+        async with SessionFactory() as db:
+            if not await self._is_partitioned(db):
+                logger.warning("messages table is not partitioned, skipping partition maintenance")
+                return created
+
+            existing = {name for name, _ in await self.list_partitions(db)}
+
+            for offset in range(months_ahead + 1):
+                start = add_months(current, offset)
+                end = add_months(start, 1)
+                name = partition_name(start)
+                if name in existing:
+                    continue
+
+                # 預設分區有此範圍的資料時無法建立分區
+                conflict = await db.execute(
+                    text(
+                        f"SELECT 1 FROM {DEFAULT_PARTITION} "
+                        "WHERE sent_at >= :start AND sent_at < :end LIMIT 1"
+                    ),
+                    {"start": start, "end": end}
+                )
+                if conflict.first() is not None:
+                    logger.warning(
+                        f"Default partition holds rows for {start:%Y-%m}, "
+                        f"skipping creation of {name}"
+                    )
+                    continue
+
+                await db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                ))
+                await db.commit()
+                created.append(name)
+
+        if created:
+            logger.info(f"Created message partitions: {', '.join(created)}")
+        return created
+
+    async def move_cold_partitions(
+        self,
+        hot_months: Optional[int] = None,
+        tablespace: Optional[str] = None,
+        today: Optional[date] = None
+    ) -> List[str]:
+        """將超過熱資料期限的分區移至冷儲存 tablespace
+
+        ALTER TABLE ... SET TABLESPACE 會重寫分區並持有排他鎖，
+        只應用於不再寫入的舊月份分區。
+
+        Args:
+            hot_months: 保留在預設 tablespace 的月數（預設 MESSAGE_PARTITION_HOT_MONTHS）
+            tablespace: 冷儲存 tablespace（預設 MESSAGE_COLD_TABLESPACE，空字串表示停用）
+            today: 基準日期（預設今天，供測試使用）
+
+        Returns:
+            本次移動的分區名稱
+        """
+        if hot_months is None:
+            hot_months = settings.MESSAGE_PARTITION_HOT_MONTHS
+        if tablespace is None:
+            tablespace = settings.MESSAGE_COLD_TABLESPACE
+        if not tablespace:
+            return []
+
+        cutoff = add_months(month_start(today or datetime.now(timezone.utc).date()), -hot_months)
+
+        moved = []
+        SessionFactory = self._get_session_factory()
+        async with SessionFactory() as db:
+            if not await self._is_partitioned(db):
+                return moved
+
+            for name, current_tablespace in await self.list_partitions(db):
+                month = parse_partition_month(name)
+                if month is None or month >= cutoff or current_tablespace == tablespace:
+                    continue
+
+                await db.execute(text(f'ALTER TABLE {name} SET TABLESPACE "{tablespace}"'))
+                await db.commit()
+                moved.append(name)
+                logger.info(f"Moved message partition {name} to tablespace {tablespace}")
+
+        return moved
+
+    async def run_maintenance(self) -> None:
+        """執行一次完整的分區維護"""
+        await self.ensure_partitions()
+        await self.move_cold_partitions()
+
+    async def start_maintenance_task(self):
+        """啟動定期維護任務（啟動時立即執行一次）"""
+        if self._maintenance_task is None:
+            self._maintenance_task = asyncio.create_task(self._periodic_maintenance())
+            logger.info("Started message partition maintenance task")
+
+    async def stop_maintenance_task(self):
+        """停止定期維護任務"""
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+            try:
+                await self._maintenance_task
+            except asyncio.CancelledError:
+                pass
+            self._maintenance_task = None
+            logger.info("Stopped message partition maintenance task")
+
+    async def _periodic_maintenance(self):
+        """定期維護分區"""
+        while True:
+            try:
+                await self.run_maintenance()
+                await asyncio.sleep(settings.MESSAGE_PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+            except asyncio.CancelledError:
+                logger.info("Message partition maintenance task cancelled")
+                break
+            except Exception as e:
+                logger.error(f"Error in message partition maintenance: {e}", exc_info=True)
+                await asyncio.sleep(settings.MESSAGE_PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+
+
+# 全局單例實例
+message_partitions = MessagePartitionManager()
@@ -0,0 +1,205 @@
+"""審核日誌批次寫入器 - 緩衝 ModerationLog，定期以多列 INSERT 寫入
+
+聊天訊息觸發審核時只將日誌排入記憶體緩衝，不再逐則開啟 Session 與提交：
+
+- 每 MODERATION_LOG_FLUSH_INTERVAL_MS 毫秒，或緩衝達 MODERATION_LOG_BATCH_SIZE 筆時寫入
+- 一批日誌以一條 executemany INSERT（SQLAlchemy insertmanyvalues 合併為多列 VALUES）
+  在獨立 Session 中提交，主事務回滾不影響日誌（審計需求）
+- 寫入失敗時放回緩衝下次重試；緩衝上限 MODERATION_LOG_MAX_BUFFER 筆，超過時丟棄最舊的日誌
+- 關閉時（lifespan）停止 writer 並寫入剩餘日誌
+- writer 未啟動時（腳本、測試）log() 立即寫入，行為與逐筆寫入相同
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import logging
+import uuid
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.models.moderation import ModerationLog
+
+logger = logging.getLogger(__name__)
+
+
+def build_log_row(
+    user_id: uuid.UUID,
+    content_type: str,
+    content: str,
+    is_approved: bool,
+    violations: List[str],
+    triggered_word_ids: List[uuid.UUID],
+    action_taken: str
+) -> Dict[str, Any]:
+    """建立一筆 moderation_logs 的 INSERT 參數"""
+    return {
+        "id": uuid.uuid4(),
+        "user_id": user_id,
+        "content_type": content_type,
+        "original_content": content,
+        "is_approved": is_approved,
+        "violations": json.dumps(violations, ensure_ascii=False) if violations else None,
+        "triggered_word_ids": (
+            json.dumps([str(wid) for wid in triggered_word_ids])
+            if triggered_word_ids else None
+        ),
+        "action_taken": action_taken,
+        # 記錄審核當下的時間，而非批次寫入的時間
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+class ModerationLogWriter:
+    """審核日誌批次寫入器"""
+
+    def __init__(self):
+        self._buffer: List[Dict[str, Any]] = []
+        self._writer_task: Optional[asyncio.Task] = None
+        self._session_factory: Optional[async_sessionmaker] = None
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+
+        # 本行程的寫入指標
+        self.written_total = 0
+        self.dropped_total = 0
+
+    def set_session_factory(self, factory: async_sessionmaker) -> None:
+        """設定 session factory（供測試注入）"""
+        self._session_factory = factory
+
+    def reset_session_factory(self) -> None:
+        """重設 session factory 為預設（正式環境）"""
+        self._session_factory = None
+
+    def _get_session_factory(self) -> async_sessionmaker:
+        """取得要使用的 session factory"""
+        if self._session_factory is not None:
+            return self._session_factory
+        from app.core.database import AsyncSessionLocal
+        return AsyncSessionLocal
+
+    @property
+    def pending(self) -> int:
+        """緩衝中尚未寫入的日誌數"""
+        return len(self._buffer)
+
+    async def log(
+        self,
+        user_id: uuid.UUID,
+        content_type: str,
+        content: str,
+        is_approved: bool,
+        violations: List[str],
+        triggered_word_ids: List[uuid.UUID],
+        action_taken: str
+    ) -> None:
+        """
+        排入一筆審核日誌
+
+        Args:
+            user_id: 用戶 ID
+            content_type: 內容類型
+            content: 原始內容
+            is_approved: 是否通過
+            violations: 違規項目
+            triggered_word_ids: 觸發的敏感詞 ID
+            action_taken: 採取的動作
+        """
+        self._buffer.append(build_log_row(
+            user_id, content_type, content, is_approved, violations,
+            triggered_word_ids, action_taken
+        ))
+        self._trim_buffer()
+
+        if self._writer_task is None:
+            await self.flush()
+        elif len(self._buffer) >= settings.MODERATION_LOG_BATCH_SIZE:
+            self._wakeup.set()
+
+    def _trim_buffer(self) -> None:
+        """緩衝超過上限時丟棄最舊的日誌"""
+        overflow = len(self._buffer) - settings.MODERATION_LOG_MAX_BUFFER
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped_total += overflow
+            logger.warning(f"Moderation log buffer full, dropped {overflow} oldest entries")
+
+    async def flush(self) -> int:
+        """
+        寫入緩衝中的日誌
+
+        Returns:
+            int: 寫入的日誌數
+        """
+        async with self._flush_lock:
+            written = 0
+            while self._buffer:
+                rows = self._buffer[:settings.MODERATION_LOG_BATCH_SIZE]
+                del self._buffer[:len(rows)]
+
+                SessionFactory = self._get_session_factory()
+                async with SessionFactory() as db:
+                    try:
+                        await db.execute(insert(ModerationLog), rows)
+                        await db.commit()
+                    except asyncio.CancelledError:
+                        # 關閉時取消：放回緩衝，由 stop_writer 的最後一次寫入處理
+                        self._buffer[:0] = rows
+                        raise
+                    except Exception as e:
+                        # 日誌寫入失敗不應影響主流程，放回緩衝留待下次重試
+                        logger.error(
+                            f"Failed to write {len(rows)} moderation logs: {e}", exc_info=True
+                        )
+                        await db.rollback()
+                        self._buffer[:0] = rows
+                        self._trim_buffer()
+                        break
+
+                written += len(rows)
+                self.written_total += len(rows)
+            return written
+
+    async def start_writer(self):
+        """啟動背景 writer"""
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._run_writer())
+            logger.info("Started moderation log writer")
+
+    async def stop_writer(self):
+        """停止背景 writer 並寫入剩餘日誌"""
+        if self._writer_task:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+            logger.info("Stopped moderation log writer")
+        await self.flush()
+
+    async def _run_writer(self):
+        """每個寫入間隔（或緩衝達批次大小時）寫入一次"""
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(),
+                        timeout=settings.MODERATION_LOG_FLUSH_INTERVAL_MS / 1000
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.flush()
+            except asyncio.CancelledError:
+                logger.info("Moderation log writer cancelled")
+                break
+            except Exception as e:
+                logger.error(f"Error in moderation log writer: {e}", exc_info=True)
+
+
+# 全局單例實例
+moderation_log_writer = ModerationLogWriter()
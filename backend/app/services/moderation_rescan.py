@@ -0,0 +1,508 @@
+"""敏感詞重新掃描 - 新增敏感詞後回溯檢查既有個人檔案與近期訊息
+
+新增（或重新啟用）敏感詞時建立 PROFILES、MESSAGES 兩個工作，只比對新增的詞，
+已記錄過的違規不會重複記錄。背景 worker 逐段處理：
+
+- 領取：UPDATE ... WHERE id = (SELECT ... FOR UPDATE SKIP LOCKED) RETURNING，
+  取得待處理或租約過期的工作；多個副本同時執行也不會重複處理
+- 讀取：短事務以 keyset（訊息為 (sent_at, id)，個人檔案為 id）讀取一段，
+  讀完即結束事務；訊息只掃描 since 至 until（工作建立或最後一次併入新詞的時間，
+  之後的訊息發送時已用新詞審核）
+- 比對：整段內容送到審核專用行程池（moderation_executor）以編譯後的比對器掃描，
+  不佔用事件迴圈，也不與上傳的圖片處理搶用行程池
+- 寫入：違規記錄以多列 INSERT 寫入 moderation_logs，與游標、進度、租約續期
+  同一個短事務提交；工作被取消或租約被接手時整段回滾
+- 續跑：中斷（重啟、錯誤）後由下一次領取從游標繼續；處理失敗累計達
+  MODERATION_RESCAN_MAX_ATTEMPTS 次的工作改為 FAILED，不再領取
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+from sqlalchemy import func, insert, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.match import Message
+from app.models.moderation import ModerationLog, ModerationRescanJob, SensitiveWord
+from app.models.profile import Profile
+from app.services.content_moderation import ContentModerationService
+from app.services.moderation_log_writer import build_log_row
+from app.services.process_executor import moderation_executor
+from app.services.word_matcher import SensitiveWordMatcher
+
+logger = logging.getLogger(__name__)
+
+# 掃描對象
+RESCAN_PROFILES = "PROFILES"
+RESCAN_MESSAGES = "MESSAGES"
+
+# 行程池中以 matcher_key 快取的比對器（同一工作的每一段不需重新編譯）
+_worker_matcher: Optional[Tuple[str, SensitiveWordMatcher]] = None
+
+
+def scan_records(
+    matcher_key: str,
+    words: List[Dict],
+    records: List[List[Tuple[str, str]]]
+) -> List[Tuple[int, Dict]]:
+    """以敏感詞掃描一段記錄（於行程池執行）
+
+    Args:
+        matcher_key: 敏感詞列表的識別碼，相同時沿用已編譯的比對器
+        words: 敏感詞字典列表
+        records: 每筆記錄的 (標籤, 內容) 欄位列表
+
+    Returns:
+        違規記錄的 (索引, 審核日誌欄位) 列表
+    """
+    global _worker_matcher
+    if _worker_matcher is None or _worker_matcher[0] != matcher_key:
+        _worker_matcher = (matcher_key, SensitiveWordMatcher(words))
+    matcher = _worker_matcher[1]
+
+    flagged = []
+    for index, items in enumerate(records):
+        # 回溯掃描只針對敏感詞，可疑模式在發送時已檢查過
+        results = ContentModerationService.scan_many(matcher, items, suspicious_patterns=False)
+        entry = ContentModerationService.consolidate(items, results)
+        if entry:
+            flagged.append((index, entry))
+    return flagged
+
+
+class ModerationRescanService:
+    """敏感詞重新掃描工作管理器"""
+
+    def __init__(self):
+        self._worker_task: Optional[asyncio.Task] = None
+        self._session_factory: Optional[async_sessionmaker] = None
+        self._wakeup = asyncio.Event()
+        # 本 worker 的租約識別碼
+        self._owner = uuid.uuid4()
+        # 最近一段的吞吐量（筆/秒）
+        self.last_chunk_rate: Optional[float] = None
+
+    def set_session_factory(self, factory: async_sessionmaker) -> None:
+        """設定 session factory（供測試注入）"""
+        self._session_factory = factory
+
+    def reset_session_factory(self) -> None:
+        """重設 session factory 為預設（正式環境）"""
+        self._session_factory = None
+
+    def _get_session_factory(self) -> async_sessionmaker:
+        """取得要使用的 session factory"""
+        if self._session_factory is not None:
+            return self._session_factory
+        from app.core.database import AsyncSessionLocal
+        return AsyncSessionLocal
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        word_ids: Optional[Sequence[uuid.UUID]] = None,
+        targets: Sequence[str] = (RESCAN_PROFILES, RESCAN_MESSAGES),
+        since: Optional[datetime] = None,
+        created_by: Optional[uuid.UUID] = None
+    ) -> List[ModerationRescanJob]:
+        """建立重新掃描工作
+
+        只加入 Session，由呼叫端提交；提交後呼叫 notify() 喚醒 worker。
+        同一對象已有待處理且指定敏感詞的工作時，將新詞併入該工作。
+
+        Args:
+            db: 資料庫 Session
+            word_ids: 要比對的敏感詞 ID（None 表示所有啟用的敏感詞）
+            targets: 掃描對象
+            since: 訊息掃描起點（預設 MODERATION_RESCAN_MESSAGE_DAYS 天前）
+            created_by: 觸發的管理員 ID
+
+        Returns:
+            新建立或併入的工作
+        """
+        now = datetime.now(timezone.utc)
+        if since is None:
+            since = now - timedelta(days=settings.MODERATION_RESCAN_MESSAGE_DAYS)
+
+        jobs = []
+        for target in targets:
+            job = None
+            if word_ids is not None:
+                job = (
+                    await db.execute(
+                        select(ModerationRescanJob)
+                        .where(
+                            ModerationRescanJob.target == target,
+                            ModerationRescanJob.status == "PENDING",
+                            ModerationRescanJob.word_ids.is_not(None),
+                        )
+                        .order_by(ModerationRescanJob.created_at)
+                        .limit(1)
+                        .with_for_update()
+                    )
+                ).scalar_one_or_none()
+
+            if job is not None:
+                merged = json.loads(job.word_ids) + [str(wid) for wid in word_ids]
+                job.word_ids = json.dumps(list(dict.fromkeys(merged)))
+                if target == RESCAN_MESSAGES:
+                    # 併入的新詞尚未審核過工作建立後發送的訊息，終點延後到現在
+                    job.since = min(job.since, since)
+                    job.until = now
+            else:
+                job = ModerationRescanJob(
+                    target=target,
+                    status="PENDING",
+                    word_ids=(
+                        json.dumps([str(wid) for wid in word_ids]) if word_ids is not None else None
+                    ),
+                    since=since if target == RESCAN_MESSAGES else None,
+                    until=now if target == RESCAN_MESSAGES else None,
+                    scanned_count=0,
+                    flagged_count=0,
+                    created_by=created_by,
+                )
+                db.add(job)
+            jobs.append(job)
+        return jobs
+
+    def notify(self) -> None:
+        """喚醒本行程的 worker"""
+        self._wakeup.set()
+
+    async def cancel(self, db: AsyncSession, job_id: uuid.UUID) -> bool:
+        """取消待處理或執行中的工作（執行中的工作在下一段提交時停止）
+
+        Returns:
+            bool: 是否已取消
+        """
+        result = await db.execute(
+            update(ModerationRescanJob)
+            .where(
+                ModerationRescanJob.id == job_id,
+                ModerationRescanJob.status.in_(["PENDING", "RUNNING"]),
+            )
+            .values(status="CANCELLED", finished_at=datetime.now(timezone.utc), lease_owner=None)
+        )
+        await db.commit()
+        return result.rowcount > 0
+
+    async def _claim_job(self, db: AsyncSession) -> Optional[ModerationRescanJob]:
+        """領取一個待處理或租約過期的工作"""
+        now = datetime.now(timezone.utc)
+        claimable = (
+            select(ModerationRescanJob.id)
+            .where(or_(
+                ModerationRescanJob.status == "PENDING",
+                (ModerationRescanJob.status == "RUNNING")
+                & (ModerationRescanJob.lease_expires_at < now),
+            ))
+            .order_by(ModerationRescanJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await db.execute(
+            update(ModerationRescanJob)
+            .where(ModerationRescanJob.id == claimable)
+            .values(
+                status="RUNNING",
+                lease_owner=self._owner,
+                lease_expires_at=now + timedelta(seconds=settings.MODERATION_RESCAN_LEASE_SECONDS),
+                started_at=func.coalesce(ModerationRescanJob.started_at, now),
+            )
+            .returning(ModerationRescanJob)
+            .execution_options(synchronize_session=False)
+        )
+        job = result.scalar_one_or_none()
+        await db.commit()
+        return job
+
+    async def _load_words(self, db: AsyncSession, job: ModerationRescanJob) -> List[Dict]:
+        """載入工作要比對的敏感詞（只含仍啟用者）"""
+        query = select(SensitiveWord).where(SensitiveWord.is_active.is_(True))
+        if job.word_ids is not None:
+            query = query.where(
+                SensitiveWord.id.in_([uuid.UUID(wid) for wid in json.loads(job.word_ids)])
+            )
+        words = (await db.execute(query)).scalars().all()
+        return [ContentModerationService.serialize_word(word) for word in words]
+
+    async def _read_chunk(
+        self, db: AsyncSession, job: ModerationRescanJob, limit: int
+    ) -> Tuple[List[List[Tuple[str, str]]], List[uuid.UUID], Optional[Tuple]]:
+        """以 keyset 讀取下一段記錄
+
+        Returns:
+            (records, user_ids, last_key)：每筆記錄的欄位、所屬用戶、最後一筆的游標
+        """
+        if job.target == RESCAN_MESSAGES:
+            query = (
+                select(Message.id, Message.sent_at, Message.sender_id, Message.content)
+                .where(
+                    Message.sent_at >= job.since,
+                    Message.sent_at <= job.until,
+                    Message.deleted_at.is_(None),
+                    Message.message_type == "TEXT",
+                )
+                .order_by(Message.sent_at, Message.id)
+                .limit(limit)
+            )
+            if job.cursor_id is not None:
+                query = query.where(
+                    tuple_(Message.sent_at, Message.id)
+                    > tuple_(job.cursor_sent_at, job.cursor_id)
+                )
+            rows = (await db.execute(query)).all()
+            records = [[("訊息", row.content)] for row in rows]
+            user_ids = [row.sender_id for row in rows]
+            last_key = (rows[-1].sent_at, rows[-1].id) if rows else None
+        else:
+            query = (
+                select(Profile.id, Profile.user_id, Profile.display_name, Profile.bio)
+                .order_by(Profile.id)
+                .limit(limit)
+            )
+            if job.cursor_id is not None:
+                query = query.where(Profile.id > job.cursor_id)
+            rows = (await db.execute(query)).all()
+            records = [[("顯示名稱", row.display_name), ("個人簡介", row.bio or "")] for row in rows]
+            user_ids = [row.user_id for row in rows]
+            last_key = (None, rows[-1].id) if rows else None
+        return records, user_ids, last_key
+
+    async def _process_chunk(
+        self,
+        job: ModerationRescanJob,
+        words: List[Dict],
+        matcher_key: str,
+        chunk_size: int
+    ) -> Optional[bool]:
+        """處理一段記錄並提交進度
+
+        Returns:
+            True 表示工作完成；False 表示還有下一段；None 表示工作已取消或租約被接手
+        """
+        started = time.perf_counter()
+        SessionFactory = self._get_session_factory()
+
+        if words:
+            # 讀取事務只涵蓋這一段的查詢
+            async with SessionFactory() as db:
+                records, user_ids, last_key = await self._read_chunk(db, job, chunk_size)
+                await db.commit()
+        else:
+            # 要比對的詞都已停用：不需掃描，直接完成
+            records, user_ids, last_key = [], [], None
+
+        flagged = (
+            await moderation_executor.run(scan_records, matcher_key, words, records)
+            if records else []
+        )
+
+        now = datetime.now(timezone.utc)
+        done = not words or len(records) < chunk_size
+        values: Dict[str, Any] = {
+            "scanned_count": ModerationRescanJob.scanned_count + len(records),
+            "flagged_count": ModerationRescanJob.flagged_count + len(flagged),
+            "lease_expires_at": now + timedelta(seconds=settings.MODERATION_RESCAN_LEASE_SECONDS),
+            "updated_at": now,
+        }
+        if last_key is not None:
+            values["cursor_sent_at"], values["cursor_id"] = last_key
+        if done:
+            values.update(status="COMPLETED", finished_at=now, lease_owner=None)
+
+        content_type = "MESSAGE" if job.target == RESCAN_MESSAGES else "PROFILE"
+        async with SessionFactory() as db:
+            try:
+                result = await db.execute(
+                    update(ModerationRescanJob)
+                    .where(
+                        ModerationRescanJob.id == job.id,
+                        ModerationRescanJob.status == "RUNNING",
+                        ModerationRescanJob.lease_owner == self._owner,
+                    )
+                    .values(**values)
+                )
+                if result.rowcount == 0:
+                    await db.rollback()
+                    logger.info(f"Rescan job {job.id} cancelled or taken over, stopping")
+                    return None
+
+                if flagged:
+                    await db.execute(insert(ModerationLog), [
+                        build_log_row(user_ids[index], content_type, **entry)
+                        for index, entry in flagged
+                    ])
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+
+        if last_key is not None:
+            job.cursor_sent_at, job.cursor_id = last_key
+
+        elapsed = time.perf_counter() - started
+        self.last_chunk_rate = len(records) / elapsed if elapsed > 0 else None
+        logger.debug(
+            f"Rescan job {job.id}: scanned {len(records)} {job.target.lower()}, "
+            f"flagged {len(flagged)} ({len(records) / max(elapsed, 1e-9):.0f}/s)"
+        )
+        return done
+
+    async def process_next_job(self, chunk_size: Optional[int] = None) -> bool:
+        """領取並執行一個工作直到完成、取消或租約被接手
+
+        Args:
+            chunk_size: 每段記錄數（預設 MODERATION_RESCAN_CHUNK_SIZE）
+
+        Returns:
+            bool: 是否領取到工作
+        """
+        if chunk_size is None:
+            chunk_size = settings.MODERATION_RESCAN_CHUNK_SIZE
+
+        SessionFactory = self._get_session_factory()
+        async with SessionFactory() as db:
+            job = await self._claim_job(db)
+            if job is None:
+                return False
+            words = await self._load_words(db, job)
+            await db.commit()
+
+        logger.info(f"Rescan job {job.id} ({job.target}) started with {len(words)} words")
+        # 每次領取使用新的識別碼，行程池中的比對器只在同一次執行內沿用
+        matcher_key = f"{job.id}:{uuid.uuid4().hex}"
+
+        try:
+            while True:
+                done = await self._process_chunk(job, words, matcher_key, chunk_size)
+                if done is None or done:
+                    break
+        except Exception as e:
+            await self._release(job, str(e))
+            raise
+
+        if done:
+            logger.info(f"Rescan job {job.id} ({job.target}) completed")
+        return True
+
+    async def _release(self, job: ModerationRescanJob, error: str) -> None:
+        """處理失敗：記錄錯誤並釋放租約，由下一次領取從游標續跑
+
+        失敗次數達 MODERATION_RESCAN_MAX_ATTEMPTS 時改為 FAILED，不再重試。
+        """
+        now = datetime.now(timezone.utc)
+        SessionFactory = self._get_session_factory()
+        async with SessionFactory() as db:
+            attempts = (
+                await db.execute(
+                    update(ModerationRescanJob)
+                    .where(
+                        ModerationRescanJob.id == job.id,
+                        ModerationRescanJob.status == "RUNNING",
+                        ModerationRescanJob.lease_owner == self._owner,
+                    )
+                    .values(
+                        attempts=ModerationRescanJob.attempts + 1,
+                        error=error[:1000],
+                        lease_expires_at=now,
+                    )
+                    .returning(ModerationRescanJob.attempts)
+                )
+            ).scalar_one_or_none()
+
+            if attempts is not None and attempts >= settings.MODERATION_RESCAN_MAX_ATTEMPTS:
+                await db.execute(
+                    update(ModerationRescanJob)
+                    .where(ModerationRescanJob.id == job.id)
+                    .values(status="FAILED", finished_at=now, lease_owner=None)
+                )
+                logger.error(f"Rescan job {job.id} ({job.target}) failed after {attempts} attempts")
+            await db.commit()
+
+    async def list_jobs(self, db: AsyncSession, limit: int = 20) -> List[ModerationRescanJob]:
+        """最近的工作（新到舊）"""
+        result = await db.execute(
+            select(ModerationRescanJob)
+            .order_by(ModerationRescanJob.created_at.desc())
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def start_worker(self):
+        """啟動背景 worker"""
+        if self._worker_task is None:
+            self._worker_task = asyncio.create_task(self._run_worker())
+            logger.info("Started moderation rescan worker")
+
+    async def stop_worker(self):
+        """停止背景 worker（進行中的一段不會提交，租約過期後續跑）"""
+        if self._worker_task:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+            logger.info("Stopped moderation rescan worker")
+
+    async def _run_worker(self):
+        """持續處理工作；沒有工作時等待喚醒或輪詢間隔"""
+        while True:
+            try:
+                self._wakeup.clear()
+                if not await self.process_next_job():
+                    try:
+                        await asyncio.wait_for(
+                            self._wakeup.wait(),
+                            timeout=settings.MODERATION_RESCAN_POLL_INTERVAL_SECONDS
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+            except asyncio.CancelledError:
+                logger.info("Moderation rescan worker cancelled")
+                break
+            except Exception as e:
+                logger.error(f"Error in moderation rescan worker: {e}", exc_info=True)
+                await asyncio.sleep(settings.MODERATION_RESCAN_POLL_INTERVAL_SECONDS)
+
+
+def job_progress(job: ModerationRescanJob) -> Dict[str, Any]:
+    """工作進度（平均吞吐量以開始到最後一次提交計算）"""
+    cursor = None
+    if job.cursor_sent_at is not None:
+        cursor = job.cursor_sent_at.isoformat()
+    elif job.cursor_id is not None:
+        cursor = str(job.cursor_id)
+
+    rate = None
+    if job.started_at and job.updated_at and job.updated_at > job.started_at:
+        rate = job.scanned_count / (job.updated_at - job.started_at).total_seconds()
+    return {
+        "id": job.id,
+        "target": job.target,
+        "status": job.status,
+        "word_ids": json.loads(job.word_ids) if job.word_ids else None,
+        "since": job.since,
+        "until": job.until,
+        "scanned_count": job.scanned_count,
+        "flagged_count": job.flagged_count,
+        "items_per_second": rate,
+        "cursor": cursor,
+        "attempts": job.attempts,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+# 全局單例實例
+moderation_rescan = ModerationRescanService()
@@ -0,0 +1,134 @@
+"""通知保留期限服務 - 定期批次清除過期的已讀通知
+
+notifications 表只會成長，保留所有已讀通知會讓熱資料與索引持續膨脹。
+此服務定期刪除超過 NOTIFICATION_RETENTION_DAYS 天的已讀通知：
+
+- 以 NOTIFICATION_RETENTION_BATCH_SIZE 筆為一批，每批獨立事務，避免長事務與大量鎖
+- 子查詢使用 FOR UPDATE SKIP LOCKED，多個 worker 同時執行也不會互相阻塞
+- 使用 idx_notifications_read_created 部分索引（WHERE is_read = true）定位過期資料
+- 未讀通知不會被清除
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import asyncio
+import logging
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.models.notification import Notification
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationRetention:
+    """通知保留期限管理器"""
+
+    def __init__(self):
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self._session_factory: Optional[async_sessionmaker] = None
+
+    def set_session_factory(self, factory: async_sessionmaker) -> None:
+        """設定 session factory（供測試注入）"""
+        self._session_factory = factory
+
+    def reset_session_factory(self) -> None:
+        """重設 session factory 為預設（正式環境）"""
+        self._session_factory = None
+
+    def _get_session_factory(self) -> async_sessionmaker:
+        """取得要使用的 session factory"""
+        if self._session_factory is not None:
+            return self._session_factory
+        from app.core.database import AsyncSessionLocal
+        return AsyncSessionLocal
+
+    async def purge_expired(
+        self,
+        retention_days: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ) -> int:
+        """批次刪除過期的已讀通知
+
+        Args:
+            retention_days: 保留天數（預設 NOTIFICATION_RETENTION_DAYS）
+            batch_size: 每批刪除筆數（預設 NOTIFICATION_RETENTION_BATCH_SIZE）
+
+        Returns:
+            int: 刪除的通知數量
+        """
+        if retention_days is None:
+            retention_days = settings.NOTIFICATION_RETENTION_DAYS
+        if batch_size is None:
+            batch_size = settings.NOTIFICATION_RETENTION_BATCH_SIZE
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+        SessionFactory = self._get_session_factory()
+        total_deleted = 0
+
+        while True:
+            expired_ids = (
+                select(Notification.id)
+                .where(
+                    Notification.is_read == True,  # noqa: E712
+                    Notification.created_at < cutoff
+                )
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+
+            async with SessionFactory() as db:
+                result = await db.execute(
+                    delete(Notification)
+                    .where(Notification.id.in_(expired_ids))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+
+            deleted = result.rowcount or 0
+            total_deleted += deleted
+            if deleted < batch_size:
+                break
+
+            # 批次之間讓出事件循環，避免長時間佔用
+            await asyncio.sleep(0)
+
+        if total_deleted:
+            logger.info(
+                f"Purged {total_deleted} read notifications older than {retention_days} days"
+            )
+        return total_deleted
+
+    async def start_cleanup_task(self):
+        """啟動定期清理任務"""
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
+            logger.info("Started notification retention task")
+
+    async def stop_cleanup_task(self):
+        """停止定期清理任務"""
+        if self._cleanup_task:
+            self._cleanup_task.cancel()
+            try:
+                await self._cleanup_task
+            except asyncio.CancelledError:
+                pass
+            self._cleanup_task = None
+            logger.info("Stopped notification retention task")
+
+    async def _periodic_cleanup(self):
+        """定期清除過期通知（間隔 NOTIFICATION_RETENTION_INTERVAL_SECONDS）"""
+        while True:
+            try:
+                await asyncio.sleep(settings.NOTIFICATION_RETENTION_INTERVAL_SECONDS)
+                await self.purge_expired()
+            except asyncio.CancelledError:
+                logger.info("Notification retention task cancelled")
+                break
+            except Exception as e:
+                logger.error(f"Error in notification retention: {e}", exc_info=True)
+
+
+# 全局單例實例
+notification_retention = NotificationRetention()
@@ -0,0 +1,282 @@
+"""通知服務 - 同類通知合併（Coalescing）
+
+熱門用戶每小時可能收到上百個 Like，若每次都新增一筆 Notification 並推送一次
+WebSocket，會造成通知表快速膨脹與寫入放大。
+
+合併策略：
+- 儲存：同一用戶、同一 group_key 的未讀通知，在 NOTIFICATION_COALESCE_WINDOW_SECONDS
+  內合併為一筆並累加 group_count（例如「12 人喜歡你！」）
+- 推送：同一分組在 NOTIFICATION_PUSH_INTERVAL_SECONDS 內最多即時推送一次，
+  間隔內的更新於間隔結束時以最新的合併結果補推一次（leading + trailing throttle）
+
+已讀的通知不再合併，之後的事件會建立新的一筆。
+
+並發：查詢前以 (user_id, group_key) 取得交易級 advisory lock，
+確保同一分組的「查詢 → 累加或新增」序列化執行；
+僅靠 SELECT ... FOR UPDATE 在尚無通知時鎖不到任何列，
+兩個同時到達的首次事件會各自新增一筆。
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+import time
+import uuid
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.notification import Notification
+from app.websocket.manager import manager
+
+logger = logging.getLogger(__name__)
+
+# 通知分組
+GROUP_KEY_LIKED = "liked"
+
+
+def message_group_key(match_id: uuid.UUID) -> str:
+    """取得訊息通知的分組鍵（依配對分組）"""
+    return f"message:{match_id}"
+
+
+class NotificationService:
+    """通知建立與推送服務"""
+
+    # 推送節流狀態：(user_id, group_key) -> 最後推送時間（monotonic）
+    _last_push: Dict[Tuple[str, str], float] = {}
+    # 節流期間待補推的最新 payload
+    _pending_push: Dict[Tuple[str, str], dict] = {}
+    # 補推任務
+    _flush_tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+    # 節流狀態最大追蹤數（超過時清理過期項目）
+    _max_tracked_groups: int = 10000
+
+    # ==================== 儲存合併 ====================
+
+    @classmethod
+    async def _find_coalescible(
+        cls,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        notification_type: str,
+        group_key: str
+    ) -> Optional[Notification]:
+        """查詢可合併的未讀通知（分組 advisory lock 避免並發重複新增或累加遺失）
+
+        鎖在交易提交或回滾時自動釋放。
+
+        Args:
+            db: 資料庫 session
+            user_id: 接收者 ID
+            notification_type: 通知類型
+            group_key: 分組鍵
+
+        Returns:
+            窗口內最新的同組未讀通知，沒有則 None
+        """
+        await db.execute(
+            select(func.pg_advisory_xact_lock(
+                func.hashtext(f"notification:{user_id}:{group_key}")
+            ))
+        )
+
+        window_start = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.NOTIFICATION_COALESCE_WINDOW_SECONDS
+        )
+        result = await db.execute(
+            select(Notification)
+            .where(
+                Notification.user_id == user_id,
+                Notification.type == notification_type,
+                Notification.group_key == group_key,
+                Notification.is_read == False,  # noqa: E712
+                Notification.created_at >= window_start
+            )
+            .order_by(Notification.created_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def record_liked(
+        cls,
+        db: AsyncSession,
+        user_id: uuid.UUID
+    ) -> Notification:
+        """建立或合併「有人喜歡你」通知
+
+        Args:
+            db: 資料庫 session
+            user_id: 被喜歡的用戶 ID
+
+        Returns:
+            建立或更新後的通知
+        """
+        notification = await cls._find_coalescible(
+            db, user_id, "notification_liked", GROUP_KEY_LIKED
+        )
+
+        if notification:
+            notification.group_count += 1
+            notification.title = f"{notification.group_count} 人喜歡你！"
+            notification.content = (
+                f"有 {notification.group_count} 個人對你心動了，快去探索看看吧！"
+            )
+            notification.updated_at = datetime.now(timezone.utc)
+        else:
+            notification = Notification(
+                user_id=user_id,
+                type="notification_liked",
+                title="有人喜歡你！",
+                content="有人對你心動了，快去探索看看吧！",
+                data={},
+                group_key=GROUP_KEY_LIKED,
+                group_count=1
+            )
+            db.add(notification)
+
+        await db.commit()
+        return notification
+
+    @classmethod
+    async def record_message(
+        cls,
+        db: AsyncSession,
+        user_id: uuid.UUID,
+        match_id: uuid.UUID,
+        sender_id: uuid.UUID,
+        sender_name: str,
+        preview: str,
+        message_id: uuid.UUID
+    ) -> Notification:
+        """建立或合併新訊息通知（同一配對的未讀訊息通知合併為一筆）
+
+        Args:
+            db: 資料庫 session
+            user_id: 接收者 ID
+            match_id: 配對 ID
+            sender_id: 發送者 ID
+            sender_name: 發送者名稱
+            preview: 最新訊息預覽
+            message_id: 最新訊息 ID
+
+        Returns:
+            建立或更新後的通知
+        """
+        group_key = message_group_key(match_id)
+        data = {
+            "match_id": str(match_id),
+            "sender_id": str(sender_id),
+            "sender_name": sender_name,
+            "message_id": str(message_id)
+        }
+
+        notification = await cls._find_coalescible(
+            db, user_id, "notification_message", group_key
+        )
+
+        if notification:
+            notification.group_count += 1
+            notification.title = f"{sender_name} 傳來 {notification.group_count} 則新訊息"
+            notification.content = preview
+            notification.data = data
+            notification.updated_at = datetime.now(timezone.utc)
+        else:
+            notification = Notification(
+                user_id=user_id,
+                type="notification_message",
+                title=f"{sender_name} 傳來新訊息",
+                content=preview,
+                data=data,
+                group_key=group_key,
+                group_count=1
+            )
+            db.add(notification)
+
+        await db.commit()
+        return notification
+
+    # ==================== 推送節流 ====================
+
+    @classmethod
+    async def push_coalesced(
+        cls,
+        user_id: str,
+        group_key: str,
+        payload: dict
+    ) -> bool:
+        """推送合併通知（同一分組節流）
+
+        間隔內第一次事件立即推送；之後的事件只保留最新 payload，
+        於間隔結束時補推一次。
+
+        Args:
+            user_id: 接收者 ID
+            group_key: 分組鍵
+            payload: WebSocket 訊息內容
+
+        Returns:
+            True 表示已立即推送，False 表示延後補推
+        """
+        interval = settings.NOTIFICATION_PUSH_INTERVAL_SECONDS
+        if interval <= 0:
+            await manager.send_personal_message(user_id, payload)
+            return True
+
+        key = (user_id, group_key)
+        now = time.monotonic()
+        last = cls._last_push.get(key)
+
+        if last is None or now - last >= interval:
+            cls._last_push[key] = now
+            cls._prune_push_state(now, interval)
+            await manager.send_personal_message(user_id, payload)
+            return True
+
+        cls._pending_push[key] = payload
+        if key not in cls._flush_tasks:
+            delay = interval - (now - last)
+            cls._flush_tasks[key] = asyncio.create_task(cls._flush_later(key, delay))
+        return False
+
+    @classmethod
+    async def _flush_later(cls, key: Tuple[str, str], delay: float) -> None:
+        """間隔結束後補推最新的合併結果"""
+        try:
+            await asyncio.sleep(delay)
+            payload = cls._pending_push.pop(key, None)
+            if payload is not None:
+                cls._last_push[key] = time.monotonic()
+                await manager.send_personal_message(key[0], payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Failed to flush coalesced notification for {key}: {e}")
+        finally:
+            cls._flush_tasks.pop(key, None)
+
+    @classmethod
+    def _prune_push_state(cls, now: float, interval: int) -> None:
+        """清理已過節流間隔的追蹤項目，避免內存無限成長"""
+        if len(cls._last_push) <= cls._max_tracked_groups:
+            return
+        stale = [
+            key for key, last in cls._last_push.items()
+            if now - last >= interval and key not in cls._flush_tasks
+        ]
+        for key in stale:
+            cls._last_push.pop(key, None)
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """取消尚未執行的補推任務（應用關閉時調用）"""
+        tasks = list(cls._flush_tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        cls._flush_tasks.clear()
+        cls._pending_push.clear()
+        cls._last_push.clear()
@@ -0,0 +1,258 @@
+"""照片感知雜湊（pHash）與近似比對索引
+
+用於自動審核：新上傳的照片若與已拒絕照片、或被封禁使用者的照片
+幾乎相同（漢明距離很小），即可標記或直接拒絕，不需人工重複審核。
+
+- pHash：灰階縮為 32x32，取二維 DCT 左上 8x8 低頻係數，
+  以中位數為界得到 64-bit 雜湊；對縮放、重新壓縮、輕微調色不敏感
+- BK-tree：以漢明距離為度量的度量樹，查詢距離 <= d 的雜湊
+  只需走訪少部分節點
+"""
+import asyncio
+import logging
+import math
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.moderation import PhotoHashBlocklist
+from app.models.profile import Photo, Profile
+from app.models.user import User
+from app.services.file_storage import open_image
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+_HASH_MASK = (1 << HASH_BITS) - 1
+
+# pHash 取樣尺寸與低頻係數範圍
+_PHASH_IMAGE_SIZE = 32
+_PHASH_LOW_FREQ = 8
+
+# DCT-II 餘弦表：_DCT_COS[u][x] = cos(pi * (2x + 1) * u / 2N)
+_DCT_COS = [
+    [
+        math.cos(math.pi * (2 * x + 1) * u / (2 * _PHASH_IMAGE_SIZE))
+        for x in range(_PHASH_IMAGE_SIZE)
+    ]
+    for u in range(_PHASH_LOW_FREQ)
+]
+
+# 比對來源標籤
+LABEL_REJECTED_DUPLICATE = "DUPLICATE_OF_REJECTED"
+LABEL_BANNED_USER_PHOTO = "BANNED_USER_PHOTO"
+
+
+# ==================== 雜湊計算 ====================
+# 模組層級純函式（可 pickle），由 image_executor 派送至行程池執行。
+
+
+def perceptual_hash(img: Image.Image) -> int:
+    """
+    計算 64-bit pHash
+
+    Args:
+        img: 已解碼的圖片
+
+    Returns:
+        無號 64-bit 整數
+    """
+    size = _PHASH_IMAGE_SIZE
+    gray = img.convert("L").resize((size, size), Image.Resampling.LANCZOS)
+    pixels = list(gray.getdata())
+    rows = [pixels[y * size:(y + 1) * size] for y in range(size)]
+
+    # 可分離二維 DCT，只計算需要的 8x8 低頻係數
+    row_coeffs = [
+        [sum(c * p for c, p in zip(cos_u, row)) for cos_u in _DCT_COS]
+        for row in rows
+    ]
+    low_freq = [
+        sum(cos_v[y] * row_coeffs[y][u] for y in range(size))
+        for cos_v in _DCT_COS
+        for u in range(_PHASH_LOW_FREQ)
+    ]
+
+    median = sorted(low_freq)[len(low_freq) // 2]
+    value = 0
+    for coeff in low_freq:
+        value = (value << 1) | (1 if coeff > median else 0)
+    return value
+
+
+def compute_perceptual_hash(file_content: bytes) -> int:
+    """
+    解碼圖片並計算 pHash（可派送至行程池）
+
+    JPEG 以 draft 模式解碼為接近 32x32 的縮小尺寸，幾乎不需完整解碼。
+
+    Raises:
+        InvalidImageError: 圖片無效或格式不支援
+    """
+    img, _ = open_image(file_content, (_PHASH_IMAGE_SIZE, _PHASH_IMAGE_SIZE))
+    return perceptual_hash(img)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """兩個 64-bit 雜湊的漢明距離"""
+    return bin((a ^ b) & _HASH_MASK).count("1")
+
+
+def to_signed(value: int) -> int:
+    """無號 64-bit 轉為有號（PostgreSQL BIGINT）"""
+    value &= _HASH_MASK
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def to_unsigned(value: int) -> int:
+    """有號 BIGINT 轉回無號 64-bit"""
+    return value & _HASH_MASK
+
+
+# ==================== BK-tree ====================
+
+
+class BKTree:
+    """以漢明距離為度量的 BK-tree
+
+    每個節點的子節點依「與該節點的距離」分組；依三角不等式，
+    查詢距離 <= max_distance 時只需走訪距離落在
+    [d - max_distance, d + max_distance] 的子樹。
+    """
+
+    def __init__(self):
+        # 節點：(雜湊, 資料列表, {距離: 子節點})
+        self._root: Optional[Tuple[int, list, Dict[int, tuple]]] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, item) -> None:
+        """加入雜湊（相同雜湊共用節點）"""
+        self._size += 1
+        if self._root is None:
+            self._root = (value, [item], {})
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, [item], {})
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, object]]:
+        """
+        查詢距離 <= max_distance 的項目
+
+        Returns:
+            [(距離, 資料)]，依距離由近到遠排序
+        """
+        if self._root is None:
+            return []
+
+        results = []
+        stack = [self._root]
+        while stack:
+            node_value, items, children = stack.pop()
+            distance = hamming_distance(value, node_value)
+            if distance <= max_distance:
+                results.extend((distance, item) for item in items)
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for d, child in children.items() if low <= d <= high)
+
+        results.sort(key=lambda result: result[0])
+        return results
+
+
+# ==================== 比對索引 ====================
+
+
+class PhotoHashIndex:
+    """已拒絕照片與被封禁使用者照片的 pHash 索引
+
+    索引於第一次查詢時從資料庫建立，之後每 PHOTO_HASH_INDEX_TTL_SECONDS 重建
+    （涵蓋其他 worker 的拒絕與封禁）；本行程內的拒絕透過 add() 立即生效。
+    """
+
+    def __init__(self):
+        self._tree = BKTree()
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        """下次查詢時重建索引"""
+        self._loaded_at = None
+
+    def add(self, value: int, label: str, photo_id: Optional[uuid.UUID]) -> None:
+        """加入雜湊（無號 64-bit）"""
+        self._tree.add(value, (label, photo_id))
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """索引過期時從資料庫重建"""
+        ttl = settings.PHOTO_HASH_INDEX_TTL_SECONDS
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < ttl:
+            return
+
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < ttl:
+                return
+
+            tree = BKTree()
+            blocklist = await db.execute(
+                select(PhotoHashBlocklist.perceptual_hash, PhotoHashBlocklist.photo_id)
+            )
+            for value, photo_id in blocklist.all():
+                tree.add(to_unsigned(value), (LABEL_REJECTED_DUPLICATE, photo_id))
+
+            banned = await db.execute(
+                select(Photo.perceptual_hash, Photo.id)
+                .join(Profile, Photo.profile_id == Profile.id)
+                .join(User, Profile.user_id == User.id)
+                .where(
+                    User.is_active.is_(False),
+                    User.ban_reason.isnot(None),
+                    Photo.perceptual_hash.isnot(None),
+                )
+            )
+            for value, photo_id in banned.all():
+                tree.add(to_unsigned(value), (LABEL_BANNED_USER_PHOTO, photo_id))
+
+            self._tree = tree
+            self._loaded_at = time.monotonic()
+            logger.info(f"Photo hash index loaded: {len(tree)} hashes")
+
+    async def search(
+        self, db: AsyncSession, value: int, max_distance: int
+    ) -> List[Tuple[int, str, Optional[uuid.UUID]]]:
+        """
+        查詢近似雜湊
+
+        Args:
+            db: 資料庫 Session（索引過期時用於重建）
+            value: 無號 64-bit pHash
+            max_distance: 最大漢明距離
+
+        Returns:
+            [(距離, 標籤, 來源照片 ID)]，由近到遠
+        """
+        await self.ensure_loaded(db)
+        return [
+            (distance, label, photo_id)
+            for distance, (label, photo_id) in self._tree.search(value, max_distance)
+        ]
+
+
+# 全局單例實例
+photo_hash_index = PhotoHashIndex()
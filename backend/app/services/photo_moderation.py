@@ -1,26 +1,41 @@
 """照片審核服務
 
 負責照片的審核流程管理、狀態轉換、信任分數整合。
-預留自動審核擴展接口。
+自動審核以感知雜湊（pHash）比對已拒絕照片與被封禁帳號的照片（見 photo_hashing）。
 """
 import json
 import logging
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import func, select
+from sqlalchemy import func, or_, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import selectinload
 
-from app.models.moderation import ModerationLog
+from app.core.config import settings
+from app.models.moderation import ModerationLog, PhotoHashBlocklist
 from app.models.profile import Photo, Profile
 from app.models.user import User
+from app.services.file_storage import InvalidImageError
+from app.services.photo_hashing import (
+    HASH_BITS,
+    LABEL_REJECTED_DUPLICATE,
+    compute_perceptual_hash,
+    photo_hash_index,
+    to_signed,
+    to_unsigned,
+)
+from app.services.process_executor import image_executor
 from app.services.trust_score import TrustScoreService
 
 logger = logging.getLogger(__name__)
 
 
+class PhotoReviewConflictError(Exception):
+    """照片已由其他管理員領取（租約未到期）或已審核完成"""
+
+
 class PhotoModerationService:
     """照片審核服務"""
 
@@ -101,36 +116,151 @@ class PhotoModerationService:
         else:
             query = query.where(Photo.moderation_status == cls.STATUS_PENDING)
 
-        # 計算總數
-        count_query = select(func.count()).select_from(query.subquery())
+        # 計算總數（Photo -> Profile -> User 皆為非空外鍵，只需計算照片表，走狀態索引）
+        count_query = select(func.count()).select_from(Photo).where(
+            Photo.moderation_status == (status or cls.STATUS_PENDING)
+        )
         total_result = await db.execute(count_query)
         total = total_result.scalar() or 0
 
         # 分頁和排序（最舊的優先審核）
         offset = (page - 1) * page_size
-        query = query.order_by(Photo.created_at.asc()).offset(offset).limit(page_size)
+        query = (
+            query.order_by(Photo.created_at.asc(), Photo.id.asc())
+            .offset(offset)
+            .limit(page_size)
+        )
 
         result = await db.execute(query)
+        photos = [cls._photo_summary(photo, profile, user) for photo, profile, user in result.all()]
+
+        return photos, total
+
+    @classmethod
+    async def claim_pending_photos(
+        cls,
+        db: AsyncSession,
+        admin_id: uuid.UUID,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None
+    ) -> Tuple[List[Dict[str, Any]], datetime, Optional[Tuple[datetime, uuid.UUID]]]:
+        """
+        領取待審核照片（租約）
+
+        以 FOR UPDATE SKIP LOCKED 依 (created_at, id) 順序領取最舊的待審核照片，
+        並在 PHOTO_REVIEW_LEASE_SECONDS 內保留給此管理員：多位管理員同時審核
+        不會拿到相同照片，也不會互相等待鎖。已由此管理員領取的照片會一併續約。
+
+        查詢走 idx_photos_pending_created 部分索引，不計算總數，成本與佇列長度無關。
+
+        Args:
+            db: 資料庫 Session
+            admin_id: 管理員 ID
+            limit: 領取數量
+            after: keyset 游標 (created_at, id)，只領取排在其後的照片（略過目前這批）
+
+        Returns:
+            (photos, lease_expires_at, next_key): 照片列表、租約到期時間、下一批的游標
+            （領取數量未滿 limit 時為 None）
+        """
+        now = datetime.now(timezone.utc)
+        lease_expires_at = now + timedelta(seconds=settings.PHOTO_REVIEW_LEASE_SECONDS)
+
+        claimable = select(Photo.id).where(
+            Photo.moderation_status == cls.STATUS_PENDING,
+            or_(
+                Photo.review_claimed_by.is_(None),
+                Photo.review_claimed_by == admin_id,
+                Photo.review_claim_expires_at < now,
+            )
+        )
+        if after is not None:
+            claimable = claimable.where(tuple_(Photo.created_at, Photo.id) > tuple_(*after))
+        claimable = (
+            claimable
+            .order_by(Photo.created_at, Photo.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+
+        claimed = await db.execute(
+            update(Photo)
+            .where(Photo.id.in_(claimable))
+            .values(review_claimed_by=admin_id, review_claim_expires_at=lease_expires_at)
+            .returning(Photo.id)
+            .execution_options(synchronize_session=False)
+        )
+        photo_ids = claimed.scalars().all()
+        await db.commit()
+
+        if not photo_ids:
+            return [], lease_expires_at, None
+
+        result = await db.execute(
+            select(Photo, Profile, User)
+            .join(Profile, Photo.profile_id == Profile.id)
+            .join(User, Profile.user_id == User.id)
+            .where(Photo.id.in_(photo_ids))
+            .order_by(Photo.created_at, Photo.id)
+            .execution_options(populate_existing=True)
+        )
         rows = result.all()
+        photos = [cls._photo_summary(photo, profile, user) for photo, profile, user in rows]
 
-        photos = []
-        for photo, profile, user in rows:
-            photos.append({
-                "id": str(photo.id),
-                "url": photo.url,
-                "thumbnail_url": photo.thumbnail_url,
-                "profile_id": str(profile.id),
-                "user_id": str(user.id),
-                "user_email": cls._mask_email(user.email),
-                "display_name": profile.display_name,
-                "moderation_status": photo.moderation_status,
-                "created_at": photo.created_at.isoformat() if photo.created_at else None,
-                "file_size": photo.file_size,
-                "width": photo.width,
-                "height": photo.height,
-            })
+        next_key = None
+        if len(photo_ids) == limit and rows:
+            last = rows[-1][0]
+            next_key = (last.created_at, last.id)
 
-        return photos, total
+        return photos, lease_expires_at, next_key
+
+    @classmethod
+    async def release_claims(
+        cls,
+        db: AsyncSession,
+        admin_id: uuid.UUID,
+        photo_ids: Optional[List[uuid.UUID]] = None
+    ) -> int:
+        """
+        釋放管理員領取的照片，讓其他管理員可立即領取
+
+        Args:
+            db: 資料庫 Session
+            admin_id: 管理員 ID
+            photo_ids: 要釋放的照片（None 表示全部）
+
+        Returns:
+            int: 釋放的照片數量
+        """
+        query = update(Photo).where(Photo.review_claimed_by == admin_id)
+        if photo_ids is not None:
+            query = query.where(Photo.id.in_(photo_ids))
+
+        result = await db.execute(
+            query
+            .values(review_claimed_by=None, review_claim_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount or 0
+
+    @classmethod
+    def _photo_summary(cls, photo: Photo, profile: Profile, user: User) -> Dict[str, Any]:
+        """審核列表的照片摘要"""
+        return {
+            "id": str(photo.id),
+            "url": photo.url,
+            "thumbnail_url": photo.thumbnail_url,
+            "profile_id": str(profile.id),
+            "user_id": str(user.id),
+            "user_email": cls._mask_email(user.email),
+            "display_name": profile.display_name,
+            "moderation_status": photo.moderation_status,
+            "created_at": photo.created_at.isoformat() if photo.created_at else None,
+            "file_size": photo.file_size,
+            "width": photo.width,
+            "height": photo.height,
+        }
 
     @classmethod
     async def get_photo_detail(
@@ -203,6 +333,9 @@ class PhotoModerationService:
 
         Returns:
             (success, message): 操作結果
+
+        Raises:
+            PhotoReviewConflictError: 照片由其他管理員領取且租約未到期，或已不是待審核狀態
         """
         # 驗證狀態
         if status not in [cls.STATUS_APPROVED, cls.STATUS_REJECTED]:
@@ -211,17 +344,33 @@ class PhotoModerationService:
         if status == cls.STATUS_REJECTED and not rejection_reason:
             return False, "拒絕時必須提供原因"
 
-        # 查詢照片
+        # 鎖定照片列：並行審核同一張照片時只有一個請求能通過下方的狀態檢查
         result = await db.execute(
             select(Photo)
             .options(selectinload(Photo.profile))
             .where(Photo.id == photo_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
         )
         photo = result.scalar_one_or_none()
 
         if not photo:
             return False, "照片不存在"
 
+        if photo.moderation_status != cls.STATUS_PENDING:
+            await db.rollback()
+            raise PhotoReviewConflictError("照片已審核完成")
+
+        now = datetime.now(timezone.utc)
+        if (
+            photo.review_claimed_by is not None
+            and photo.review_claimed_by != admin_id
+            and photo.review_claim_expires_at is not None
+            and photo.review_claim_expires_at > now
+        ):
+            await db.rollback()
+            raise PhotoReviewConflictError("照片已由其他管理員領取審核")
+
         # 取得用戶 ID
         profile_result = await db.execute(
             select(Profile).where(Profile.id == photo.profile_id)
@@ -233,11 +382,25 @@ class PhotoModerationService:
         # 更新照片狀態
         photo.moderation_status = status
         photo.reviewed_by = admin_id
-        photo.reviewed_at = datetime.now(timezone.utc)
+        photo.reviewed_at = now
+        photo.review_claimed_by = None
+        photo.review_claim_expires_at = None
 
         if status == cls.STATUS_REJECTED:
             photo.rejection_reason = rejection_reason
 
+            # 記錄雜湊，之後重新上傳相同或近似的照片可自動比對
+            if photo.perceptual_hash is not None:
+                db.add(PhotoHashBlocklist(
+                    perceptual_hash=photo.perceptual_hash,
+                    reason=cls.STATUS_REJECTED,
+                    photo_id=photo.id,
+                    user_id=profile.user_id,
+                ))
+                photo_hash_index.add(
+                    to_unsigned(photo.perceptual_hash), LABEL_REJECTED_DUPLICATE, photo.id
+                )
+
             # 扣除信任分數
             await TrustScoreService.adjust_score(
                 db, profile.user_id, "content_violation"
@@ -267,57 +430,33 @@ class PhotoModerationService:
         Returns:
             統計數據字典
         """
-        # 總數統計
-        total_result = await db.execute(select(func.count(Photo.id)))
-        total = total_result.scalar() or 0
-
-        # 各狀態統計
-        pending_result = await db.execute(
-            select(func.count(Photo.id))
-            .where(Photo.moderation_status == cls.STATUS_PENDING)
-        )
-        pending = pending_result.scalar() or 0
-
-        approved_result = await db.execute(
-            select(func.count(Photo.id))
-            .where(Photo.moderation_status == cls.STATUS_APPROVED)
-        )
-        approved = approved_result.scalar() or 0
-
-        rejected_result = await db.execute(
-            select(func.count(Photo.id))
-            .where(Photo.moderation_status == cls.STATUS_REJECTED)
-        )
-        rejected = rejected_result.scalar() or 0
-
-        # 今日統計
         today_start = datetime.now(timezone.utc).replace(
             hour=0, minute=0, second=0, microsecond=0
         )
 
-        today_pending_result = await db.execute(
-            select(func.count(Photo.id))
-            .where(
-                Photo.moderation_status == cls.STATUS_PENDING,
-                Photo.created_at >= today_start
-            )
-        )
-        today_pending = today_pending_result.scalar() or 0
-
-        today_reviewed_result = await db.execute(
-            select(func.count(Photo.id))
-            .where(Photo.reviewed_at >= today_start)
+        # 單次掃描，以 FILTER 分別計算各狀態與今日統計
+        result = await db.execute(
+            select(
+                func.count().label("total_photos"),
+                func.count().filter(
+                    Photo.moderation_status == cls.STATUS_PENDING
+                ).label("pending_photos"),
+                func.count().filter(
+                    Photo.moderation_status == cls.STATUS_APPROVED
+                ).label("approved_photos"),
+                func.count().filter(
+                    Photo.moderation_status == cls.STATUS_REJECTED
+                ).label("rejected_photos"),
+                func.count().filter(
+                    Photo.moderation_status == cls.STATUS_PENDING,
+                    Photo.created_at >= today_start
+                ).label("today_pending"),
+                func.count().filter(
+                    Photo.reviewed_at >= today_start
+                ).label("today_reviewed"),
+            ).select_from(Photo)
         )
-        today_reviewed = today_reviewed_result.scalar() or 0
-
-        return {
-            "total_photos": total,
-            "pending_photos": pending,
-            "approved_photos": approved,
-            "rejected_photos": rejected,
-            "today_pending": today_pending,
-            "today_reviewed": today_reviewed,
-        }
+        return dict(result.one()._mapping)
 
     @classmethod
     async def _log_moderation(
@@ -361,7 +500,10 @@ class PhotoModerationService:
             masked_local = local[0] + "***" + local[-1]
         return f"{masked_local}@{domain}"
 
-    # ==================== 自動審核擴展接口 ====================
+    # ==================== 自動審核 ====================
+
+    # 自動拒絕原因
+    AUTO_REJECTION_REASON = "與已拒絕或違規帳號的照片相同（自動審核）"
 
     @classmethod
     async def auto_moderate(
@@ -371,7 +513,10 @@ class PhotoModerationService:
         db: AsyncSession
     ) -> Tuple[bool, int, List[str]]:
         """
-        自動審核接口（預留擴展）
+        自動審核：以 pHash 比對已拒絕照片與被封禁帳號的照片
+
+        同時將照片的 pHash 寫入 Photo.perceptual_hash（由
+        process_auto_moderation_result 一併提交），供之後的比對使用。
 
         Args:
             photo_id: 照片 ID
@@ -380,16 +525,48 @@ class PhotoModerationService:
 
         Returns:
             (should_auto_approve, confidence_score, detected_labels)
+            confidence_score 為與最接近的違規照片的相似度（0-100，無相符為 0）
+        """
+        try:
+            value = await image_executor.run(compute_perceptual_hash, image_data)
+        except InvalidImageError:
+            return False, 0, []
+
+        score, labels = await cls.match_perceptual_hash(photo_id, value, db)
+        return False, score, labels
+
+    @classmethod
+    async def match_perceptual_hash(
+        cls,
+        photo_id: uuid.UUID,
+        value: int,
+        db: AsyncSession
+    ) -> Tuple[int, List[str]]:
+        """
+        記錄照片的 pHash 並比對已拒絕照片與被封禁帳號的照片（只使用資料庫，不做圖片運算）
+
+        Args:
+            photo_id: 照片 ID
+            value: compute_perceptual_hash 的結果
+            db: 資料庫 Session
 
-        注意：此方法目前為占位符，未來可整合:
-        - AWS Rekognition
-        - Google Cloud Vision
-        - Azure Computer Vision
-        - 自建 ML 模型
+        Returns:
+            (confidence_score, detected_labels)
         """
-        # TODO: 整合第三方圖片審核 API
-        # 目前返回預設值，需人工審核
-        return False, 0, []
+        photo = await db.get(Photo, photo_id)
+        if photo is not None:
+            photo.perceptual_hash = to_signed(value)
+
+        matches = await photo_hash_index.search(
+            db, value, settings.PHOTO_HASH_MAX_DISTANCE
+        )
+        if not matches:
+            return 0, []
+
+        best_distance = matches[0][0]
+        score = round(100 * (1 - best_distance / HASH_BITS))
+        labels = list(dict.fromkeys(label for _, label, _ in matches))
+        return score, labels
 
     @classmethod
     async def process_auto_moderation_result(
@@ -400,7 +577,10 @@ class PhotoModerationService:
         labels: List[str]
     ) -> None:
         """
-        處理自動審核結果（預留擴展）
+        處理自動審核結果
+
+        相似度達 PHOTO_AUTO_REJECT_SCORE 的待審核照片直接拒絕，
+        不進入人工審核佇列；其餘有標籤的照片留待人工審核時參考。
 
         Args:
             db: 資料庫 Session
@@ -408,19 +588,64 @@ class PhotoModerationService:
             score: 信心分數 (0-100)
             labels: 檢測到的標籤
         """
-        result = await db.execute(
-            select(Photo).where(Photo.id == photo_id)
+        await cls.process_auto_moderation_results(db, [(photo_id, score, labels)])
+
+    @classmethod
+    async def process_auto_moderation_results(
+        cls,
+        db: AsyncSession,
+        results: List[Tuple[uuid.UUID, int, List[str]]]
+    ) -> int:
+        """
+        批次處理自動審核結果（一次查詢、一次提交）
+
+        Args:
+            db: 資料庫 Session
+            results: [(照片 ID, 信心分數, 標籤)]
+
+        Returns:
+            int: 自動拒絕的照片數量
+        """
+        if not results:
+            return 0
+
+        rows = await db.execute(
+            select(Photo, Profile.user_id)
+            .join(Profile, Photo.profile_id == Profile.id)
+            .where(Photo.id.in_([photo_id for photo_id, _, _ in results]))
         )
-        photo = result.scalar_one_or_none()
+        photos = {photo.id: (photo, user_id) for photo, user_id in rows.all()}
+
+        now = datetime.now(timezone.utc)
+        auto_rejected = []
+        for photo_id, score, labels in results:
+            if photo_id not in photos:
+                continue
+            photo, user_id = photos[photo_id]
 
-        if photo:
             photo.auto_moderation_score = score
             photo.auto_moderation_labels = json.dumps(labels, ensure_ascii=False)
 
-            # 可選：高信心度自動審核
-            # AUTO_APPROVE_THRESHOLD = 95
-            # if score >= AUTO_APPROVE_THRESHOLD and not any_suspicious_label(labels):
-            #     photo.moderation_status = cls.STATUS_APPROVED
-            #     photo.reviewed_at = datetime.now(timezone.utc)
+            if (
+                labels
+                and score >= settings.PHOTO_AUTO_REJECT_SCORE
+                and photo.moderation_status == cls.STATUS_PENDING
+            ):
+                photo.moderation_status = cls.STATUS_REJECTED
+                photo.rejection_reason = cls.AUTO_REJECTION_REASON
+                photo.reviewed_at = now
+                auto_rejected.append((photo_id, user_id, score, labels))
+
+        await db.commit()
+
+        for photo_id, user_id, score, labels in auto_rejected:
+            logger.info(f"Photo {photo_id} auto-rejected (score={score}, labels={labels})")
+            await cls._log_moderation(
+                db=db,
+                user_id=user_id,
+                photo_id=photo_id,
+                is_approved=False,
+                rejection_reason=cls.AUTO_REJECTION_REASON,
+            )
 
-            await db.commit()
+        return len(auto_rejected)
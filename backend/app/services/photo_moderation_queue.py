@@ -0,0 +1,313 @@
+"""照片自動審核佇列 - 背景批次執行 pHash 自動審核
+
+上傳請求只在建立照片記錄的同一個事務寫入一筆佇列記錄，
+不再同步等待解碼與比對；背景 worker 批次處理：
+
+- 領取：短事務以 UPDATE ... WHERE photo_id IN (SELECT ... FOR UPDATE SKIP LOCKED)
+  設定租約並累計領取次數，立即提交；多個副本同時執行也不會重複領取，
+  worker 中斷時租約到期後由其他 worker 重新領取
+- 計算：整批照片的讀檔（S3 後端為下載）與 pHash 同時派送（雜湊在 image_executor
+  行程池中執行），這一步不持有任何事務
+- 比對與提交：第二個短事務依序比對索引（AsyncSession 不允許並行操作），
+  以 process_auto_moderation_results 一次查詢、一次提交套用整批結果並移出佇列
+- 重試：讀檔失敗（儲存暫時無法使用）的照片保留在佇列中，租約到期後重試；
+  領取次數達 PHOTO_MODERATION_MAX_ATTEMPTS 後放棄，留待人工審核
+- 喚醒：本行程上傳後以 notify() 立即喚醒；其他副本的上傳由輪詢
+  （PHOTO_MODERATION_POLL_INTERVAL_SECONDS）補上
+"""
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+import uuid
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.moderation import PhotoModerationJob
+from app.models.profile import Photo
+from app.services.admin_stats import AdminStatsService, STATS_PHOTOS
+from app.services.file_storage import InvalidImageError, file_storage
+from app.services.photo_hashing import compute_perceptual_hash
+from app.services.photo_moderation import PhotoModerationService
+from app.services.process_executor import image_executor
+
+logger = logging.getLogger(__name__)
+
+# 延遲統計保留的最近樣本數
+LATENCY_SAMPLE_SIZE = 1000
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """已排序數列的百分位數（最近排名法）"""
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class PhotoModerationQueue:
+    """照片自動審核佇列管理器"""
+
+    def __init__(self):
+        self._worker_task: Optional[asyncio.Task] = None
+        self._session_factory: Optional[async_sessionmaker] = None
+        self._wakeup = asyncio.Event()
+
+        # 本行程的處理指標
+        self.processed_total = 0
+        self.failed_total = 0
+        self.auto_rejected_total = 0
+        self.last_batch_ms: Optional[float] = None
+        self._latencies: deque = deque(maxlen=LATENCY_SAMPLE_SIZE)  # 排入到處理完成（秒）
+
+    def set_session_factory(self, factory: async_sessionmaker) -> None:
+        """設定 session factory（供測試注入）"""
+        self._session_factory = factory
+
+    def reset_session_factory(self) -> None:
+        """重設 session factory 為預設（正式環境）"""
+        self._session_factory = None
+
+    def _get_session_factory(self) -> async_sessionmaker:
+        """取得要使用的 session factory"""
+        if self._session_factory is not None:
+            return self._session_factory
+        from app.core.database import AsyncSessionLocal
+        return AsyncSessionLocal
+
+    def enqueue(self, db: AsyncSession, photo_id: uuid.UUID) -> None:
+        """將照片排入自動審核佇列
+
+        只加入 Session，由呼叫端與照片記錄一併提交；提交後呼叫 notify() 喚醒 worker。
+
+        Args:
+            db: 資料庫 Session
+            photo_id: 照片 ID
+        """
+        db.add(PhotoModerationJob(photo_id=photo_id))
+
+    def notify(self) -> None:
+        """喚醒本行程的 worker"""
+        self._wakeup.set()
+
+    async def _hash(
+        self, photo_id: uuid.UUID, url: str
+    ) -> Optional[Tuple[uuid.UUID, Optional[int]]]:
+        """讀取照片並計算 pHash（不使用 Session，可同時執行）
+
+        Returns:
+            (照片 ID, pHash)；圖片無效時 pHash 為 None（不比對），
+            讀取失敗時回傳 None（留在佇列中重試）
+        """
+        try:
+            content = await file_storage.read_photo(url)
+            if content is None:
+                raise FileNotFoundError(url)
+            try:
+                return photo_id, await image_executor.run(compute_perceptual_hash, content)
+            except InvalidImageError:
+                return photo_id, None
+        except Exception as e:
+            logger.warning(f"Auto moderation failed for photo {photo_id}: {e}")
+            return None
+
+    async def _claim(self, batch_size: int) -> Tuple[List[Any], Dict[uuid.UUID, str]]:
+        """以短事務領取一批佇列記錄（設定租約、累計領取次數）
+
+        Returns:
+            (jobs, photo_urls)：領取的佇列記錄與仍存在的照片 URL
+        """
+        SessionFactory = self._get_session_factory()
+        async with SessionFactory() as db:
+            now = datetime.now(timezone.utc)
+            claimable = (
+                select(PhotoModerationJob.photo_id)
+                .where(or_(
+                    PhotoModerationJob.lease_expires_at.is_(None),
+                    PhotoModerationJob.lease_expires_at < now,
+                ))
+                .order_by(PhotoModerationJob.enqueued_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await db.execute(
+                update(PhotoModerationJob)
+                .where(PhotoModerationJob.photo_id.in_(claimable))
+                .values(
+                    attempts=PhotoModerationJob.attempts + 1,
+                    lease_expires_at=now + timedelta(
+                        seconds=settings.PHOTO_MODERATION_LEASE_SECONDS
+                    ),
+                )
+                .returning(
+                    PhotoModerationJob.photo_id,
+                    PhotoModerationJob.enqueued_at,
+                    PhotoModerationJob.attempts,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            jobs = result.all()
+            photo_urls: Dict[uuid.UUID, str] = {}
+            if jobs:
+                rows = await db.execute(
+                    select(Photo.id, Photo.url)
+                    .where(Photo.id.in_([job.photo_id for job in jobs]))
+                )
+                photo_urls = {row.id: row.url for row in rows}
+            await db.commit()
+        return jobs, photo_urls
+
+    async def process_batch(self, batch_size: Optional[int] = None) -> int:
+        """領取並處理一批佇列中的照片
+
+        Args:
+            batch_size: 每批照片數（預設 PHOTO_MODERATION_BATCH_SIZE）
+
+        Returns:
+            int: 領取的佇列記錄數（含讀取失敗而留待重試或放棄者）
+        """
+        if batch_size is None:
+            batch_size = settings.PHOTO_MODERATION_BATCH_SIZE
+
+        started = time.perf_counter()
+        jobs, photo_urls = await self._claim(batch_size)
+        if not jobs:
+            return 0
+
+        # 讀檔與雜湊同時執行，不持有事務
+        hashed = await asyncio.gather(*[
+            self._hash(photo_id, url) for photo_id, url in photo_urls.items()
+        ])
+        hashes = dict(outcome for outcome in hashed if outcome is not None)
+
+        # 讀取失敗：未達重試上限者保留在佇列中，租約到期後重試
+        retry_ids = set()
+        for job in jobs:
+            if job.photo_id not in photo_urls or job.photo_id in hashes:
+                continue
+            if job.attempts < settings.PHOTO_MODERATION_MAX_ATTEMPTS:
+                retry_ids.add(job.photo_id)
+            else:
+                logger.warning(
+                    f"Giving up auto moderation for photo {job.photo_id} "
+                    f"after {job.attempts} attempts"
+                )
+        done_ids = [job.photo_id for job in jobs if job.photo_id not in retry_ids]
+
+        SessionFactory = self._get_session_factory()
+        async with SessionFactory() as db:
+            try:
+                # 比對索引需要 Session，依序執行
+                results = []
+                for photo_id, value in hashes.items():
+                    score, labels = (
+                        await PhotoModerationService.match_perceptual_hash(photo_id, value, db)
+                        if value is not None else (0, [])
+                    )
+                    results.append((photo_id, score, labels))
+
+                if done_ids:
+                    await db.execute(
+                        delete(PhotoModerationJob)
+                        .where(PhotoModerationJob.photo_id.in_(done_ids))
+                        .execution_options(synchronize_session=False)
+                    )
+                # 提交結果同時提交佇列刪除
+                auto_rejected = await PhotoModerationService.process_auto_moderation_results(
+                    db, results
+                )
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+
+        # 自動拒絕改變了各狀態的照片數
+        if auto_rejected:
+            await AdminStatsService.invalidate(STATS_PHOTOS)
+
+        finished = datetime.now(timezone.utc)
+        self.processed_total += len(results)
+        self.failed_total += len(photo_urls) - len(hashes)
+        self.auto_rejected_total += auto_rejected
+        self._latencies.extend(
+            (finished - job.enqueued_at).total_seconds()
+            for job in jobs if job.photo_id not in retry_ids
+        )
+        self.last_batch_ms = (time.perf_counter() - started) * 1000
+
+        logger.debug(
+            f"Auto-moderated {len(results)}/{len(jobs)} photos "
+            f"({auto_rejected} rejected, {len(retry_ids)} to retry) in {self.last_batch_ms:.0f}ms"
+        )
+        return len(jobs)
+
+    async def get_metrics(self, db: AsyncSession) -> Dict[str, Any]:
+        """取得佇列指標
+
+        queue_depth、oldest_job_age_seconds 來自資料庫（所有副本共用）；
+        其餘為本行程 worker 啟動以來的統計。
+        """
+        depth, oldest = (
+            await db.execute(
+                select(func.count(), func.min(PhotoModerationJob.enqueued_at))
+                .select_from(PhotoModerationJob)
+            )
+        ).one()
+
+        latencies = sorted(self._latencies)
+        return {
+            "queue_depth": depth,
+            "oldest_job_age_seconds": (
+                (datetime.now(timezone.utc) - oldest).total_seconds() if oldest else None
+            ),
+            "processed_total": self.processed_total,
+            "failed_total": self.failed_total,
+            "auto_rejected_total": self.auto_rejected_total,
+            "latency_p50_ms": _percentile(latencies, 0.5) * 1000 if latencies else None,
+            "latency_p95_ms": _percentile(latencies, 0.95) * 1000 if latencies else None,
+            "last_batch_ms": self.last_batch_ms,
+        }
+
+    async def start_worker(self):
+        """啟動背景 worker"""
+        if self._worker_task is None:
+            self._worker_task = asyncio.create_task(self._run_worker())
+            logger.info("Started photo moderation worker")
+
+    async def stop_worker(self):
+        """停止背景 worker"""
+        if self._worker_task:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+            self._worker_task = None
+            logger.info("Stopped photo moderation worker")
+
+    async def _run_worker(self):
+        """持續處理佇列；佇列清空後等待喚醒或輪詢間隔"""
+        while True:
+            try:
+                self._wakeup.clear()
+                claimed = await self.process_batch()
+                if claimed < settings.PHOTO_MODERATION_BATCH_SIZE:
+                    try:
+                        await asyncio.wait_for(
+                            self._wakeup.wait(),
+                            timeout=settings.PHOTO_MODERATION_POLL_INTERVAL_SECONDS
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+            except asyncio.CancelledError:
+                logger.info("Photo moderation worker cancelled")
+                break
+            except Exception as e:
+                logger.error(f"Error in photo moderation worker: {e}", exc_info=True)
+                await asyncio.sleep(settings.PHOTO_MODERATION_POLL_INTERVAL_SECONDS)
+
+
+# 全局單例實例
+photo_moderation_queue = PhotoModerationQueue()
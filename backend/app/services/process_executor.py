@@ -0,0 +1,93 @@
+"""行程池執行器 - 將 CPU 密集運算派送至行程池
+
+CPU 密集運算直接在 async handler 中執行會阻塞事件迴圈，同一 worker 上的
+WebSocket 與 HTTP 請求都會被延遲。每個 ProcessExecutor 對應一組行程數設定：
+
+- 設定值 > 0：於 lifespan 啟動 ProcessPoolExecutor，
+  運算不受 GIL 限制，且完全不佔用事件迴圈
+- 設定值 = 0 或尚未啟動（例如測試）：退回預設執行緒池
+
+派送的函式與參數必須可 pickle（模組層級函式）。
+
+- image_executor（IMAGE_PROCESS_WORKERS）：PIL 解碼、縮放、編碼與 pHash（見 file_storage）
+- moderation_executor（MODERATION_PROCESS_WORKERS）：敏感詞重新掃描的批次比對
+  （見 moderation_rescan），長時間的回溯掃描不會排擠上傳的圖片處理
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+import asyncio
+import logging
+import multiprocessing
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ProcessExecutor:
+    """CPU 密集運算行程池"""
+
+    def __init__(self, name: str, workers_setting: str):
+        """
+        Args:
+            name: 行程池名稱（日誌用）
+            workers_setting: 行程數設定名稱
+        """
+        self._executor: Optional[Executor] = None
+        self._name = name
+        self._workers_setting = workers_setting
+
+    @property
+    def is_running(self) -> bool:
+        """行程池是否已啟動"""
+        return self._executor is not None
+
+    def start(self, workers: Optional[int] = None) -> None:
+        """啟動行程池
+
+        Args:
+            workers: 行程數（預設為 workers_setting 的設定值，0 表示不使用行程池）
+        """
+        if self._executor is not None:
+            return
+
+        if workers is None:
+            workers = getattr(settings, self._workers_setting)
+        if workers <= 0:
+            logger.info(f"{self._name} process pool disabled, using default thread pool")
+            return
+
+        # 使用 spawn：事件迴圈與執行緒已在執行中，fork 可能複製到持有中的鎖
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info(f"Started {self._name} process pool with {workers} workers")
+
+    async def shutdown(self) -> None:
+        """關閉行程池（於執行緒中等待進行中的工作完成，不阻塞事件迴圈）"""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+            logger.info(f"Stopped {self._name} process pool")
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """於行程池執行函式
+
+        Args:
+            func: 模組層級函式
+            *args: 函式參數
+
+        Returns:
+            函式回傳值
+        """
+        loop = asyncio.get_running_loop()
+        # executor 為 None 時使用事件迴圈的預設執行緒池
+        return await loop.run_in_executor(self._executor, func, *args)
+
+
+# 全局單例實例
+image_executor = ProcessExecutor("image", "IMAGE_PROCESS_WORKERS")
+moderation_executor = ProcessExecutor("moderation", "MODERATION_PROCESS_WORKERS")
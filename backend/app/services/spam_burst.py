@@ -0,0 +1,179 @@
+"""群發垃圾訊息偵測 - 以訊息指紋在滑動窗口內偵測跨配對的相似內容
+
+逐則審核無法發現同一段詐騙文字被發給大量配對（未列入敏感詞時每則都會通過）。
+本服務為每則文字訊息計算 MinHash 簽章，記錄在 Redis 滑動窗口中，
+同一發送者在 SPAM_BURST_WINDOW_SECONDS 內把相似內容發送到
+SPAM_BURST_MATCH_THRESHOLD 個以上不同配對時，標記為群發並扣信任分數。
+
+指紋與近似比對（MinHash + LSH 分段）:
+- 內容先經 normalize_text 正規化（簡繁、全形、零寬字元、空白拆字），去除空白後取字元 3-gram
+- 以 BAND_COUNT × BAND_ROWS 個雜湊函數計算 MinHash 簽章，每 BAND_ROWS 個值合成一段（band）
+- 兩則訊息的 3-gram Jaccard 相似度為 s 時，至少一段完全相同的機率為 1 - (1 - s^r)^b，
+  因此以「段」為 key 即可找到近似訊息，不需逐一比較歷史簽章
+- 只取正規化後前 FINGERPRINT_MAX_CHARS 字計算，短於 SPAM_BURST_MIN_LENGTH 的訊息
+  （打招呼等常見短句）不列入偵測
+
+每則訊息的成本固定：一次簽章計算 + 一次 Redis pipeline（BAND_COUNT 段 × 4 個指令）。
+
+Redis Key 設計:
+- spam:burst:{user_id}:{band}:{value} - 該段簽章發送到的配對（ZSET，score 為發送時間，TTL: 窗口秒數）
+- spam:burst:flagged:{user_id} - 窗口內已標記，避免重複扣分（TTL: 窗口秒數）
+"""
+import hashlib
+import logging
+import random
+import time
+import uuid
+from typing import List, Optional, Tuple
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.services.moderation_log_writer import moderation_log_writer
+from app.services.text_normalizer import normalize_text
+from app.services.trust_score import TrustScoreService
+
+logger = logging.getLogger(__name__)
+
+# MinHash 參數
+SHINGLE_SIZE = 3
+BAND_COUNT = 8
+BAND_ROWS = 2
+FINGERPRINT_MAX_CHARS = 256
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def _hash_params() -> List[Tuple[int, int]]:
+    """固定種子產生的雜湊函數參數（各副本一致）"""
+    rng = random.Random(0x5EED)
+    return [
+        (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+        for _ in range(BAND_COUNT * BAND_ROWS)
+    ]
+
+
+_HASH_PARAMS = _hash_params()
+
+
+class SpamBurstDetector:
+    """群發垃圾訊息偵測服務"""
+
+    KEY_PREFIX = "spam:burst"
+
+    @staticmethod
+    def fingerprint(content: str) -> Optional[List[str]]:
+        """
+        計算訊息的 MinHash 分段簽章
+
+        Args:
+            content: 原始訊息內容
+
+        Returns:
+            BAND_COUNT 個分段雜湊值；正規化後過短的訊息回傳 None
+        """
+        text = "".join(normalize_text(content).split())[:FINGERPRINT_MAX_CHARS]
+        if len(text) < max(settings.SPAM_BURST_MIN_LENGTH, SHINGLE_SIZE):
+            return None
+
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+            for shingle in {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+        ]
+        signature = [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _HASH_PARAMS]
+
+        return [
+            hashlib.blake2b(
+                repr(signature[i:i + BAND_ROWS]).encode("ascii"), digest_size=6
+            ).hexdigest()
+            for i in range(0, len(signature), BAND_ROWS)
+        ]
+
+    @classmethod
+    async def record_message(
+        cls,
+        redis: Redis,
+        sender_id: uuid.UUID,
+        match_id: uuid.UUID,
+        content: str
+    ) -> int:
+        """
+        記錄訊息指紋並回傳相似內容在窗口內發送到的配對數
+
+        Args:
+            redis: Redis 連線
+            sender_id: 發送者 ID
+            match_id: 配對 ID
+            content: 訊息內容
+
+        Returns:
+            窗口內收到相似內容的不同配對數（不列入偵測的訊息回傳 0）
+        """
+        bands = cls.fingerprint(content)
+        if bands is None:
+            return 0
+
+        window = settings.SPAM_BURST_WINDOW_SECONDS
+        now = time.time()
+        pipe = redis.pipeline(transaction=False)
+        for index, value in enumerate(bands):
+            key = f"{cls.KEY_PREFIX}:{sender_id}:{index}:{value}"
+            pipe.zadd(key, {str(match_id): now})
+            pipe.zremrangebyscore(key, "-inf", now - window)
+            pipe.zcard(key)
+            pipe.expire(key, window)
+        results = await pipe.execute()
+
+        # 每段 4 個指令，第 3 個為 ZCARD
+        return max(results[2::4])
+
+    @classmethod
+    async def check_message(
+        cls,
+        redis: Redis,
+        db: AsyncSession,
+        sender_id: uuid.UUID,
+        match_id: uuid.UUID,
+        content: str
+    ) -> bool:
+        """
+        偵測群發並在首次達到門檻時扣信任分數
+
+        同一窗口內只扣分一次，並寫入一筆審核日誌供管理員查閱。
+
+        Args:
+            redis: Redis 連線
+            db: 資料庫 Session
+            sender_id: 發送者 ID
+            match_id: 配對 ID
+            content: 訊息內容
+
+        Returns:
+            本則訊息是否觸發群發標記
+        """
+        match_count = await cls.record_message(redis, sender_id, match_id, content)
+        if match_count < settings.SPAM_BURST_MATCH_THRESHOLD:
+            return False
+
+        flagged = await redis.set(
+            f"{cls.KEY_PREFIX}:flagged:{sender_id}", "1",
+            nx=True, ex=settings.SPAM_BURST_WINDOW_SECONDS
+        )
+        if not flagged:
+            return False
+
+        await TrustScoreService.adjust_score(
+            db, sender_id, "spam_burst",
+            reason=f"Similar content sent to {match_count} matches"
+        )
+        await moderation_log_writer.log(
+            user_id=sender_id,
+            content_type="MESSAGE",
+            content=content,
+            is_approved=True,
+            violations=[f"SPAM_BURST: 相似內容發送至 {match_count} 個配對"],
+            triggered_word_ids=[],
+            action_taken="WARN",
+        )
+        logger.warning(f"Spam burst detected for user {sender_id}: {match_count} matches")
+        return True
@@ -0,0 +1,547 @@
+"""檔案儲存後端 - 本地檔案系統與 S3 相容物件儲存
+
+FileStorageService 只處理「鍵」（例如 photos/{user_id}/{photo_id}.jpg），
+實際讀寫交由 STORAGE_BACKEND 指定的後端：
+
+- local：寫入 UPLOAD_DIR，由應用程式以 /uploads 提供（單一節點）
+- s3：寫入 S3 相容物件儲存（AWS S3、MinIO 等），物件帶有 immutable 快取標頭，
+  瀏覽器 / CDN 直接向物件儲存取圖，應用程式 worker 不再傳送圖片內容，
+  可無狀態地水平擴充
+
+本地後端採內容定址儲存（content-addressed storage）：
+- 實際內容以 sha256 存放於 objects/{h[0:2]}/{h[2:4]}/{h}{ext}
+- 對外路徑為指向內容物件的硬連結；相同內容只佔一份磁碟空間
+- 參照計數即檔案系統的連結數（st_nlink）：刪除參照後若內容物件
+  只剩自身一個連結，代表已無參照，一併刪除
+- 內容雜湊記錄在內容物件的延伸屬性（xattr）；硬連結共用同一個 inode，
+  覆寫與刪除參照時直接讀取，不必重新計算整個檔案的雜湊。
+  不支援 xattr 的平台、檔案系統或改版前的檔案退回在執行緒中分段計算，並補記錄
+
+複製（copy）讓重複上傳不必下載再上傳內容：本地後端建立同一內容物件的硬連結；
+S3 後端使用伺服器端 CopyObject，不經過應用程式傳輸，但 S3 沒有硬連結，
+每個鍵仍各自佔用一份儲存空間（已知限制）。
+
+S3 請求以 httpx 搭配 AWS Signature Version 4 簽章，不需額外套件。
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit
+from xml.etree import ElementTree
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import shutil
+import uuid
+import weakref
+
+import aiofiles
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 檔名皆為 uuid，內容永不變更，可長期快取
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# 內容定址物件目錄（相對於本地儲存根目錄）
+OBJECTS_PREFIX = "objects"
+
+# 記錄內容雜湊的延伸屬性名稱
+DIGEST_XATTR = "user.sha256"
+
+
+def _hash_file(path: Path) -> Optional[str]:
+    """分段計算檔案 sha256，檔案不存在回傳 None（於執行緒中執行）"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def _store_digest(path: Path, digest: str) -> None:
+    """將內容雜湊記錄於檔案的延伸屬性（不支援時略過）"""
+    try:
+        os.setxattr(path, DIGEST_XATTR, digest.encode())
+    except (AttributeError, OSError):
+        # 非 Linux 平台沒有 os.setxattr；部分檔案系統不支援 user xattr
+        pass
+
+
+class StorageBackend(ABC):
+    """儲存後端介面"""
+
+    @abstractmethod
+    async def write(self, key: str, content: bytes, content_type: str) -> None:
+        """寫入物件（已存在則覆寫）"""
+
+    @abstractmethod
+    async def read(self, key: str) -> Optional[bytes]:
+        """讀取物件，不存在回傳 None"""
+
+    @abstractmethod
+    async def copy(self, source_key: str, key: str) -> bool:
+        """複製物件（不經應用程式傳輸內容），回傳來源物件是否存在"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """刪除物件，回傳物件是否存在"""
+
+    @abstractmethod
+    async def list(self, prefix: str) -> List[str]:
+        """列出以 prefix 開頭的物件鍵"""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """取得物件的公開 URL"""
+
+    @abstractmethod
+    def key_from_url(self, url: str) -> Optional[str]:
+        """由公開 URL 取回物件鍵，非此後端的 URL 回傳 None"""
+
+    async def close(self) -> None:
+        """釋放連線等資源"""
+
+
+# ==================== 本地檔案系統 ====================
+
+
+class LocalStorageBackend(StorageBackend):
+    """本地檔案系統儲存（內容定址 + 硬連結去重）"""
+
+    def __init__(self, root: str, url_prefix: str = "/uploads"):
+        self.root = Path(root)
+        self.url_prefix = url_prefix.rstrip("/")
+        self.objects_dir = self.root / OBJECTS_PREFIX
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        # 沒有寫入者持有時自動移除
+        self._key_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def path(self, key: str) -> Path:
+        """取得物件鍵對應的檔案路徑（拒絕跳出根目錄的鍵）"""
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def url(self, key: str) -> str:
+        return f"{self.url_prefix}/{key}"
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        # /uploads/photos/{user_id}/{filename} -> photos/{user_id}/{filename}
+        relative_path = url.lstrip("/")
+        prefix = self.url_prefix.lstrip("/") + "/"
+        if relative_path.startswith(prefix):
+            relative_path = relative_path[len(prefix):]
+        return relative_path or None
+
+    async def write(self, key: str, content: bytes, content_type: str) -> None:
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # 先連結到暫存名稱再以 os.replace 覆寫，並行寫入同一個鍵時不會互相刪除
+        temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        # 內容物件可能在寫入與連結之間被並行刪除（參照歸零），重試一次即可
+        for attempt in range(2):
+            object_path = await self._write_object(content, path.suffix)
+            try:
+                self._link_object(object_path, temp_path)
+                break
+            except FileNotFoundError:
+                if attempt == 1:
+                    raise
+
+        try:
+            previous_digest = await self._replace(key, temp_path, path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            self._release_object(object_path.stem, path.suffix)
+            raise
+        if previous_digest is not None:
+            self._release_object(previous_digest, path.suffix)
+
+    async def copy(self, source_key: str, key: str) -> bool:
+        source_path = self.path(source_key)
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # 來源本身即內容物件的硬連結，連結到來源等同參照同一個內容物件
+        temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            self._link_object(source_path, temp_path)
+        except FileNotFoundError:
+            return False
+
+        try:
+            previous_digest = await self._replace(key, temp_path, path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        if previous_digest is not None:
+            self._release_object(previous_digest, path.suffix)
+        return True
+
+    async def _replace(self, key: str, temp_path: Path, path: Path) -> Optional[str]:
+        """
+        以暫存參照原子性地覆寫鍵
+
+        Returns:
+            被覆寫的舊內容雜湊（由呼叫端釋放），鍵原本不存在時為 None
+        """
+        # 同一行程內依鍵序列化「讀取舊內容雜湊 + 覆寫」，避免舊內容物件失去參照後未被刪除
+        lock = self._key_locks.get(key)
+        if lock is None:
+            lock = self._key_locks[key] = asyncio.Lock()
+        async with lock:
+            previous_digest = await self._digest(path)
+            os.replace(temp_path, path)
+        return previous_digest
+
+    async def read(self, key: str) -> Optional[bytes]:
+        try:
+            async with aiofiles.open(self.path(key), "rb") as f:
+                return await f.read()
+        except FileNotFoundError:
+            return None
+
+    async def delete(self, key: str) -> bool:
+        return await self._release(self.path(key))
+
+    async def list(self, prefix: str) -> List[str]:
+        directory, _, name_prefix = prefix.rpartition("/")
+        base = self.path(directory) if directory else self.root
+        if not base.is_dir():
+            return []
+        return sorted(
+            f"{directory}/{path.name}" if directory else path.name
+            for path in base.iterdir()
+            if path.is_file() and path.name.startswith(name_prefix)
+        )
+
+    def _object_path(self, digest: str, suffix: str) -> Path:
+        """取得內容物件路徑（依雜湊前 4 碼分兩層目錄）"""
+        return self.objects_dir / digest[:2] / digest[2:4] / f"{digest}{suffix}"
+
+    async def _write_object(self, content: bytes, suffix: str) -> Path:
+        """
+        寫入內容物件（已存在則略過）
+
+        先寫入暫存檔再以 os.replace 原子性地改名，
+        並行寫入相同內容時不會讀到寫到一半的檔案。
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(digest, suffix)
+        if not object_path.exists():
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = object_path.with_name(f".{digest}.{uuid.uuid4().hex}.tmp")
+            try:
+                async with aiofiles.open(temp_path, "wb") as f:
+                    await f.write(content)
+                _store_digest(temp_path, digest)
+                os.replace(temp_path, object_path)
+            finally:
+                if temp_path.exists():
+                    temp_path.unlink()
+        return object_path
+
+    @staticmethod
+    def _link_object(object_path: Path, path: Path) -> None:
+        """建立指向內容物件的參照（硬連結）"""
+        try:
+            os.link(object_path, path)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            # 不支援硬連結的檔案系統：退回複製（失去去重效果，但功能正常）
+            shutil.copyfile(object_path, path)
+
+    @staticmethod
+    async def _digest(path: Path) -> Optional[str]:
+        """
+        取得參照的內容 sha256，檔案不存在回傳 None
+
+        優先讀取內容物件寫入時記錄的延伸屬性，沒有記錄時才計算並補記錄
+        """
+        try:
+            return os.getxattr(path, DIGEST_XATTR).decode()
+        except FileNotFoundError:
+            return None
+        except (AttributeError, OSError):
+            pass
+
+        digest = await asyncio.to_thread(_hash_file, path)
+        if digest is not None:
+            _store_digest(path, digest)
+        return digest
+
+    def _release_object(self, digest: str, suffix: str) -> None:
+        """內容物件只剩自身一個連結（已無參照）時刪除"""
+        # 改版前儲存的舊檔案沒有對應的內容物件，直接略過
+        object_path = self._object_path(digest, suffix)
+        try:
+            if object_path.stat().st_nlink <= 1:
+                object_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    async def _release(self, path: Path) -> bool:
+        """
+        移除參照，內容物件沒有其他參照時一併刪除
+
+        Returns:
+            參照是否存在
+        """
+        digest = await self._digest(path)
+        if digest is None:
+            return False
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        self._release_object(digest, path.suffix)
+        return True
+
+
+# ==================== S3 相容物件儲存 ====================
+
+
+def _hmac_sha256(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+def sign_v4(
+    method: str,
+    url: str,
+    headers: Dict[str, str],
+    payload_hash: str,
+    access_key: str,
+    secret_key: str,
+    region: str,
+    now: Optional[datetime] = None,
+    service: str = "s3",
+) -> Dict[str, str]:
+    """
+    以 AWS Signature Version 4 簽署請求
+
+    Args:
+        method: HTTP 方法
+        url: 完整 URL（路徑需已做 URI 編碼）
+        headers: 需一併簽署的標頭
+        payload_hash: 請求內容的 sha256（hex）
+        access_key: Access Key
+        secret_key: Secret Key
+        region: 區域
+        now: 簽署時間（預設為目前 UTC 時間）
+        service: 服務名稱
+
+    Returns:
+        加上 Host、X-Amz-Date、X-Amz-Content-Sha256 與 Authorization 的標頭
+    """
+    now = now or datetime.now(timezone.utc)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    date_stamp = now.strftime("%Y%m%d")
+    parts = urlsplit(url)
+
+    signed = {name.lower(): str(value).strip() for name, value in headers.items()}
+    signed["host"] = parts.netloc
+    signed["x-amz-date"] = amz_date
+    signed["x-amz-content-sha256"] = payload_hash
+    signed_names = ";".join(sorted(signed))
+
+    # 查詢參數需依名稱排序並以 RFC 3986 編碼
+    query_pairs = []
+    for pair in parts.query.split("&") if parts.query else []:
+        name, _, value = pair.partition("=")
+        query_pairs.append((quote(unquote(name), safe="-_.~"), quote(unquote(value), safe="-_.~")))
+    canonical_query = "&".join(f"{name}={value}" for name, value in sorted(query_pairs))
+
+    canonical_request = "\n".join([
+        method,
+        parts.path or "/",
+        canonical_query,
+        "".join(f"{name}:{signed[name]}\n" for name in sorted(signed)),
+        signed_names,
+        payload_hash,
+    ])
+    scope = f"{date_stamp}/{region}/{service}/aws4_request"
+    string_to_sign = "\n".join([
+        "AWS4-HMAC-SHA256",
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+    ])
+
+    signing_key = _hmac_sha256(f"AWS4{secret_key}".encode("utf-8"), date_stamp)
+    for component in (region, service, "aws4_request"):
+        signing_key = _hmac_sha256(signing_key, component)
+    signature = hmac.new(signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    result = dict(headers)
+    result["Host"] = parts.netloc
+    result["X-Amz-Date"] = amz_date
+    result["X-Amz-Content-Sha256"] = payload_hash
+    result["Authorization"] = (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+        f"SignedHeaders={signed_names}, Signature={signature}"
+    )
+    return result
+
+
+class S3StorageBackend(StorageBackend):
+    """S3 相容物件儲存（path-style 定址，相容 MinIO）"""
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key: str,
+        secret_key: str,
+        region: str = "us-east-1",
+        public_url: str = "",
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        # 未設定時直接使用物件儲存位址；正式環境通常設為 CDN 網域
+        self.public_url = (public_url or f"{self.endpoint_url}/{bucket}").rstrip("/")
+        self._client = client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """共用連線池（延遲建立）"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=30.0)
+        return self._client
+
+    def _object_url(self, key: str) -> str:
+        return f"{self.endpoint_url}/{self.bucket}/{quote(key, safe='/-_.~')}"
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        content: bytes = b"",
+        headers: Optional[Dict[str, str]] = None,
+    ) -> httpx.Response:
+        """送出簽署後的請求"""
+        signed_headers = sign_v4(
+            method, url, headers or {},
+            payload_hash=hashlib.sha256(content).hexdigest(),
+            access_key=self.access_key,
+            secret_key=self.secret_key,
+            region=self.region,
+        )
+        return await self.client.request(method, url, content=content, headers=signed_headers)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{quote(key, safe='/-_.~')}"
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        prefix = self.public_url + "/"
+        if not url.startswith(prefix):
+            return None
+        return unquote(url[len(prefix):]) or None
+
+    async def write(self, key: str, content: bytes, content_type: str) -> None:
+        response = await self._request(
+            "PUT", self._object_url(key), content,
+            headers={
+                "Content-Type": content_type,
+                "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+            },
+        )
+        response.raise_for_status()
+
+    async def copy(self, source_key: str, key: str) -> bool:
+        # 伺服器端複製，沿用來源物件的 Content-Type 與 Cache-Control
+        response = await self._request(
+            "PUT", self._object_url(key),
+            headers={"x-amz-copy-source": f"/{self.bucket}/{quote(source_key, safe='/-_.~')}"},
+        )
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    async def read(self, key: str) -> Optional[bytes]:
+        response = await self._request("GET", self._object_url(key))
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.content
+
+    async def delete(self, key: str) -> bool:
+        # S3 的 DELETE 不回報物件是否存在，先以 HEAD 確認
+        head = await self._request("HEAD", self._object_url(key))
+        if head.status_code == 404:
+            return False
+        head.raise_for_status()
+        response = await self._request("DELETE", self._object_url(key))
+        response.raise_for_status()
+        return True
+
+    async def list(self, prefix: str) -> List[str]:
+        keys: List[str] = []
+        continuation_token: Optional[str] = None
+        while True:
+            query = f"list-type=2&prefix={quote(prefix, safe='-_.~')}"
+            if continuation_token:
+                query += f"&continuation-token={quote(continuation_token, safe='-_.~')}"
+            response = await self._request("GET", f"{self.endpoint_url}/{self.bucket}?{query}")
+            response.raise_for_status()
+
+            page_keys, continuation_token = self._parse_list_response(response.content)
+            keys.extend(page_keys)
+            if not continuation_token:
+                return keys
+
+    @staticmethod
+    def _parse_list_response(body: bytes) -> Tuple[List[str], Optional[str]]:
+        """解析 ListObjectsV2 回應，回傳（物件鍵, 下一頁 token）"""
+        root = ElementTree.fromstring(body)
+        # 回應帶有命名空間，以 local name 比對
+        keys = [
+            element.text or ""
+            for element in root.iter()
+            if element.tag.rsplit("}", 1)[-1] == "Key"
+        ]
+        token = None
+        for element in root:
+            if element.tag.rsplit("}", 1)[-1] == "NextContinuationToken":
+                token = element.text
+        return keys, token
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def create_storage_backend() -> StorageBackend:
+    """依 STORAGE_BACKEND 建立儲存後端"""
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorageBackend(settings.UPLOAD_DIR)
+    if settings.STORAGE_BACKEND == "s3":
+        return S3StorageBackend(
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            bucket=settings.S3_BUCKET,
+            access_key=settings.S3_ACCESS_KEY,
+            secret_key=settings.S3_SECRET_KEY,
+            region=settings.S3_REGION,
+            public_url=settings.S3_PUBLIC_URL,
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
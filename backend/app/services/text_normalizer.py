@@ -0,0 +1,254 @@
+"""審核用文字正規化 - 每則訊息只做一次，供所有比對器共用
+
+規避手法與對應處理：
+- 全形字元、相容字元（ｌｉｎｅ、①）：逐字 NFKC 正規化並 casefold
+- 零寬字元（ZWSP、ZWJ、BOM、軟連字號）與組合符號（zalgo 文字）：移除
+- 形近字（西里爾 / 希臘字母冒充拉丁字母）：折疊為拉丁字母
+- 簡體字：常見字折疊為繁體（敏感詞以繁體維護）
+- 空白拆字（「l i n e」、「詐 騙」）：單字元之間、CJK 字元之間的空白移除，
+  其餘連續空白合併為一個空格
+
+逐字轉換預先建成 str.translate 轉換表（第一次使用時建立），
+之後每則訊息只需一次 translate 與三次正則替換。轉換表預建基本多文種平面；
+BMP 以外的字元（數學字母 𝐥𝐢𝐧𝐞、帶圈字母 🅻 等）第一次出現時才計算並記入轉換表。
+正則敏感詞以 normalize_pattern 做相同的逐字折疊，才能比對正規化後的內容。
+需要將比對位置對回原文時（如遮蔽敏感詞）使用 normalize_with_offsets，
+結果與 normalize_text 完全相同，另外回傳每個字元在原文中的位置；
+original_span 將正規化文字上的範圍對回原文，replace_spans 一次替換多個範圍。
+"""
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# 零寬與不可見格式字元
+_INVISIBLE = (
+    "\u00ad"  # 軟連字號
+    "\u034f"  # 組合字形連接符
+    "\u061c"  # 阿拉伯字母標記
+    "\u115f\u1160\u3164\uffa0"  # 韓文填充字元
+    "\u17b4\u17b5"  # 高棉文不發音母音
+    "\u180e"  # 蒙古文母音分隔符
+    "\u200b\u200c\u200d\u200e\u200f"  # 零寬空格 / 連接符 / 方向標記
+    "\u202a\u202b\u202c\u202d\u202e"  # 方向嵌入與覆寫
+    "\u2060\u2061\u2062\u2063\u2064"  # 字連接符與不可見運算符
+    "\u2066\u2067\u2068\u2069"  # 方向隔離
+    "\ufeff"  # BOM / 零寬不換行空格
+)
+
+# 形近字：西里爾、希臘字母冒充拉丁字母（casefold 之後的小寫形式）
+_CONFUSABLES = {
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h",
+    "о": "o", "р": "p", "с": "c", "т": "t", "у": "y", "х": "x", "ѕ": "s",
+    "і": "i", "ї": "i", "ј": "j", "ԁ": "d", "ԛ": "q", "ԝ": "w", "ո": "n",
+    "α": "a", "β": "b", "ε": "e", "η": "n", "ι": "i", "κ": "k", "ν": "v",
+    "ο": "o", "ρ": "p", "τ": "t", "υ": "u", "χ": "x", "ω": "w",
+}
+
+# 常見簡體字 -> 繁體字（以審核相關與高頻字為主）
+_SIMPLIFIED = (
+    "诈骗赌钱币银账号码网联买卖货药枪黄爱约发线电话讯软载门开关应该这个们说时会来对没为问题现还给让过进从经产处实体与动见间样学头东车长"
+    "马鸟鱼龙气乐书亲认识语读写红绿蓝图传转点击页级员费价单团钓骚赃贷债资额汇兑证帐户验奖励赢输庄盘职诚征恋视频邮链扫维脸违规杀弹袭贩烟侣"
+    "宝贝亿万无么吗里后几机帮请谢听觉脑带离难双变边总热温冲刘张陈杨赵吴孙郑"
+)
+_TRADITIONAL = (
+    "詐騙賭錢幣銀賬號碼網聯買賣貨藥槍黃愛約發線電話訊軟載門開關應該這個們說時會來對沒為問題現還給讓過進從經產處實體與動見間樣學頭東車長"
+    "馬鳥魚龍氣樂書親認識語讀寫紅綠藍圖傳轉點擊頁級員費價單團釣騷贓貸債資額匯兌證帳戶驗獎勵贏輸莊盤職誠徵戀視頻郵鏈掃維臉違規殺彈襲販煙侶"
+    "寶貝億萬無麼嗎裡後幾機幫請謝聽覺腦帶離難雙變邊總熱溫沖劉張陳楊趙吳孫鄭"
+)
+_S2T: Dict[str, str] = dict(zip(_SIMPLIFIED, _TRADITIONAL))
+
+_CJK = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+
+# CJK 字元之間的空白（中文不以空白分詞）
+_CJK_GAP = re.compile(rf"(?<=[{_CJK}]) +(?=[{_CJK}])")
+# 三個以上以空白分隔的單字元（「l i n e」、「0 9 1 2」）
+_SPACED_LETTERS = re.compile(r"(?<!\S)\S(?: \S){2,}(?!\S)")
+# 連續空白的第二個之後
+_EXTRA_SPACES = re.compile(r"(?<= ) +")
+
+
+def _fold_char(char: str) -> str:
+    """形近字與簡體字折疊"""
+    return _CONFUSABLES.get(char) or _S2T.get(char) or char
+
+
+def _fold_codepoint(char: str) -> Optional[str]:
+    """單一字元的完整折疊（None 表示移除）"""
+    if char in _INVISIBLE or unicodedata.category(char) == "Mn":
+        return None
+    if char.isspace():
+        return " "
+    return "".join(
+        _fold_char(c) for c in unicodedata.normalize("NFKC", char).casefold()
+    )
+
+
+class _TranslationTable(dict):
+    """逐字轉換表：BMP 預先建立，BMP 以外的字元查詢時才計算並記錄"""
+
+    def __missing__(self, codepoint: int) -> Optional[str]:
+        if codepoint < 0x10000:
+            # 預建時已略過不變的 BMP 字元，str.translate 收到 LookupError 即保留原字元
+            raise LookupError(codepoint)
+        folded = _fold_codepoint(chr(codepoint))
+        self[codepoint] = folded
+        return folded
+
+
+@lru_cache(maxsize=1)
+def _translation_table() -> _TranslationTable:
+    """建立逐字轉換表（基本多文種平面只記錄會改變的字元）"""
+    table = _TranslationTable()
+    for codepoint in range(0x10000):
+        if 0xD800 <= codepoint <= 0xDFFF:
+            continue
+        char = chr(codepoint)
+        folded = _fold_codepoint(char)
+        if folded != char:
+            table[codepoint] = folded
+    return table
+
+
+def _translate_char(table: _TranslationTable, char: str) -> Optional[str]:
+    """查詢單一字元的轉換結果（與 str.translate 相同語意）"""
+    codepoint = ord(char)
+    return table[codepoint] if codepoint >= 0x10000 else table.get(codepoint, char)
+
+
+def normalize_text(text: str) -> str:
+    """
+    正規化審核用文字
+
+    Args:
+        text: 原始文字
+
+    Returns:
+        正規化後的文字（小寫、已折疊、已合併空白）
+    """
+    text = text.translate(_translation_table())
+    if " " not in text:
+        return text
+    text = _CJK_GAP.sub("", text)
+    text = _SPACED_LETTERS.sub(lambda m: m.group().replace(" ", ""), text)
+    return _EXTRA_SPACES.sub("", text)
+
+
+def normalize_pattern(pattern: str) -> str:
+    """
+    以 normalize_text 的逐字折疊處理正則敏感詞，使其能比對正規化後的內容
+
+    只折疊非 ASCII 字元（ASCII 大小寫由 re.IGNORECASE 處理），跳脫序列原樣保留；
+    折疊結果以 re.escape 跳脫，全形「（」折疊為「(」時不會變成群組。
+    空白合併等跨字元處理不套用於正則。
+
+    Args:
+        pattern: 正則敏感詞原文（例如「后门.*」、「ＬＩＮＥ\\d+」）
+
+    Returns:
+        折疊後的正則（例如「後門.*」、「line\\d+」）
+    """
+    table = _translation_table()
+    pieces: List[str] = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            pieces.append(pattern[index:index + 2])
+            index += 2
+            continue
+        if char.isascii():
+            pieces.append(char)
+        else:
+            mapped = _translate_char(table, char)
+            if mapped:
+                pieces.append(re.escape(mapped) if mapped != char else char)
+        index += 1
+    return "".join(pieces)
+
+
+def _drop_spaces(
+    pattern: re.Pattern, text: str, offsets: List[int], whole_match: bool
+) -> Tuple[str, List[int]]:
+    """移除 pattern 匹配範圍內的空格，同步更新位置對照"""
+    dropped = set()
+    for match in pattern.finditer(text):
+        if whole_match:
+            dropped.update(range(match.start(), match.end()))
+        else:
+            dropped.update(i for i in range(match.start(), match.end()) if text[i] == " ")
+    if not dropped:
+        return text, offsets
+    kept = [i for i in range(len(text)) if i not in dropped]
+    return "".join(text[i] for i in kept), [offsets[i] for i in kept]
+
+
+def normalize_with_offsets(text: str) -> Tuple[str, List[int]]:
+    """
+    正規化並保留位置對照
+
+    Args:
+        text: 原始文字
+
+    Returns:
+        (normalized, offsets)：normalized 與 normalize_text(text) 相同；
+        offsets[i] 為 normalized[i] 來自原文的字元位置
+    """
+    table = _translation_table()
+    chars: List[str] = []
+    offsets: List[int] = []
+    for index, char in enumerate(text):
+        mapped = _translate_char(table, char)
+        if mapped:
+            chars.append(mapped)
+            offsets.extend([index] * len(mapped))
+    normalized = "".join(chars)
+
+    if " " not in normalized:
+        return normalized, offsets
+    normalized, offsets = _drop_spaces(_CJK_GAP, normalized, offsets, whole_match=True)
+    normalized, offsets = _drop_spaces(_SPACED_LETTERS, normalized, offsets, whole_match=False)
+    normalized, offsets = _drop_spaces(_EXTRA_SPACES, normalized, offsets, whole_match=True)
+    return normalized, offsets
+
+
+def original_span(offsets: List[int], start: int, end: int) -> Tuple[int, int]:
+    """將正規化文字上的 [start, end) 對回原文範圍"""
+    return offsets[start], offsets[end - 1] + 1
+
+
+def replace_spans(text: str, spans: List[Tuple[int, int, str]]) -> str:
+    """
+    一次替換原文中的多個範圍（重疊範圍合併，只建立一次輸出）
+
+    Args:
+        text: 原始文字
+        spans: 原文上的 (start, end, replacement)；重疊的範圍合併，
+            使用其中最長範圍的替換文字（例如連結整段替換涵蓋其中的敏感詞）
+
+    Returns:
+        替換後的文字
+    """
+    spans = sorted(span for span in spans if span[1] > span[0])
+    if not spans:
+        return text
+
+    pieces: List[str] = []
+    position = 0
+    current_start, current_end, current_replacement = spans[0]
+    widest = current_end - current_start
+    for start, end, replacement in spans[1:]:
+        if start < current_end:
+            current_end = max(current_end, end)
+            if end - start > widest:
+                widest, current_replacement = end - start, replacement
+            continue
+        pieces.append(text[position:current_start])
+        pieces.append(current_replacement)
+        position = current_end
+        current_start, current_end, current_replacement = start, end, replacement
+        widest = end - start
+    pieces.append(text[position:current_start])
+    pieces.append(current_replacement)
+    pieces.append(text[current_end:])
+    return "".join(pieces)
@@ -50,6 +50,7 @@ class TrustScoreService:
         "reported": -5,
         "report_confirmed": -10,
         "content_violation": -3,
+        "spam_burst": -5,
         "blocked": -2,
     }
 
@@ -0,0 +1,171 @@
+"""敏感詞比對器 - 每個快取世代編譯一次，逐則訊息只掃描內容一次
+
+- 一般詞：Aho–Corasick 自動機，一次掃描找出所有出現的詞，
+  成本與內容長度成正比，與敏感詞數量無關
+- 正則詞：各自預先編譯，並合併為一個交替式（alternation）作為預篩選；
+  絕大多數訊息不含任何正則詞，只需一次 search 即可排除
+
+比對對象為 text_normalizer.normalize_text 正規化後的內容；
+一般詞以同一流程正規化後建入自動機，正則詞以 normalize_pattern 做相同的逐字折疊，
+兩邊的全形、簡繁、形近字折疊一致。
+遮蔽（sanitize）使用同一個自動機的 spans()，一次掃描取得所有出現位置。
+"""
+import logging
+import re
+from collections import deque
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from app.services.text_normalizer import normalize_pattern, normalize_text
+
+logger = logging.getLogger(__name__)
+
+# 含反向參照的正則在合併後群組編號會改變，只能單獨比對
+_BACKREFERENCE = re.compile(r"\\\d|\(\?P=")
+
+
+class AhoCorasick:
+    """Aho–Corasick 多字串比對自動機"""
+
+    def __init__(self, keywords: List[str]):
+        # 狀態 i：_goto[i] 轉移表、_fail[i] 失敗連結、_output[i] 在此結束的關鍵字索引
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._lengths = [len(keyword) for keyword in keywords]
+
+        for index, keyword in enumerate(keywords):
+            if keyword:
+                self._add(keyword, index)
+        self._build_failure_links()
+
+    def _add(self, keyword: str, index: int) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append(index)
+
+    def _build_failure_links(self) -> None:
+        """以 BFS 建立失敗連結，並合併失敗鏈上的輸出"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = (
+                    self._output[next_state] + self._output[self._fail[next_state]]
+                )
+
+    def search(self, text: str) -> set:
+        """回傳出現在 text 中的關鍵字索引"""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        """回傳所有關鍵字出現的 (start, end) 位置（含重疊）"""
+        goto, fail, output, lengths = self._goto, self._fail, self._output, self._lengths
+        found = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                found.append((position + 1 - lengths[index], position + 1))
+        return found
+
+
+class SensitiveWordMatcher:
+    """由快取的敏感詞列表編譯而成的比對器"""
+
+    def __init__(self, words: List[Dict]):
+        self.words = words
+
+        literal_indices: List[int] = []
+        self._regexes: List[Tuple[int, Pattern]] = []
+        combinable: List[str] = []
+
+        for index, word_obj in enumerate(words):
+            if not word_obj["is_regex"]:
+                literal_indices.append(index)
+                continue
+            source = normalize_pattern(word_obj["word"])
+            try:
+                pattern = re.compile(source, re.IGNORECASE)
+            except re.error:
+                logger.warning(f"Invalid sensitive word regex skipped: {word_obj['word']}")
+                continue
+            self._regexes.append((index, pattern))
+            if not _BACKREFERENCE.search(source):
+                combinable.append(source)
+
+        self._literal_indices = literal_indices
+        self._automaton = AhoCorasick([normalize_text(words[i]["word"]) for i in literal_indices])
+
+        # 合併所有正則作為預篩選；含反向參照或無法合併（如中段全域旗標）時不篩選
+        self._regex_prefilter: Optional[Pattern] = None
+        if combinable and len(combinable) == len(self._regexes):
+            try:
+                self._regex_prefilter = re.compile(
+                    "|".join(f"(?:{p})" for p in combinable), re.IGNORECASE
+                )
+            except re.error:
+                self._regex_prefilter = None
+
+    def match(self, text: str) -> List[int]:
+        """
+        找出內容觸發的敏感詞
+
+        Args:
+            text: 正規化後的內容（normalize_text）
+
+        Returns:
+            觸發的敏感詞索引，依敏感詞列表順序
+        """
+        matched = {self._literal_indices[i] for i in self._automaton.search(text)}
+
+        if self._regexes and (
+            self._regex_prefilter is None or self._regex_prefilter.search(text)
+        ):
+            matched.update(index for index, pattern in self._regexes if pattern.search(text))
+
+        return sorted(matched)
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        找出內容中所有敏感詞出現的位置（供遮蔽使用）
+
+        Args:
+            text: 正規化後的內容（normalize_with_offsets）
+
+        Returns:
+            (start, end) 列表，可能重疊、未排序
+        """
+        found = self._automaton.spans(text)
+
+        if self._regexes and (
+            self._regex_prefilter is None or self._regex_prefilter.search(text)
+        ):
+            for _, pattern in self._regexes:
+                found.extend(m.span() for m in pattern.finditer(text) if m.end() > m.start())
+
+        return found
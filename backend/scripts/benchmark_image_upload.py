@@ -0,0 +1,112 @@
+"""圖片上傳對事件迴圈延遲的影響基準測試
+
+模擬同一 worker 在處理一批照片上傳時，其他請求（WebSocket / HTTP）
+能否被即時排程：以 probe 協程每 10ms 醒來一次，量測實際延遲。
+
+比較三種模式：
+- inline：直接在事件迴圈執行 PIL 處理（舊行為）
+- thread：預設執行緒池（IMAGE_PROCESS_WORKERS=0）
+- process：圖片處理行程池（IMAGE_PROCESS_WORKERS>0）
+
+使用方式：
+    cd backend
+    python scripts/benchmark_image_upload.py --uploads 20 --workers 2
+"""
+import argparse
+import asyncio
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PIL import Image  # noqa: E402
+
+from app.services.file_storage import render_photo  # noqa: E402
+from app.services.process_executor import ProcessExecutor  # noqa: E402
+
+PROBE_INTERVAL = 0.01  # 10ms
+
+
+def make_sample_image(width: int, height: int) -> bytes:
+    """產生帶雜訊的測試圖片（純色圖片壓縮過快，無法反映真實負載）"""
+    img = Image.effect_noise((width, height), 64).convert("RGB")
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=95)
+    return buffer.getvalue()
+
+
+async def probe(stop: asyncio.Event, lags: list) -> None:
+    """每 PROBE_INTERVAL 醒來一次，記錄排程延遲（毫秒）"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - started - PROBE_INTERVAL) * 1000)
+
+
+async def run_mode(mode: str, content: bytes, uploads: int, workers: int) -> dict:
+    """以指定模式處理一批上傳並回傳延遲統計"""
+    executor = ProcessExecutor("image", "IMAGE_PROCESS_WORKERS")
+    if mode == "process":
+        executor.start(workers=workers)
+        # 預熱：spawn 行程與匯入 PIL 不計入量測
+        await asyncio.gather(*[executor.run(render_photo, content) for _ in range(workers)])
+
+    async def upload():
+        if mode == "inline":
+            render_photo(content)
+            await asyncio.sleep(0)
+        else:
+            await executor.run(render_photo, content)
+
+    lags: list = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(stop, lags))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[upload() for _ in range(uploads)])
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await probe_task
+    await executor.shutdown()
+
+    lags.sort()
+    return {
+        "mode": mode,
+        "elapsed_s": elapsed,
+        "lag_p50_ms": statistics.median(lags) if lags else 0.0,
+        "lag_p99_ms": lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0,
+        "lag_max_ms": lags[-1] if lags else 0.0,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=20, help="同時上傳張數")
+    parser.add_argument("--workers", type=int, default=2, help="行程池大小")
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=2000)
+    args = parser.parse_args()
+
+    content = make_sample_image(args.width, args.height)
+    print(
+        f"{args.uploads} uploads of {args.width}x{args.height} "
+        f"({len(content) / 1024:.0f} KB), {args.workers} workers\n"
+    )
+    print(f"{'mode':<8} {'total(s)':>9} {'lag p50':>9} {'lag p99':>9} {'lag max':>9}")
+
+    for mode in ("inline", "thread", "process"):
+        result = await run_mode(mode, content, args.uploads, args.workers)
+        print(
+            f"{result['mode']:<8} {result['elapsed_s']:>9.2f} "
+            f"{result['lag_p50_ms']:>7.1f}ms {result['lag_p99_ms']:>7.1f}ms "
+            f"{result['lag_max_ms']:>7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
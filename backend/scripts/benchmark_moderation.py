@@ -0,0 +1,275 @@
+"""內容審核路徑基準測試
+
+以模擬的中英文聊天訊息語料，量測每則訊息的審核成本（吞吐量與 p50 / p99 延遲）：
+- suspicious：可疑模式檢查，比較逐一模式 re.findall（舊行為）與合併的具名群組掃描
+- 依敏感詞數量（預設 100 / 1k / 10k，一般詞與正則混合）分別量測：
+  - build：編譯比對器的時間
+  - scan：正規化 + 敏感詞比對 + 可疑模式，不含載入與日誌
+  - check_content / sanitize_content：公開的非同步 API，完整經過比對器快取與審核日誌
+
+不需 PostgreSQL 與 Redis：敏感詞由記憶體中的 Session 替身回應查詢，
+審核日誌寫入丟棄結果的替身，ContentModerationService 使用內存快取。
+調整比對器或正規化後，以相同的 --seed 比較前後結果。
+
+使用方式：
+    cd backend
+    python scripts/benchmark_moderation.py --messages 20000
+    python scripts/benchmark_moderation.py --words 100,1000,10000 --regex-ratio 0.05
+"""
+import argparse
+import asyncio
+import random
+import re
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.models.moderation import SensitiveWord  # noqa: E402
+from app.services.content_moderation import ContentModerationService  # noqa: E402
+from app.services.moderation_log_writer import moderation_log_writer  # noqa: E402
+from app.services.text_normalizer import normalize_text  # noqa: E402
+from app.services.word_matcher import SensitiveWordMatcher  # noqa: E402
+
+# 一般聊天內容
+CHAT_TEMPLATES = [
+    "嗨！你好呀，看到你的照片覺得很有趣",
+    "週末要不要一起去{place}走走？",
+    "我也很喜歡{hobby}，你平常多久去一次？",
+    "哈哈哈真的假的 😂",
+    "今天工作好累，剛下班準備去吃{food}",
+    "Hi! How was your weekend?",
+    "I love {hobby} too, we should go together sometime",
+    "晚安～明天見",
+    "你是做什麼工作的呀？我在{place}附近上班",
+    "好啊，那就約{day}晚上七點在{place}捷運站？",
+    "lol that's so funny, what happened next?",
+    "最近有看什麼好看的電影嗎？推薦一下",
+]
+
+# 含可疑內容或敏感詞的訊息（實際流量中佔少數）
+SUSPICIOUS_TEMPLATES = [
+    "加我 line: {handle} 聊比較方便",
+    "我的 wechat：{handle}",
+    "先匯款 NT${amount} 給我，保證穩賺不賠",
+    "打給我 09{digits}",
+    "看這個 https://example.com/{handle} 投資機會",
+    "這 不 是 詐 騙 喔，相信我",
+    "free money!! send USD{amount} now",
+]
+
+FILLERS = {
+    "place": ["信義區", "陽明山", "淡水", "大安森林公園", "西門町", "Taipei 101"],
+    "hobby": ["爬山", "看電影", "hiking", "煮飯", "打籃球", "攝影"],
+    "food": ["拉麵", "火鍋", "滷肉飯", "pizza", "牛肉麵"],
+    "day": ["週五", "週六", "明天", "下週三"],
+}
+
+# 實際會出現在語料中的敏感詞，其餘以隨機詞彙補足到指定數量
+WORDS = ["詐騙", "匯款", "穩賺不賠", "投資機會", "約砲", "援交", "賭博", "scam", "escort", "free money"]
+REGEX_WORDS = [r"\d{4}[- ]?\d{4}[- ]?\d{4}[- ]?\d{4}", r"(?:加|\+)\s*賴"]
+
+# 產生隨機詞彙用的常用字
+CJK_CHARS = (
+    "的一是不了人我在有他這中大來上國個到說們為子和你地出道也時年得就那要下以生會自著去之過家學對可她裡後"
+    "小麼心多天而能好都然沒日於起還發成事只作當想看文無開手十用主行方又如前所本見經頭面公同三已老從動兩長"
+)
+LATIN_CHARS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def make_corpus(count: int, suspicious_ratio: float = 0.1, seed: int = 42) -> List[str]:
+    """產生模擬聊天訊息語料"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        templates = SUSPICIOUS_TEMPLATES if rng.random() < suspicious_ratio else CHAT_TEMPLATES
+        message = rng.choice(templates).format(
+            handle=f"user{rng.randint(100, 99999)}",
+            amount=rng.randint(100, 50000),
+            digits="".join(rng.choice("0123456789") for _ in range(8)),
+            **{key: rng.choice(values) for key, values in FILLERS.items()},
+        )
+        corpus.append(message)
+    return corpus
+
+
+def _random_literal(rng: random.Random) -> str:
+    if rng.random() < 0.7:
+        return "".join(rng.choice(CJK_CHARS) for _ in range(rng.randint(2, 4)))
+    return "".join(rng.choice(LATIN_CHARS) for _ in range(rng.randint(4, 9)))
+
+
+def make_words(count: int, regex_ratio: float = 0.05, seed: int = 42) -> List[SensitiveWord]:
+    """產生指定數量的敏感詞（一般詞與正則混合），含語料中實際出現的詞"""
+    rng = random.Random(seed)
+    literals = set(WORDS)
+    regexes = set(REGEX_WORDS)
+    regex_count = max(len(REGEX_WORDS), int(count * regex_ratio))
+
+    while len(literals) + len(regexes) < count:
+        if len(regexes) < regex_count:
+            regexes.add(rf"{_random_literal(rng)}\s*[:：]?\s*\d{{{rng.randint(3, 6)},}}")
+        else:
+            literals.add(_random_literal(rng))
+
+    return [
+        SensitiveWord(
+            id=uuid.UUID(int=rng.getrandbits(128)),
+            word=word,
+            category=rng.choice(["SCAM", "SEXUAL", "HARASSMENT", "PERSONAL_INFO"]),
+            severity=rng.choice(["LOW", "MEDIUM", "HIGH"]),
+            action=rng.choice(["WARN", "WARN", "REJECT"]),
+            is_regex=is_regex,
+            description=None,
+        )
+        for words, is_regex in ((sorted(literals), False), (sorted(regexes), True))
+        for word in words
+    ]
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class MemorySession:
+    """以記憶體中的敏感詞回應查詢的 AsyncSession 替身"""
+
+    def __init__(self, words: List[SensitiveWord]):
+        self._words = words
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params=None):
+        return _Result(self._words)
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+def legacy_suspicious(normalized: str) -> List[int]:
+    """舊行為：每個模式各自 re.findall"""
+    return [
+        index for index, pattern in enumerate(ContentModerationService.SUSPICIOUS_PATTERNS)
+        if re.findall(pattern, normalized, re.IGNORECASE)
+    ]
+
+
+def _summary(timings: List[float], elapsed: float) -> dict:
+    timings.sort()
+    return {
+        "per_sec": len(timings) / elapsed,
+        "p50_us": statistics.median(timings),
+        "p99_us": timings[min(len(timings) - 1, int(len(timings) * 0.99))],
+    }
+
+
+def measure(func: Callable[[str], object], corpus: List[str]) -> dict:
+    """逐則量測並回傳吞吐量與延遲分位數"""
+    timings = []
+    started = time.perf_counter()
+    for message in corpus:
+        begin = time.perf_counter()
+        func(message)
+        timings.append((time.perf_counter() - begin) * 1_000_000)
+    return _summary(timings, time.perf_counter() - started)
+
+
+async def measure_async(func: Callable[[str], Awaitable[object]], corpus: List[str]) -> dict:
+    """逐則 await 量測（依序執行，與單一連線處理訊息相同）"""
+    timings = []
+    started = time.perf_counter()
+    for message in corpus:
+        begin = time.perf_counter()
+        await func(message)
+        timings.append((time.perf_counter() - begin) * 1_000_000)
+    return _summary(timings, time.perf_counter() - started)
+
+
+def print_row(name: str, result: dict) -> None:
+    print(
+        f"{name:<20} {result['per_sec']:>10.0f} "
+        f"{result['p50_us']:>7.1f}us {result['p99_us']:>7.1f}us"
+    )
+
+
+async def run_word_list(size: int, corpus: List[str], args: argparse.Namespace) -> None:
+    """以指定數量的敏感詞量測比對器編譯與各審核路徑"""
+    words = make_words(size, args.regex_ratio, args.seed)
+    db = MemorySession(words)
+    user_id = uuid.uuid4()
+
+    # 使用內存快取，並清除上一輪的比對器
+    ContentModerationService._redis = None
+    ContentModerationService._use_redis = False
+    await ContentModerationService.clear_cache()
+
+    started = time.perf_counter()
+    matcher = SensitiveWordMatcher([ContentModerationService.serialize_word(w) for w in words])
+    build_ms = (time.perf_counter() - started) * 1000
+
+    # 預熱：載入並編譯 ContentModerationService 的比對器，不計入量測
+    await ContentModerationService.check_content("預熱", db)
+
+    regex_count = sum(1 for w in words if w.is_regex)
+    print(f"\n{len(words)} words ({regex_count} regex), build {build_ms:.0f}ms")
+    service = ContentModerationService
+    print_row("scan", measure(lambda message: service._scan(matcher, message), corpus))
+    print_row("check_content", await measure_async(
+        lambda message: service.check_content(message, db, user_id, "MESSAGE"), corpus
+    ))
+    print_row("sanitize_content", await measure_async(
+        lambda message: service.sanitize_content(message, db), corpus
+    ))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000, help="語料訊息數")
+    parser.add_argument("--suspicious-ratio", type=float, default=0.1, help="可疑訊息比例")
+    parser.add_argument("--words", default="100,1000,10000", help="敏感詞數量（逗號分隔）")
+    parser.add_argument("--regex-ratio", type=float, default=0.05, help="正則敏感詞比例")
+    parser.add_argument("--seed", type=int, default=42, help="語料與敏感詞的隨機種子")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.messages, args.suspicious_ratio, args.seed)
+    normalized = [normalize_text(message) for message in corpus]
+
+    # 審核日誌寫入丟棄結果的替身，以背景 writer 批次處理（與正式環境相同）
+    moderation_log_writer.set_session_factory(lambda: MemorySession([]))
+    await moderation_log_writer.start_writer()
+
+    print(f"{args.messages} messages, {args.suspicious_ratio:.0%} suspicious\n")
+    print(f"{'case':<20} {'msg/s':>10} {'p50':>9} {'p99':>9}")
+    print_row("suspicious/findall", measure(legacy_suspicious, normalized))
+    print_row(
+        "suspicious/scanner",
+        measure(ContentModerationService._find_suspicious_patterns, normalized)
+    )
+
+    for size in (int(value) for value in args.words.split(",")):
+        await run_word_list(size, corpus, args)
+
+    await moderation_log_writer.stop_writer()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,122 @@
+"""照片傳送吞吐量基準測試（單一 worker）
+
+以 ASGI 直接呼叫應用程式（不經網路），量測單一事件迴圈每秒能處理的照片請求數。
+
+比較：
+- staticfiles：舊的 Starlette StaticFiles 掛載
+- route：上傳檔案路由，完整傳送（200）
+- route-304：瀏覽器帶 If-None-Match 重新驗證（304，不傳送內容）
+- route-accel：UPLOADS_ACCEL_REDIRECT_PREFIX 交由前端代理傳送（只回傳標頭）
+
+實際部署中，immutable 快取讓重複瀏覽完全不會發出請求，
+表中 route-304 代表少數仍會重新驗證的客戶端。
+
+使用方式：
+    cd backend
+    python scripts/benchmark_upload_serving.py --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import io
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.staticfiles import StaticFiles  # noqa: E402
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from app.api import uploads  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.services.file_storage import FileStorageService  # noqa: E402
+from app.services.storage_backends import LocalStorageBackend  # noqa: E402
+
+PHOTO_KEY = "photos/bench-user/photo.jpg"
+
+
+def make_photo(root: Path, width: int) -> int:
+    """產生一張主圖大小的 JPEG，回傳檔案大小"""
+    img = Image.effect_noise((width, width * 3 // 4), 64).convert("RGB")
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=85)
+    path = root / PHOTO_KEY
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(buffer.getvalue())
+    return len(buffer.getvalue())
+
+
+async def run_case(app: FastAPI, requests: int, concurrency: int, headers: dict) -> float:
+    """以固定並行數送出請求，回傳每秒請求數"""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        # 預熱（ETag 快取、檔案系統快取）
+        await client.get(f"/uploads/{PHOTO_KEY}")
+
+        remaining = requests
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get(f"/uploads/{PHOTO_KEY}", headers=headers)
+                assert response.status_code in (200, 304), response.status_code
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        return requests / (time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="每種情境的請求數")
+    parser.add_argument("--concurrency", type=int, default=50, help="並行請求數")
+    parser.add_argument("--width", type=int, default=1200, help="照片寬度")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp())
+    try:
+        size = make_photo(root, args.width)
+
+        static_app = FastAPI()
+        static_app.mount("/uploads", StaticFiles(directory=str(root)), name="uploads")
+
+        route_app = FastAPI()
+        route_app.include_router(uploads.router)
+
+        service = FileStorageService(backend=LocalStorageBackend(str(root)))
+        with patch.object(uploads, "file_storage", service):
+            transport = ASGITransport(app=route_app)
+            async with AsyncClient(transport=transport, base_url="http://bench") as client:
+                etag = (await client.get(f"/uploads/{PHOTO_KEY}")).headers["etag"]
+
+            cases = [
+                ("staticfiles", static_app, {}, ""),
+                ("route", route_app, {}, ""),
+                ("route-304", route_app, {"If-None-Match": etag}, ""),
+                ("route-accel", route_app, {}, "/_uploads/"),
+            ]
+
+            print(
+                f"{args.requests} requests, concurrency {args.concurrency}, "
+                f"photo {size / 1024:.0f} KB\n"
+            )
+            print(f"{'case':<12} {'req/s':>9} {'MB/s':>8}")
+            for name, app, headers, accel_prefix in cases:
+                with patch.object(settings, "UPLOADS_ACCEL_REDIRECT_PREFIX", accel_prefix):
+                    rps = await run_case(app, args.requests, args.concurrency, headers)
+                sends_body = not headers and not accel_prefix
+                mbps = rps * size / 1024 / 1024 if sends_body else 0.0
+                print(f"{name:<12} {rps:>9.0f} {mbps:>8.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -19,6 +19,13 @@ from app.core.database import Base, get_db
 from app.services.content_moderation import ContentModerationService
 from app.services.photo_moderation import PhotoModerationService
 from app.middleware.last_active import set_session_factory, reset_session_factory
+from app.services.notification_retention import notification_retention
+from app.services.message_partitions import message_partitions
+from app.services.photo_hashing import photo_hash_index
+from app.services.photo_moderation_queue import photo_moderation_queue
+from app.services.moderation_log_writer import moderation_log_writer
+from app.services.moderation_rescan import moderation_rescan
+from app.services.admin_stats import AdminStatsService
 
 # 測試資料庫 URL（使用獨立的 PostgreSQL 測試資料庫）
 # 優先從環境變數讀取，預設值僅作為提醒
@@ -59,6 +66,14 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
     ContentModerationService.set_session_factory(TestSessionLocal)
     PhotoModerationService.set_session_factory(TestSessionLocal)
     set_session_factory(TestSessionLocal)
+    notification_retention.set_session_factory(TestSessionLocal)
+    message_partitions.set_session_factory(TestSessionLocal)
+    photo_moderation_queue.set_session_factory(TestSessionLocal)
+    moderation_log_writer.set_session_factory(TestSessionLocal)
+    moderation_rescan.set_session_factory(TestSessionLocal)
+    # 照片雜湊索引改由本測試的資料庫重建
+    photo_hash_index.invalidate()
+    await AdminStatsService.invalidate()
 
     async with TestSessionLocal() as session:
         yield session
@@ -67,6 +82,11 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
     ContentModerationService.reset_session_factory()
     PhotoModerationService.reset_session_factory()
     reset_session_factory()
+    notification_retention.reset_session_factory()
+    message_partitions.reset_session_factory()
+    photo_moderation_queue.reset_session_factory()
+    moderation_log_writer.reset_session_factory()
+    moderation_rescan.reset_session_factory()
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -0,0 +1,111 @@
+"""管理後台統計服務測試（單次聚合查詢、快照快取）"""
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.services.admin_stats import AdminStatsService, STATS_DASHBOARD
+
+
+@pytest.fixture(autouse=True)
+def reset_stats_cache():
+    """每個測試使用乾淨的快取，且不使用 Redis"""
+    AdminStatsService._local_cache.clear()
+    with patch.object(AdminStatsService, "_redis", None):
+        yield
+    AdminStatsService._local_cache.clear()
+
+
+def _capture_db(row: dict):
+    """記錄執行的 SQL，回傳指定的單列結果"""
+    statements = []
+
+    async def execute(statement):
+        statements.append(statement)
+        result = MagicMock()
+        result.one.return_value._mapping = row
+        return result
+
+    db = MagicMock()
+    db.execute = execute
+    return db, statements
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestAggregateQueries:
+    """統計查詢測試"""
+
+    @pytest.mark.asyncio
+    async def test_dashboard_stats_is_single_filtered_query(self):
+        """測試：後台統計只發出一條查詢，各表只掃描一次"""
+        db, statements = _capture_db({"total_users": 3})
+
+        assert await AdminStatsService.get_dashboard_stats(db) == {"total_users": 3}
+
+        assert len(statements) == 1
+        sql = _sql(statements[0])
+        assert "FILTER (WHERE" in sql
+        for table in ("users", "matches", "messages", "reports", "blocked_users"):
+            assert sql.count(f"FROM {table}") == 1, table
+
+    @pytest.mark.asyncio
+    async def test_moderation_stats_is_single_filtered_query(self):
+        """測試：審核統計只發出一條查詢"""
+        db, statements = _capture_db({})
+
+        await AdminStatsService.get_moderation_stats(db)
+
+        assert len(statements) == 1
+        sql = _sql(statements[0])
+        assert sql.count("FROM moderation_logs") == 1
+        assert "FILTER (WHERE" in sql
+
+
+class TestStatsCache:
+    """統計快照快取測試"""
+
+    @pytest.mark.asyncio
+    async def test_local_cache_until_invalidated(self):
+        """測試：快取期間不重新計算，失效後重新計算"""
+        loader = AsyncMock(side_effect=[{"n": 1}, {"n": 2}])
+
+        assert await AdminStatsService.get_cached(STATS_DASHBOARD, loader) == {"n": 1}
+        assert await AdminStatsService.get_cached(STATS_DASHBOARD, loader) == {"n": 1}
+        assert loader.await_count == 1
+
+        await AdminStatsService.invalidate(STATS_DASHBOARD)
+        assert await AdminStatsService.get_cached(STATS_DASHBOARD, loader) == {"n": 2}
+
+    @pytest.mark.asyncio
+    async def test_zero_ttl_disables_cache(self):
+        """測試：ADMIN_STATS_CACHE_SECONDS=0 時每次重新計算"""
+        loader = AsyncMock(return_value={"n": 1})
+
+        with patch.object(settings, "ADMIN_STATS_CACHE_SECONDS", 0):
+            await AdminStatsService.get_cached(STATS_DASHBOARD, loader)
+            await AdminStatsService.get_cached(STATS_DASHBOARD, loader)
+
+        assert loader.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_redis_cache_shared(self):
+        """測試：有 Redis 時讀寫 Redis 快照"""
+        redis = AsyncMock()
+        redis.get.return_value = None
+        loader = AsyncMock(return_value={"n": 1})
+
+        with patch.object(AdminStatsService, "_redis", redis):
+            assert await AdminStatsService.get_cached(STATS_DASHBOARD, loader) == {"n": 1}
+            key, ttl, value = redis.setex.call_args.args
+            assert key == "admin_stats:dashboard"
+            assert ttl == settings.ADMIN_STATS_CACHE_SECONDS
+            assert json.loads(value) == {"n": 1}
+
+            redis.get.return_value = json.dumps({"n": 5})
+            assert await AdminStatsService.get_cached(STATS_DASHBOARD, loader) == {"n": 5}
+            assert loader.await_count == 1
@@ -212,6 +212,24 @@ async def test_upload_image_invalid_format(client: AsyncClient, matched_users_fo
     assert "不支援的圖片格式" in response.json()["detail"]
 
 
+@pytest.mark.asyncio
+async def test_upload_image_spoofed_content_type(
+    client: AsyncClient, matched_users_for_image: dict
+):
+    """測試 Content-Type 偽造為圖片但內容不是圖片"""
+    match_id = matched_users_for_image["match_id"]
+    alice_token = matched_users_for_image["alice"]["token"]
+
+    response = await client.post(
+        f"/api/messages/matches/{match_id}/upload-image",
+        headers={"Authorization": f"Bearer {alice_token}"},
+        files={"file": ("test.jpg", b"This is not an image", "image/jpeg")}
+    )
+
+    assert response.status_code == 400
+    assert "無效的圖片" in response.json()["detail"]
+
+
 @pytest.mark.asyncio
 async def test_upload_image_empty_file(client: AsyncClient, matched_users_for_image: dict):
     """測試上傳空檔案"""
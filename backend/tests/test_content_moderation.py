@@ -315,6 +315,57 @@ class TestProfileContentCheck:
         assert len(violations) == 0
 
 
+@pytest.mark.asyncio
+class TestCheckMany:
+    """批次內容檢查測試"""
+
+    async def test_results_per_item(self, test_db: AsyncSession, test_user: User, sensitive_words):
+        """測試：每個欄位各自回傳結果，順序與輸入相同"""
+        results = await ContentModerationService.check_many(
+            [("a", "我喜歡旅遊"), ("b", "想要投資嗎"), ("c", ""), ("d", "色情")],
+            test_db,
+        )
+
+        assert [result[3] for result in results] == ["APPROVED", "WARN", "APPROVED", "REJECT"]
+        assert results[3][0] is False
+
+    async def test_single_consolidated_log(
+        self, test_db: AsyncSession, test_user: User, sensitive_words
+    ):
+        """測試：多個欄位違規只記錄一筆合併日誌"""
+        await ContentModerationService.check_many(
+            [("個人簡介", "色情"), ("顯示名稱", "投資達人"), ("興趣標籤 '旅遊'", "旅遊")],
+            test_db,
+            test_user.id,
+        )
+
+        result = await test_db.execute(
+            select(ModerationLog).where(ModerationLog.user_id == test_user.id)
+        )
+        logs = result.scalars().all()
+        assert len(logs) == 1
+        assert logs[0].action_taken == "REJECT"
+        assert "[個人簡介] 色情" in logs[0].original_content
+        assert "旅遊" not in logs[0].original_content
+
+    async def test_profile_action_is_most_severe(
+        self, test_db: AsyncSession, test_user: User, sensitive_words
+    ):
+        """測試：較輕的違規不會覆蓋較嚴重的動作"""
+        is_approved, violations, action = await ContentModerationService.check_profile_content(
+            db=test_db,
+            user_id=test_user.id,
+            bio="色情",
+            interests=["投資"],
+            display_name="小明",
+        )
+
+        assert is_approved is False
+        assert action == "REJECT"
+        assert any("個人簡介" in v for v in violations)
+        assert any("興趣標籤" in v for v in violations)
+
+
 @pytest.mark.asyncio
 class TestMessageContentCheck:
     """聊天訊息內容審核測試"""
@@ -182,6 +182,27 @@ async def test_browse_users_success(client: AsyncClient, completed_profiles: dic
         assert "match_score" in candidate
 
 
+@pytest.mark.asyncio
+async def test_browse_users_returns_card_sized_photos(
+    client: AsyncClient, completed_profiles: dict
+):
+    """測試：探索卡片回傳卡片尺寸的照片與 WebP srcset，而非 1200px 主圖"""
+    response = await client.get("/api/discovery/browse?limit=10",
+        headers={"Authorization": f"Bearer {completed_profiles['alice']['token']}"}
+    )
+
+    assert response.status_code == 200
+    candidates = response.json()
+    assert len(candidates) > 0
+
+    candidate = candidates[0]
+    assert len(candidate["photo_sources"]) == len(candidate["photos"])
+    # 測試圖片為 100x100，不會產生更小的變體，卡片直接使用主圖
+    sources = candidate["photo_sources"][0]
+    assert sources["src"] == candidate["photos"][0]
+    assert ".webp" in sources["webp_srcset"]
+
+
 @pytest.mark.asyncio
 async def test_like_user_success(client: AsyncClient, completed_profiles: dict, test_db: AsyncSession):
     """測試：成功喜歡用戶"""
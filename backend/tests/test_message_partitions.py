@@ -0,0 +1,143 @@
+"""訊息分區維護測試
+
+測試範圍：
+1. 月份計算與分區命名
+2. ensure_partitions 預建分區（含預設分區衝突處理）
+3. 訊息寫入後可透過分區表正常查詢
+"""
+import uuid
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.match import Match, Message
+from app.models.user import User
+from app.services.message_partitions import (
+    message_partitions,
+    add_months,
+    month_start,
+    partition_name,
+    parse_partition_month,
+)
+
+
+class TestPartitionNaming:
+    """分區命名與月份計算"""
+
+    def test_month_start(self):
+        """測試：取得月份第一天"""
+        assert month_start(date(2026, 3, 17)) == date(2026, 3, 1)
+
+    def test_add_months_across_year(self):
+        """測試：跨年的月份加減"""
+        assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+    def test_partition_name_roundtrip(self):
+        """測試：分區名稱與月份互相轉換"""
+        name = partition_name(date(2026, 4, 1))
+
+        assert name == "messages_y2026m04"
+        assert parse_partition_month(name) == date(2026, 4, 1)
+
+    def test_parse_non_monthly_partition(self):
+        """測試：預設分區不是月份分區"""
+        assert parse_partition_month("messages_default") is None
+
+
+async def _create_match(db: AsyncSession) -> Match:
+    """建立測試用配對"""
+    users = [
+        User(
+            id=uuid.uuid4(),
+            email=f"partition{i}@example.com",
+            password_hash="dummy_hash",
+            date_of_birth=date(1995, 1, 1),
+            is_active=True,
+        )
+        for i in range(2)
+    ]
+    db.add_all(users)
+    await db.commit()
+
+    user1_id, user2_id = sorted((u.id for u in users), key=str)
+    match = Match(user1_id=user1_id, user2_id=user2_id, status="ACTIVE")
+    db.add(match)
+    await db.commit()
+    return match
+
+
+class TestEnsurePartitions:
+    """預建月份分區"""
+
+    @pytest.mark.asyncio
+    async def test_creates_current_and_future_months(self, test_db: AsyncSession):
+        """測試：建立本月與未來數個月的分區，重複執行不會重建"""
+        created = await message_partitions.ensure_partitions(
+            months_ahead=2, today=date(2031, 5, 20)
+        )
+
+        assert created == ["messages_y2031m05", "messages_y2031m06", "messages_y2031m07"]
+
+        partitions = {name for name, _ in await message_partitions.list_partitions(test_db)}
+        assert {"messages_default", *created} <= partitions
+
+        created_again = await message_partitions.ensure_partitions(
+            months_ahead=2, today=date(2031, 5, 20)
+        )
+        assert created_again == []
+
+    @pytest.mark.asyncio
+    async def test_skips_month_with_rows_in_default_partition(self, test_db: AsyncSession):
+        """測試：預設分區已有該月份資料時略過建立"""
+        match = await _create_match(test_db)
+        test_db.add(Message(
+            match_id=match.id,
+            sender_id=match.user1_id,
+            content="落入預設分區",
+            sent_at=datetime(2032, 1, 15, tzinfo=timezone.utc)
+        ))
+        await test_db.commit()
+
+        created = await message_partitions.ensure_partitions(
+            months_ahead=1, today=date(2032, 1, 1)
+        )
+
+        assert created == ["messages_y2032m02"]
+
+    @pytest.mark.asyncio
+    async def test_messages_routed_to_monthly_partition(self, test_db: AsyncSession):
+        """測試：建立分區後訊息寫入對應月份分區且可正常查詢"""
+        match = await _create_match(test_db)
+        await message_partitions.ensure_partitions(months_ahead=0, today=date(2033, 3, 1))
+
+        message = Message(
+            match_id=match.id,
+            sender_id=match.user1_id,
+            content="三月的訊息",
+            sent_at=datetime(2033, 3, 10, tzinfo=timezone.utc)
+        )
+        test_db.add(message)
+        await test_db.commit()
+
+        result = await test_db.execute(
+            text("SELECT count(*) FROM messages_y2033m03 WHERE id = :id"),
+            {"id": message.id}
+        )
+        assert result.scalar() == 1
+
+        loaded = await test_db.scalar(select(Message).where(Message.id == message.id))
+        assert loaded.content == "三月的訊息"
+
+
+class TestColdTiering:
+    """冷熱分層"""
+
+    @pytest.mark.asyncio
+    async def test_disabled_without_tablespace(self, test_db: AsyncSession):
+        """測試：未設定冷儲存 tablespace 時不移動任何分區"""
+        moved = await message_partitions.move_cold_partitions(tablespace="")
+
+        assert moved == []
@@ -245,3 +245,33 @@ class TestModerationStats:
         assert isinstance(data["total_appeals"], int)
         assert isinstance(data["pending_appeals"], int)
         assert data["total_sensitive_words"] >= 2
+
+    async def test_stats_refresh_after_word_changes(
+        self,
+        client: AsyncClient,
+        admin_headers: dict,
+        sensitive_words: list
+    ):
+        """測試：新增、刪除敏感詞後統計快照立即更新"""
+        response = await client.get("/api/moderation/stats", headers=admin_headers)
+        before = response.json()
+
+        response = await client.post(
+            "/api/moderation/sensitive-words",
+            json={"word": "統計測試詞", "category": "OTHER", "severity": "LOW", "action": "WARN"},
+            headers=admin_headers
+        )
+        assert response.status_code == 201
+        word_id = response.json()["id"]
+
+        response = await client.get("/api/moderation/stats", headers=admin_headers)
+        assert response.json()["total_sensitive_words"] == before["total_sensitive_words"] + 1
+        assert response.json()["active_sensitive_words"] == before["active_sensitive_words"] + 1
+
+        response = await client.delete(
+            f"/api/moderation/sensitive-words/{word_id}", headers=admin_headers
+        )
+        assert response.status_code == 204
+
+        response = await client.get("/api/moderation/stats", headers=admin_headers)
+        assert response.json()["active_sensitive_words"] == before["active_sensitive_words"]
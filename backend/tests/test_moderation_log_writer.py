@@ -0,0 +1,135 @@
+"""審核日誌批次寫入器測試"""
+import asyncio
+import uuid
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from app.services.moderation_log_writer import ModerationLogWriter
+
+
+class _FakeSession:
+    """記錄 execute 呼叫的假 Session"""
+
+    def __init__(self, factory):
+        self._factory = factory
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, rows):
+        if self._factory.fail:
+            raise RuntimeError("database unavailable")
+        self._factory.batches.append(list(rows))
+
+    async def commit(self):
+        self._factory.commits += 1
+
+    async def rollback(self):
+        pass
+
+
+class _FakeSessionFactory:
+    def __init__(self):
+        self.batches = []
+        self.commits = 0
+        self.fail = False
+
+    def __call__(self):
+        return _FakeSession(self)
+
+
+@pytest.fixture
+def writer():
+    factory = _FakeSessionFactory()
+    log_writer = ModerationLogWriter()
+    log_writer.set_session_factory(factory)
+    return log_writer, factory
+
+
+async def _log(log_writer: ModerationLogWriter, content: str = "色情內容"):
+    await log_writer.log(
+        user_id=uuid.uuid4(),
+        content_type="MESSAGE",
+        content=content,
+        is_approved=False,
+        violations=["SEXUAL: 色情"],
+        triggered_word_ids=[uuid.uuid4()],
+        action_taken="REJECT",
+    )
+
+
+class TestModerationLogWriter:
+    """批次寫入測試"""
+
+    @pytest.mark.asyncio
+    async def test_writes_immediately_without_worker(self, writer):
+        """測試：writer 未啟動時每筆日誌立即寫入"""
+        log_writer, factory = writer
+
+        await _log(log_writer)
+
+        assert len(factory.batches) == 1
+        row = factory.batches[0][0]
+        assert row["original_content"] == "色情內容"
+        assert row["violations"] == '["SEXUAL: 色情"]'
+        assert row["created_at"] is not None
+
+    @pytest.mark.asyncio
+    async def test_buffers_and_flushes_in_batches(self, writer):
+        """測試：writer 執行中只排入緩衝，定期以批次寫入"""
+        log_writer, factory = writer
+
+        with patch.object(settings, "MODERATION_LOG_FLUSH_INTERVAL_MS", 10_000), \
+                patch.object(settings, "MODERATION_LOG_BATCH_SIZE", 4):
+            await log_writer.start_writer()
+            for i in range(3):
+                await _log(log_writer, f"msg {i}")
+            await asyncio.sleep(0)
+            assert factory.batches == []
+            assert log_writer.pending == 3
+
+            # 達到批次大小時喚醒 writer
+            await _log(log_writer, "msg 3")
+            for _ in range(5):
+                await asyncio.sleep(0)
+            assert [len(batch) for batch in factory.batches] == [4]
+
+            await _log(log_writer, "msg 4")
+            await log_writer.stop_writer()
+
+        # 關閉時寫入剩餘日誌
+        assert [len(batch) for batch in factory.batches] == [4, 1]
+        assert factory.commits == 2
+        assert log_writer.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_retried(self, writer):
+        """測試：寫入失敗的日誌留在緩衝，下次寫入重試"""
+        log_writer, factory = writer
+        factory.fail = True
+
+        await _log(log_writer)
+        assert log_writer.pending == 1
+
+        factory.fail = False
+        assert await log_writer.flush() == 1
+        assert log_writer.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_buffer_limit_drops_oldest(self, writer):
+        """測試：緩衝超過上限時丟棄最舊的日誌"""
+        log_writer, factory = writer
+        factory.fail = True
+
+        with patch.object(settings, "MODERATION_LOG_MAX_BUFFER", 2):
+            for i in range(3):
+                await _log(log_writer, f"msg {i}")
+
+        assert log_writer.pending == 2
+        assert log_writer.dropped_total == 1
+        assert [row["original_content"] for row in log_writer._buffer] == ["msg 1", "msg 2"]
@@ -0,0 +1,254 @@
+"""敏感詞重新掃描測試"""
+import json
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.match import Match, Message
+from app.models.moderation import ModerationLog, ModerationRescanJob, SensitiveWord
+from app.models.profile import Profile
+from app.core.config import settings
+from app.models.user import User
+from app.services.moderation_rescan import (
+    RESCAN_MESSAGES,
+    RESCAN_PROFILES,
+    job_progress,
+    moderation_rescan,
+    scan_records,
+)
+
+
+def _word(word: str, action: str = "REJECT") -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "word": word,
+        "category": "SCAM",
+        "severity": "HIGH",
+        "action": action,
+        "is_regex": False,
+        "description": None,
+    }
+
+
+class TestScanRecords:
+    """行程池掃描函式測試"""
+
+    def test_only_flagged_records_returned(self):
+        """測試：只回傳違規記錄，內容經過正規化比對"""
+        words = [_word("詐騙")]
+        records = [
+            [("訊息", "你好")],
+            [("訊息", "这是诈 骗")],
+            [("顯示名稱", "小明"), ("個人簡介", "專業詐騙")],
+        ]
+
+        flagged = scan_records("k1", words, records)
+
+        assert [index for index, _ in flagged] == [1, 2]
+        assert flagged[0][1]["content"] == "这是诈 骗"
+        assert flagged[0][1]["action_taken"] == "REJECT"
+        assert flagged[1][1]["content"] == "[個人簡介] 專業詐騙"
+        assert flagged[1][1]["violations"] == ["個人簡介 - SCAM: 詐騙"]
+
+    def test_suspicious_patterns_not_rescanned(self):
+        """測試：回溯掃描不重複檢查可疑模式"""
+        assert scan_records("k2", [_word("詐騙")], [[("訊息", "加我 line: abc123")]]) == []
+
+    def test_matcher_rebuilt_when_key_changes(self):
+        """測試：識別碼改變時重新編譯比對器"""
+        assert scan_records("k3", [_word("詐騙")], [[("訊息", "賭博")]]) == []
+        assert len(scan_records("k4", [_word("賭博")], [[("訊息", "賭博")]])) == 1
+
+
+@pytest_asyncio.fixture
+async def chat(test_db: AsyncSession):
+    """建立兩位用戶、個人檔案與配對"""
+    users = []
+    for name in ("alice", "bob"):
+        user = User(
+            id=uuid.uuid4(),
+            email=f"{name}@example.com",
+            password_hash="dummy_hash",
+            date_of_birth=date(1990, 1, 1),
+            is_active=True,
+        )
+        test_db.add(user)
+        users.append(user)
+    await test_db.flush()
+
+    test_db.add(Profile(user_id=users[0].id, display_name="Alice", gender="female", bio="專業詐騙"))
+    test_db.add(Profile(user_id=users[1].id, display_name="Bob", gender="male", bio="喜歡旅遊"))
+
+    user1_id, user2_id = sorted(user.id for user in users)
+    match = Match(user1_id=user1_id, user2_id=user2_id, status="ACTIVE")
+    test_db.add(match)
+    await test_db.commit()
+    return users, match
+
+
+async def _add_word(test_db: AsyncSession, word: str) -> SensitiveWord:
+    sensitive_word = SensitiveWord(word=word, category="SCAM", severity="HIGH", action="REJECT")
+    test_db.add(sensitive_word)
+    await test_db.commit()
+    return sensitive_word
+
+
+@pytest.mark.asyncio
+class TestRescanJobs:
+    """重新掃描工作測試"""
+
+    async def test_new_word_flags_existing_content(self, test_db: AsyncSession, chat):
+        """測試：新增敏感詞後，既有個人檔案與近期訊息被回溯記錄"""
+        (alice, bob), match = chat
+        now = datetime.now(timezone.utc)
+        test_db.add(Message(
+            match_id=match.id, sender_id=bob.id, content="匯款給我就不是詐騙", sent_at=now
+        ))
+        test_db.add(Message(match_id=match.id, sender_id=alice.id, content="晚安", sent_at=now))
+        # 超出回溯範圍的訊息不掃描
+        test_db.add(Message(
+            match_id=match.id, sender_id=bob.id, content="舊的詐騙", sent_at=now - timedelta(days=400)
+        ))
+        word = await _add_word(test_db, "詐騙")
+
+        await moderation_rescan.enqueue(test_db, word_ids=[word.id])
+        await test_db.commit()
+
+        assert await moderation_rescan.process_next_job() is True
+        assert await moderation_rescan.process_next_job() is True
+        assert await moderation_rescan.process_next_job() is False
+
+        logs = (await test_db.execute(select(ModerationLog))).scalars().all()
+        assert sorted((log.content_type, log.user_id) for log in logs) == sorted([
+            ("PROFILE", alice.id), ("MESSAGE", bob.id)
+        ])
+
+        jobs = (await test_db.execute(select(ModerationRescanJob))).scalars().all()
+        assert {job.status for job in jobs} == {"COMPLETED"}
+        assert {job.target: job.flagged_count for job in jobs} == {
+            RESCAN_PROFILES: 1, RESCAN_MESSAGES: 1
+        }
+
+    async def test_pending_jobs_merge_word_ids(self, test_db: AsyncSession, chat):
+        """測試：待處理的工作合併新增的敏感詞，不重複建立"""
+        first = await _add_word(test_db, "詐騙")
+        second = await _add_word(test_db, "賭博")
+
+        await moderation_rescan.enqueue(test_db, word_ids=[first.id], targets=[RESCAN_PROFILES])
+        await test_db.commit()
+        await moderation_rescan.enqueue(test_db, word_ids=[second.id], targets=[RESCAN_PROFILES])
+        await test_db.commit()
+
+        jobs = (await test_db.execute(select(ModerationRescanJob))).scalars().all()
+        assert len(jobs) == 1
+        assert json.loads(jobs[0].word_ids) == [str(first.id), str(second.id)]
+
+    async def test_merged_word_scans_messages_sent_after_job_created(
+        self, test_db: AsyncSession, chat
+    ):
+        """測試：併入待處理工作的新詞也掃描工作建立後、新詞加入前發送的訊息"""
+        (_, bob), match = chat
+        first = await _add_word(test_db, "詐騙")
+        await moderation_rescan.enqueue(test_db, word_ids=[first.id], targets=[RESCAN_MESSAGES])
+        await test_db.commit()
+
+        # 發送時「賭博」尚不是敏感詞
+        test_db.add(Message(
+            match_id=match.id, sender_id=bob.id, content="一起去賭博",
+            sent_at=datetime.now(timezone.utc),
+        ))
+        await test_db.commit()
+
+        second = await _add_word(test_db, "賭博")
+        await moderation_rescan.enqueue(test_db, word_ids=[second.id], targets=[RESCAN_MESSAGES])
+        await test_db.commit()
+
+        assert await moderation_rescan.process_next_job() is True
+        assert await moderation_rescan.process_next_job() is False
+
+        logs = (await test_db.execute(select(ModerationLog))).scalars().all()
+        assert [(log.content_type, log.user_id) for log in logs] == [("MESSAGE", bob.id)]
+
+    async def test_resumes_from_cursor(self, test_db: AsyncSession, chat):
+        """測試：每段提交游標，租約過期後從游標續跑"""
+        word = await _add_word(test_db, "詐騙")
+        jobs = await moderation_rescan.enqueue(
+            test_db, word_ids=[word.id], targets=[RESCAN_PROFILES]
+        )
+        await test_db.commit()
+        job_id = jobs[0].id
+
+        # 模擬只處理一段後中斷
+        claimed = await moderation_rescan._claim_job(test_db)
+        words = await moderation_rescan._load_words(test_db, claimed)
+        assert await moderation_rescan._process_chunk(
+            claimed, words, "resume", chunk_size=1
+        ) is False
+
+        await test_db.refresh(jobs[0])
+        assert jobs[0].scanned_count == 1
+        assert jobs[0].cursor_id is not None
+
+        # 租約過期後重新領取，從游標處理剩下的個人檔案
+        jobs[0].lease_expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        await test_db.commit()
+        assert await moderation_rescan.process_next_job(chunk_size=1) is True
+
+        await test_db.refresh(jobs[0])
+        assert jobs[0].id == job_id
+        assert jobs[0].status == "COMPLETED"
+        assert jobs[0].scanned_count == 2
+        assert jobs[0].flagged_count == 1
+
+    async def test_cancelled_job_stops(self, test_db: AsyncSession, chat):
+        """測試：取消後不再提交新的一段"""
+        word = await _add_word(test_db, "詐騙")
+        jobs = await moderation_rescan.enqueue(
+            test_db, word_ids=[word.id], targets=[RESCAN_PROFILES]
+        )
+        await test_db.commit()
+
+        claimed = await moderation_rescan._claim_job(test_db)
+        words = await moderation_rescan._load_words(test_db, claimed)
+        assert await moderation_rescan.cancel(test_db, jobs[0].id) is True
+
+        assert await moderation_rescan._process_chunk(
+            claimed, words, "cancel", chunk_size=10
+        ) is None
+        logs = (await test_db.execute(select(ModerationLog))).scalars().all()
+        assert logs == []
+
+    async def test_failing_job_marked_failed_after_max_attempts(
+        self, test_db: AsyncSession, chat
+    ):
+        """測試：每次失敗累計次數，達上限後改為 FAILED 且不再領取"""
+        word = await _add_word(test_db, "詐騙")
+        jobs = await moderation_rescan.enqueue(
+            test_db, word_ids=[word.id], targets=[RESCAN_PROFILES]
+        )
+        await test_db.commit()
+
+        with patch.object(settings, "MODERATION_RESCAN_MAX_ATTEMPTS", 2), \
+                patch.object(moderation_rescan, "_process_chunk", side_effect=RuntimeError("boom")):
+            with pytest.raises(RuntimeError):
+                await moderation_rescan.process_next_job()
+            await test_db.refresh(jobs[0])
+            assert jobs[0].status == "RUNNING"
+            assert jobs[0].attempts == 1
+
+            # 失敗時租約立即到期，下一次領取重試
+            with pytest.raises(RuntimeError):
+                await moderation_rescan.process_next_job()
+            assert await moderation_rescan.process_next_job() is False
+
+        await test_db.refresh(jobs[0])
+        progress = job_progress(jobs[0])
+        assert progress["status"] == "FAILED"
+        assert progress["attempts"] == 2
+        assert progress["error"] == "boom"
+        assert progress["finished_at"] is not None
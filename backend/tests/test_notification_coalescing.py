@@ -0,0 +1,212 @@
+"""通知合併（Coalescing）測試
+
+測試範圍：
+1. 儲存合併：窗口內同類未讀通知合併為一筆
+2. 推送節流：同一分組間隔內只即時推送一次，間隔結束補推最新結果
+"""
+import asyncio
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.notification import Notification
+from app.models.user import User
+from app.services.notification_service import (
+    NotificationService,
+    GROUP_KEY_LIKED,
+    message_group_key,
+)
+from app.websocket.manager import manager
+
+
+@pytest_asyncio.fixture
+async def receiver(test_db: AsyncSession):
+    """建立接收通知的用戶"""
+    user = User(
+        id=uuid.uuid4(),
+        email="popular@example.com",
+        password_hash="dummy_hash",
+        date_of_birth=date(1995, 1, 1),
+        is_active=True,
+    )
+    test_db.add(user)
+    await test_db.commit()
+    return user
+
+
+@pytest_asyncio.fixture
+async def reset_push_state():
+    """重設推送節流狀態"""
+    await NotificationService.shutdown()
+    yield
+    await NotificationService.shutdown()
+
+
+class TestLikedCoalescing:
+    """「有人喜歡你」通知合併"""
+
+    @pytest.mark.asyncio
+    async def test_likes_within_window_coalesce(self, test_db: AsyncSession, receiver):
+        """測試：窗口內多次 Like 只產生一筆通知"""
+        for _ in range(12):
+            notification = await NotificationService.record_liked(test_db, receiver.id)
+
+        assert notification.group_count == 12
+        assert notification.title == "12 人喜歡你！"
+        assert notification.updated_at is not None
+
+        count = await test_db.scalar(
+            select(func.count()).where(Notification.user_id == receiver.id)
+        )
+        assert count == 1
+
+    @pytest.mark.asyncio
+    async def test_read_notification_not_coalesced(self, test_db: AsyncSession, receiver):
+        """測試：已讀通知不再合併"""
+        first = await NotificationService.record_liked(test_db, receiver.id)
+        first.is_read = True
+        await test_db.commit()
+
+        second = await NotificationService.record_liked(test_db, receiver.id)
+
+        assert second.id != first.id
+        assert second.group_count == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_window_not_coalesced(self, test_db: AsyncSession, receiver):
+        """測試：超過合併窗口的通知不再合併"""
+        old = Notification(
+            user_id=receiver.id,
+            type="notification_liked",
+            title="有人喜歡你！",
+            group_key=GROUP_KEY_LIKED,
+            created_at=datetime.now(timezone.utc) - timedelta(
+                seconds=settings.NOTIFICATION_COALESCE_WINDOW_SECONDS + 60
+            )
+        )
+        test_db.add(old)
+        await test_db.commit()
+
+        notification = await NotificationService.record_liked(test_db, receiver.id)
+
+        assert notification.id != old.id
+        assert notification.group_count == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_likes_create_single_notification(
+        self, test_db: AsyncSession, receiver
+    ):
+        """測試：同一分組尚無通知時，並發的首次事件仍只產生一筆通知"""
+        sessions = [AsyncSession(bind=test_db.bind) for _ in range(2)]
+        try:
+            await asyncio.gather(*[
+                NotificationService.record_liked(session, receiver.id)
+                for session in sessions
+            ])
+        finally:
+            for session in sessions:
+                await session.close()
+
+        result = await test_db.execute(
+            select(Notification).where(Notification.user_id == receiver.id)
+        )
+        notifications = result.scalars().all()
+        assert len(notifications) == 1
+        assert notifications[0].group_count == 2
+
+
+class TestMessageCoalescing:
+    """新訊息通知合併（依配對分組）"""
+
+    @pytest.mark.asyncio
+    async def test_messages_coalesce_per_match(self, test_db: AsyncSession, receiver):
+        """測試：同一配對的未讀訊息通知合併，不同配對分開"""
+        match_a, match_b = uuid.uuid4(), uuid.uuid4()
+        sender_id = uuid.uuid4()
+
+        for i in range(3):
+            notification_a = await NotificationService.record_message(
+                test_db, receiver.id, match_a, sender_id, "Bob", f"訊息 {i}", uuid.uuid4()
+            )
+        notification_b = await NotificationService.record_message(
+            test_db, receiver.id, match_b, sender_id, "Bob", "另一個配對", uuid.uuid4()
+        )
+
+        assert notification_a.group_count == 3
+        assert notification_a.content == "訊息 2"
+        assert notification_a.group_key == message_group_key(match_a)
+        assert notification_b.id != notification_a.id
+        assert notification_b.group_count == 1
+
+    @pytest.mark.asyncio
+    async def test_list_returns_grouped_items(self, client, test_db: AsyncSession, auth_user: dict):
+        """測試：通知列表回傳合併後的項目與 group_count"""
+        user = await test_db.scalar(select(User).where(User.email == auth_user["email"]))
+        for _ in range(5):
+            await NotificationService.record_liked(test_db, user.id)
+
+        response = await client.get("/api/notifications", headers=auth_user["headers"])
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["notifications"]) == 1
+        assert data["notifications"][0]["group_count"] == 5
+
+
+class TestPushThrottle:
+    """WebSocket 推送節流"""
+
+    @pytest.mark.asyncio
+    async def test_first_push_is_immediate(self, reset_push_state):
+        """測試：分組第一次推送立即送出"""
+        with patch.object(manager, "send_personal_message", new_callable=AsyncMock) as mock_send:
+            pushed = await NotificationService.push_coalesced(
+                "user-1", GROUP_KEY_LIKED, {"type": "notification_liked", "group_count": 1}
+            )
+
+        assert pushed is True
+        mock_send.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_burst_is_coalesced_into_trailing_push(self, reset_push_state):
+        """測試：間隔內的連續推送合併為一次補推（帶最新 payload）"""
+        with patch.object(settings, "NOTIFICATION_PUSH_INTERVAL_SECONDS", 0.05), \
+                patch.object(manager, "send_personal_message", new_callable=AsyncMock) as mock_send:
+            for count in range(1, 11):
+                await NotificationService.push_coalesced(
+                    "user-1", GROUP_KEY_LIKED, {"type": "notification_liked", "group_count": count}
+                )
+            assert mock_send.await_count == 1
+
+            await asyncio.sleep(0.1)
+
+        assert mock_send.await_count == 2
+        trailing_payload = mock_send.await_args_list[-1].args[1]
+        assert trailing_payload["group_count"] == 10
+
+    @pytest.mark.asyncio
+    async def test_groups_are_throttled_independently(self, reset_push_state):
+        """測試：不同用戶的分組互不影響"""
+        with patch.object(manager, "send_personal_message", new_callable=AsyncMock) as mock_send:
+            await NotificationService.push_coalesced("user-1", GROUP_KEY_LIKED, {"n": 1})
+            await NotificationService.push_coalesced("user-2", GROUP_KEY_LIKED, {"n": 1})
+
+        assert mock_send.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_shutdown_cancels_pending_push(self, reset_push_state):
+        """測試：關閉時取消尚未補推的任務"""
+        with patch.object(manager, "send_personal_message", new_callable=AsyncMock) as mock_send:
+            await NotificationService.push_coalesced("user-1", GROUP_KEY_LIKED, {"n": 1})
+            await NotificationService.push_coalesced("user-1", GROUP_KEY_LIKED, {"n": 2})
+
+            await NotificationService.shutdown()
+            await asyncio.sleep(0)
+
+        assert mock_send.await_count == 1
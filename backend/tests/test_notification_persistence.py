@@ -353,6 +353,60 @@ class TestNotificationAPI:
         data = response.json()
         assert len(data["notifications"]) == 2
 
+    @pytest.mark.asyncio
+    async def test_get_notifications_cursor_pagination(
+        self,
+        client: AsyncClient,
+        test_db: AsyncSession,
+        test_user_with_token
+    ):
+        """測試：通知列表 cursor 分頁（不重複、不遺漏、不計算 total）"""
+        user = test_user_with_token["user"]
+        headers = {"Authorization": f"Bearer {test_user_with_token['token']}"}
+
+        # 建立 5 個通知
+        for i in range(5):
+            test_db.add(Notification(
+                user_id=user.id,
+                type="notification_liked",
+                title=f"通知 {i}"
+            ))
+        await test_db.commit()
+
+        seen_ids = []
+        cursor = None
+        while True:
+            params = {"limit": 2, "include_total": "false"}
+            if cursor:
+                params["cursor"] = cursor
+            response = await client.get("/api/notifications", params=params, headers=headers)
+
+            assert response.status_code == 200
+            data = response.json()
+            assert data["total"] is None
+            assert data["unread_count"] is None
+            seen_ids.extend(n["id"] for n in data["notifications"])
+
+            if not data["has_more"]:
+                assert data["next_cursor"] is None
+                break
+            cursor = data["next_cursor"]
+
+        assert len(seen_ids) == 5
+        assert len(set(seen_ids)) == 5
+
+    @pytest.mark.asyncio
+    async def test_get_notifications_invalid_cursor(
+        self, client: AsyncClient, test_user_with_token
+    ):
+        """測試：無效的游標回傳 400"""
+        response = await client.get(
+            "/api/notifications?cursor=not-a-cursor",
+            headers={"Authorization": f"Bearer {test_user_with_token['token']}"}
+        )
+
+        assert response.status_code == 400
+
     @pytest.mark.asyncio
     async def test_get_notifications_unread_only(
         self,
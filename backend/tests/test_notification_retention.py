@@ -0,0 +1,93 @@
+"""通知保留期限測試
+
+測試 NotificationRetention 批次清除過期已讀通知。
+"""
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.notification import Notification
+from app.models.user import User
+from app.services.notification_retention import notification_retention
+
+
+@pytest_asyncio.fixture
+async def test_user(test_db: AsyncSession):
+    """建立測試用戶"""
+    user = User(
+        id=uuid.uuid4(),
+        email="retention@example.com",
+        password_hash="dummy_hash",
+        date_of_birth=date(1995, 1, 1),
+        is_active=True,
+    )
+    test_db.add(user)
+    await test_db.commit()
+    return user
+
+
+def _notification(user_id: uuid.UUID, days_ago: int, is_read: bool) -> Notification:
+    """建立指定天數前的通知"""
+    return Notification(
+        user_id=user_id,
+        type="notification_liked",
+        title="有人喜歡你！",
+        is_read=is_read,
+        created_at=datetime.now(timezone.utc) - timedelta(days=days_ago)
+    )
+
+
+async def _count(db: AsyncSession, user_id: uuid.UUID) -> int:
+    return await db.scalar(
+        select(func.count()).where(Notification.user_id == user_id)
+    )
+
+
+class TestNotificationRetention:
+    """過期已讀通知清除"""
+
+    @pytest.mark.asyncio
+    async def test_purges_only_expired_read_notifications(self, test_db: AsyncSession, test_user):
+        """測試：只刪除過期的已讀通知，保留近期與未讀通知"""
+        expired_read = _notification(test_user.id, days_ago=100, is_read=True)
+        expired_unread = _notification(test_user.id, days_ago=100, is_read=False)
+        recent_read = _notification(test_user.id, days_ago=1, is_read=True)
+        test_db.add_all([expired_read, expired_unread, recent_read])
+        await test_db.commit()
+
+        deleted = await notification_retention.purge_expired(retention_days=90)
+
+        assert deleted == 1
+        result = await test_db.execute(
+            select(Notification.id).where(Notification.user_id == test_user.id)
+        )
+        remaining = set(result.scalars().all())
+        assert remaining == {expired_unread.id, recent_read.id}
+
+    @pytest.mark.asyncio
+    async def test_purges_in_batches(self, test_db: AsyncSession, test_user):
+        """測試：超過一批的資料會分多批全部刪除"""
+        test_db.add_all([
+            _notification(test_user.id, days_ago=200, is_read=True) for _ in range(7)
+        ])
+        await test_db.commit()
+
+        deleted = await notification_retention.purge_expired(retention_days=90, batch_size=3)
+
+        assert deleted == 7
+        assert await _count(test_db, test_user.id) == 0
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_purge(self, test_db: AsyncSession, test_user):
+        """測試：沒有過期資料時回傳 0"""
+        test_db.add(_notification(test_user.id, days_ago=1, is_read=True))
+        await test_db.commit()
+
+        deleted = await notification_retention.purge_expired(retention_days=90)
+
+        assert deleted == 0
+        assert await _count(test_db, test_user.id) == 1
@@ -0,0 +1,112 @@
+"""照片感知雜湊與 BK-tree 測試"""
+import io
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from app.services.file_storage import InvalidImageError
+from app.services.photo_hashing import (
+    BKTree,
+    compute_perceptual_hash,
+    hamming_distance,
+    to_signed,
+    to_unsigned,
+)
+
+
+def make_image(seed: int, size=(800, 600)) -> Image.Image:
+    """產生有結構的測試圖片（純色或雜訊圖片無法代表真實照片）"""
+    rng = random.Random(seed)
+    img = Image.new("RGB", size, color=(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x0, y0 = rng.randrange(size[0]), rng.randrange(size[1])
+        x1, y1 = x0 + rng.randrange(50, 400), y0 + rng.randrange(50, 300)
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        draw.ellipse((x0, y0, x1, y1), fill=color)
+    return img
+
+
+def encode(img: Image.Image, fmt: str = "JPEG", **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt, **kwargs)
+    return buffer.getvalue()
+
+
+class TestPerceptualHash:
+    """pHash 測試"""
+
+    def test_same_image_same_hash(self):
+        """測試：相同內容雜湊相同"""
+        content = encode(make_image(1))
+        assert compute_perceptual_hash(content) == compute_perceptual_hash(content)
+
+    def test_resized_and_recompressed_image_is_near(self):
+        """測試：縮放、重新壓縮、轉檔後仍近似"""
+        img = make_image(2)
+        original = compute_perceptual_hash(encode(img, quality=95))
+
+        variants = [
+            encode(img.resize((400, 300)), quality=60),
+            encode(img.resize((1600, 1200))),
+            encode(img, "PNG"),
+            encode(img.point(lambda v: min(255, v + 10)), quality=80),  # 輕微調亮
+        ]
+        for content in variants:
+            assert hamming_distance(original, compute_perceptual_hash(content)) <= 6
+
+    def test_different_images_are_far(self):
+        """測試：不同圖片距離大"""
+        hashes = [compute_perceptual_hash(encode(make_image(seed))) for seed in range(10, 20)]
+        for i, a in enumerate(hashes):
+            for b in hashes[i + 1:]:
+                assert hamming_distance(a, b) > 10
+
+    def test_rejects_invalid_image(self):
+        """測試：無效圖片拋出 InvalidImageError"""
+        with pytest.raises(InvalidImageError):
+            compute_perceptual_hash(b"not an image")
+
+    def test_signed_roundtrip(self):
+        """測試：有號 / 無號轉換可逆且落在 BIGINT 範圍"""
+        for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1):
+            signed = to_signed(value)
+            assert -(1 << 63) <= signed < (1 << 63)
+            assert to_unsigned(signed) == value
+
+
+class TestBKTree:
+    """BK-tree 測試"""
+
+    def test_search_matches_brute_force(self):
+        """測試：查詢結果與逐一比對一致"""
+        rng = random.Random(42)
+        values = [rng.getrandbits(64) for _ in range(500)]
+        # 加入近似值，確保有命中
+        values += [values[0] ^ (1 << bit) for bit in range(5)]
+
+        tree = BKTree()
+        for index, value in enumerate(values):
+            tree.add(value, index)
+
+        for query in values[:20] + [rng.getrandbits(64) for _ in range(20)]:
+            expected = sorted(
+                (hamming_distance(query, value), index)
+                for index, value in enumerate(values)
+                if hamming_distance(query, value) <= 8
+            )
+            assert sorted(tree.search(query, 8)) == expected
+
+    def test_duplicate_hashes_share_node(self):
+        """測試：相同雜湊的多個項目皆可查到"""
+        tree = BKTree()
+        tree.add(123, "a")
+        tree.add(123, "b")
+
+        assert len(tree) == 2
+        assert sorted(item for _, item in tree.search(123, 0)) == ["a", "b"]
+
+    def test_empty_tree(self):
+        """測試：空樹查詢回傳空列表"""
+        assert BKTree().search(0, 64) == []
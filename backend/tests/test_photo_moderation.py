@@ -1,16 +1,27 @@
 """照片審核功能測試"""
 import io
+import shutil
+import tempfile
 import uuid
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 import pytest_asyncio
-from PIL import Image
+from PIL import Image, ImageDraw
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.models.moderation import ModerationLog, PhotoModerationJob
 from app.models.profile import Photo, Profile
 from app.models.user import User
-from app.services.photo_moderation import PhotoModerationService
+from app.services.file_storage import FileStorageService
+from app.services.photo_hashing import compute_perceptual_hash, photo_hash_index, to_signed
+from app.services.photo_moderation import PhotoModerationService, PhotoReviewConflictError
+from app.services.photo_moderation_queue import photo_moderation_queue
+from app.services.storage_backends import LocalStorageBackend
 
 
 # ========== Fixtures ==========
@@ -375,3 +386,394 @@ class TestPhotoModel:
 
         assert photo.auto_moderation_score == 85
         assert photo.auto_moderation_labels == '["safe", "portrait"]'
+
+
+# ========== 自動審核（pHash 比對）==========
+
+
+@pytest.fixture
+def structured_image_bytes():
+    """產生有結構的 JPEG 圖片（純色圖片的 pHash 不具代表性）"""
+    img = Image.new('RGB', (800, 600), color=(30, 60, 90))
+    draw = ImageDraw.Draw(img)
+    draw.ellipse((100, 80, 500, 420), fill=(220, 180, 40))
+    draw.rectangle((450, 300, 760, 560), fill=(20, 200, 120))
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+async def _create_photo(db: AsyncSession, profile: Profile, **kwargs) -> Photo:
+    photo = Photo(
+        profile_id=profile.id,
+        url=f"/uploads/photos/test/{uuid.uuid4()}.jpg",
+        moderation_status="PENDING",
+        **kwargs
+    )
+    db.add(photo)
+    await db.commit()
+    await db.refresh(photo)
+    return photo
+
+
+@pytest.mark.asyncio
+class TestAutoModeration:
+    """自動審核測試"""
+
+    async def test_no_match_stays_pending(
+        self, test_db: AsyncSession, pending_photo: Photo, structured_image_bytes
+    ):
+        """測試：無相符照片時不標記，並記錄 pHash"""
+        should_approve, score, labels = await PhotoModerationService.auto_moderate(
+            pending_photo.id, structured_image_bytes, test_db
+        )
+        await PhotoModerationService.process_auto_moderation_result(
+            test_db, pending_photo.id, score, labels
+        )
+
+        assert (should_approve, score, labels) == (False, 0, [])
+        await test_db.refresh(pending_photo)
+        assert pending_photo.moderation_status == "PENDING"
+        assert pending_photo.perceptual_hash is not None
+
+    async def test_reupload_of_rejected_photo_is_auto_rejected(
+        self, test_db: AsyncSession, test_profile: Profile, pending_photo: Photo,
+        admin_user: User, structured_image_bytes
+    ):
+        """測試：重新上傳已拒絕的照片會被自動拒絕（即使原照片已刪除）"""
+        await PhotoModerationService.auto_moderate(
+            pending_photo.id, structured_image_bytes, test_db
+        )
+        await test_db.commit()
+        await PhotoModerationService.review_photo(
+            db=test_db,
+            photo_id=pending_photo.id,
+            admin_id=admin_user.id,
+            status="REJECTED",
+            rejection_reason="包含不當內容"
+        )
+        await test_db.delete(pending_photo)
+        await test_db.commit()
+
+        new_photo = await _create_photo(test_db, test_profile)
+        _, score, labels = await PhotoModerationService.auto_moderate(
+            new_photo.id, structured_image_bytes, test_db
+        )
+        await PhotoModerationService.process_auto_moderation_result(
+            test_db, new_photo.id, score, labels
+        )
+
+        assert score == 100
+        assert labels == ["DUPLICATE_OF_REJECTED"]
+        await test_db.refresh(new_photo)
+        assert new_photo.moderation_status == "REJECTED"
+        assert new_photo.rejection_reason == PhotoModerationService.AUTO_REJECTION_REASON
+
+        photos, _ = await PhotoModerationService.get_pending_photos(db=test_db)
+        assert not any(p["id"] == str(new_photo.id) for p in photos)
+
+    async def test_banned_user_photo_is_flagged(
+        self, test_db: AsyncSession, test_profile: Profile, structured_image_bytes
+    ):
+        """測試：與被封禁帳號的照片近似時標記"""
+        banned_user = User(
+            email="banned_photo@example.com",
+            password_hash="$2b$12$dummy_hash_for_testing",
+            date_of_birth=date(1990, 1, 1),
+            is_active=False,
+            ban_reason="詐騙",
+        )
+        test_db.add(banned_user)
+        await test_db.commit()
+        banned_profile = Profile(user_id=banned_user.id, display_name="封禁用戶", gender="male")
+        test_db.add(banned_profile)
+        await test_db.commit()
+        await _create_photo(
+            test_db, banned_profile,
+            perceptual_hash=to_signed(compute_perceptual_hash(structured_image_bytes)),
+        )
+        photo_hash_index.invalidate()
+
+        new_photo = await _create_photo(test_db, test_profile)
+        _, score, labels = await PhotoModerationService.auto_moderate(
+            new_photo.id, structured_image_bytes, test_db
+        )
+
+        assert score == 100
+        assert labels == ["BANNED_USER_PHOTO"]
+
+    async def test_flagged_below_threshold_stays_pending(
+        self, test_db: AsyncSession, pending_photo: Photo
+    ):
+        """測試：相似度未達自動拒絕門檻時只標記，留待人工審核"""
+        with patch.object(settings, "PHOTO_AUTO_REJECT_SCORE", 95):
+            await PhotoModerationService.process_auto_moderation_result(
+                test_db, pending_photo.id, 90, ["DUPLICATE_OF_REJECTED"]
+            )
+
+        await test_db.refresh(pending_photo)
+        assert pending_photo.moderation_status == "PENDING"
+        assert pending_photo.auto_moderation_score == 90
+        assert pending_photo.auto_moderation_labels == '["DUPLICATE_OF_REJECTED"]'
+
+
+# ========== 自動審核佇列 ==========
+
+
+@pytest.fixture
+def queue_storage():
+    """以臨時目錄作為自動審核 worker 讀取照片的儲存後端"""
+    temp_dir = tempfile.mkdtemp()
+    service = FileStorageService(backend=LocalStorageBackend(temp_dir))
+    with patch("app.services.photo_moderation_queue.file_storage", service):
+        yield Path(temp_dir)
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+async def _enqueue_photo(
+    db: AsyncSession, profile: Profile, root: Path, content: bytes = None
+) -> Photo:
+    """建立照片並排入佇列；content 為 None 時不寫入檔案"""
+    photo = Photo(profile_id=profile.id, url="", moderation_status="PENDING")
+    db.add(photo)
+    await db.flush()
+    photo.url = f"/uploads/photos/test/{photo.id}.jpg"
+    photo_moderation_queue.enqueue(db, photo.id)
+    await db.commit()
+
+    if content is not None:
+        path = root / "photos" / "test" / f"{photo.id}.jpg"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    return photo
+
+
+@pytest.mark.asyncio
+class TestAutoModerationQueue:
+    """自動審核佇列測試"""
+
+    async def test_process_batch_moderates_and_dequeues(
+        self, test_db: AsyncSession, test_profile: Profile, queue_storage,
+        structured_image_bytes, sample_image_bytes
+    ):
+        """測試：worker 批次自動審核並移出佇列，指標反映處理結果"""
+        photo_hash_index.add(
+            compute_perceptual_hash(structured_image_bytes), "DUPLICATE_OF_REJECTED", None
+        )
+        duplicate = await _enqueue_photo(
+            test_db, test_profile, queue_storage, structured_image_bytes
+        )
+        unique = await _enqueue_photo(test_db, test_profile, queue_storage, sample_image_bytes)
+        processed_before = photo_moderation_queue.processed_total
+
+        metrics = await photo_moderation_queue.get_metrics(test_db)
+        assert metrics["queue_depth"] == 2
+        assert metrics["oldest_job_age_seconds"] is not None
+
+        assert await photo_moderation_queue.process_batch() == 2
+        assert await photo_moderation_queue.process_batch() == 0
+
+        await test_db.refresh(duplicate)
+        await test_db.refresh(unique)
+        assert duplicate.moderation_status == "REJECTED"
+        assert unique.moderation_status == "PENDING"
+        assert unique.perceptual_hash is not None
+
+        metrics = await photo_moderation_queue.get_metrics(test_db)
+        assert metrics["queue_depth"] == 0
+        assert photo_moderation_queue.processed_total == processed_before + 2
+        assert metrics["latency_p50_ms"] is not None
+
+    async def test_index_reload_during_batch(
+        self, test_db: AsyncSession, test_profile: Profile, queue_storage,
+        structured_image_bytes, sample_image_bytes
+    ):
+        """測試：比對索引在批次中過期重建（查詢資料庫）時，同一批照片仍可正常處理"""
+        photos = [
+            await _enqueue_photo(test_db, test_profile, queue_storage, content)
+            for content in (structured_image_bytes, sample_image_bytes)
+        ]
+
+        # TTL 為 0：每次比對都從資料庫重建索引
+        with patch.object(settings, "PHOTO_HASH_INDEX_TTL_SECONDS", 0):
+            assert await photo_moderation_queue.process_batch() == 2
+
+        for photo in photos:
+            await test_db.refresh(photo)
+            assert photo.perceptual_hash is not None
+            assert photo.auto_moderation_score == 0
+
+    async def test_read_failure_is_retried_after_lease(
+        self, test_db: AsyncSession, test_profile: Profile, queue_storage, sample_image_bytes
+    ):
+        """測試：讀不到檔案的照片留在佇列中，租約到期前不重新領取，之後重試成功"""
+        photo = await _enqueue_photo(test_db, test_profile, queue_storage)
+        failed_before = photo_moderation_queue.failed_total
+
+        assert await photo_moderation_queue.process_batch() == 1
+        assert photo_moderation_queue.failed_total == failed_before + 1
+        assert (await photo_moderation_queue.get_metrics(test_db))["queue_depth"] == 1
+        # 租約尚未到期
+        assert await photo_moderation_queue.process_batch() == 0
+
+        # 儲存恢復後，租約到期即重試
+        path = queue_storage / "photos" / "test" / f"{photo.id}.jpg"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(sample_image_bytes)
+        job = await test_db.get(PhotoModerationJob, photo.id)
+        assert job.attempts == 1
+        job.lease_expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        await test_db.commit()
+
+        assert await photo_moderation_queue.process_batch() == 1
+
+        await test_db.refresh(photo)
+        assert photo.perceptual_hash is not None
+        assert photo.auto_moderation_score == 0
+        assert (await photo_moderation_queue.get_metrics(test_db))["queue_depth"] == 0
+
+    async def test_read_failure_dropped_after_max_attempts(
+        self, test_db: AsyncSession, test_profile: Profile, queue_storage
+    ):
+        """測試：讀取失敗達重試上限後移出佇列，留待人工審核"""
+        photo = await _enqueue_photo(test_db, test_profile, queue_storage)
+
+        with patch.object(settings, "PHOTO_MODERATION_MAX_ATTEMPTS", 1):
+            assert await photo_moderation_queue.process_batch() == 1
+
+        await test_db.refresh(photo)
+        assert photo.moderation_status == "PENDING"
+        assert photo.auto_moderation_score is None
+        assert (await photo_moderation_queue.get_metrics(test_db))["queue_depth"] == 0
+
+
+# ========== 審核租約 ==========
+
+
+async def _create_admin(db: AsyncSession, email: str) -> User:
+    admin = User(
+        email=email,
+        password_hash="$2b$12$dummy_hash_for_testing",
+        date_of_birth=date(1990, 1, 1),
+        is_active=True,
+        is_admin=True,
+    )
+    db.add(admin)
+    await db.commit()
+    await db.refresh(admin)
+    return admin
+
+
+@pytest.mark.asyncio
+class TestReviewClaims:
+    """待審核照片領取（租約）測試"""
+
+    async def test_concurrent_reviewers_get_disjoint_photos(
+        self, test_db: AsyncSession, test_profile: Profile, admin_user: User
+    ):
+        """測試：兩位管理員領取的照片不重複，且依上傳時間排序"""
+        photos = [await _create_photo(test_db, test_profile) for _ in range(5)]
+        other_admin = await _create_admin(test_db, "admin2@example.com")
+
+        first, _, next_key = await PhotoModerationService.claim_pending_photos(
+            test_db, admin_user.id, limit=3
+        )
+        second, _, _ = await PhotoModerationService.claim_pending_photos(
+            test_db, other_admin.id, limit=3
+        )
+
+        expected = [str(p.id) for p in sorted(photos, key=lambda p: (p.created_at, p.id))]
+        assert [p["id"] for p in first] == expected[:3]
+        assert [p["id"] for p in second] == expected[3:]
+        assert next_key is not None
+
+        # 重新領取會續約自己的照片，而不是拿到別人的
+        again, _, _ = await PhotoModerationService.claim_pending_photos(
+            test_db, admin_user.id, limit=3
+        )
+        assert [p["id"] for p in again] == expected[:3]
+
+    async def test_cursor_skips_current_batch(
+        self, test_db: AsyncSession, test_profile: Profile, admin_user: User
+    ):
+        """測試：傳入游標領取下一批"""
+        for _ in range(4):
+            await _create_photo(test_db, test_profile)
+
+        first, _, next_key = await PhotoModerationService.claim_pending_photos(
+            test_db, admin_user.id, limit=2
+        )
+        second, _, _ = await PhotoModerationService.claim_pending_photos(
+            test_db, admin_user.id, limit=2, after=next_key
+        )
+
+        assert len(second) == 2
+        assert not {p["id"] for p in first} & {p["id"] for p in second}
+
+    async def test_expired_lease_and_release(
+        self, test_db: AsyncSession, test_profile: Profile, admin_user: User
+    ):
+        """測試：租約到期或釋放後其他管理員可領取；審核後清除租約"""
+        photo = await _create_photo(test_db, test_profile)
+        other_admin = await _create_admin(test_db, "admin2@example.com")
+
+        with patch.object(settings, "PHOTO_REVIEW_LEASE_SECONDS", -1):
+            await PhotoModerationService.claim_pending_photos(test_db, admin_user.id)
+        claimed, _, _ = await PhotoModerationService.claim_pending_photos(test_db, other_admin.id)
+        assert [p["id"] for p in claimed] == [str(photo.id)]
+
+        assert await PhotoModerationService.release_claims(test_db, other_admin.id) == 1
+        claimed, _, _ = await PhotoModerationService.claim_pending_photos(test_db, admin_user.id)
+        assert [p["id"] for p in claimed] == [str(photo.id)]
+
+        await PhotoModerationService.review_photo(
+            db=test_db, photo_id=photo.id, admin_id=admin_user.id, status="APPROVED"
+        )
+        await test_db.refresh(photo)
+        assert photo.review_claimed_by is None
+
+    async def test_review_of_photo_claimed_by_other_admin_conflicts(
+        self, test_db: AsyncSession, test_profile: Profile, admin_user: User
+    ):
+        """測試：其他管理員的租約未到期時不可審核，到期後可審核"""
+        photo = await _create_photo(test_db, test_profile)
+        other_admin = await _create_admin(test_db, "admin2@example.com")
+        await PhotoModerationService.claim_pending_photos(test_db, other_admin.id)
+
+        with pytest.raises(PhotoReviewConflictError):
+            await PhotoModerationService.review_photo(
+                db=test_db, photo_id=photo.id, admin_id=admin_user.id,
+                status="REJECTED", rejection_reason="包含不當內容"
+            )
+        await test_db.refresh(photo)
+        assert photo.moderation_status == "PENDING"
+        assert photo.review_claimed_by == other_admin.id
+
+        photo.review_claim_expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        await test_db.commit()
+        success, _ = await PhotoModerationService.review_photo(
+            db=test_db, photo_id=photo.id, admin_id=admin_user.id, status="APPROVED"
+        )
+        assert success is True
+
+    async def test_review_of_reviewed_photo_conflicts(
+        self, test_db: AsyncSession, pending_photo: Photo, admin_user: User
+    ):
+        """測試：已審核的照片不可再次審核，不重複記錄日誌與雜湊封鎖"""
+        await PhotoModerationService.review_photo(
+            db=test_db, photo_id=pending_photo.id, admin_id=admin_user.id,
+            status="REJECTED", rejection_reason="包含不當內容"
+        )
+        logs_before = await test_db.scalar(select(func.count()).select_from(ModerationLog))
+
+        with pytest.raises(PhotoReviewConflictError):
+            await PhotoModerationService.review_photo(
+                db=test_db, photo_id=pending_photo.id, admin_id=admin_user.id,
+                status="APPROVED"
+            )
+
+        await test_db.refresh(pending_photo)
+        assert pending_photo.moderation_status == "REJECTED"
+        assert await test_db.scalar(
+            select(func.count()).select_from(ModerationLog)
+        ) == logs_before
@@ -336,6 +336,21 @@ class TestReviewPhotoAPI:
 
         assert response.status_code == 400
 
+    async def test_review_reviewed_photo_conflicts(
+        self, client: AsyncClient, admin_token: str, pending_photo: Photo
+    ):
+        """測試：重複審核同一張照片回傳 409"""
+        url = f"/api/admin/photos/{pending_photo.id}/review"
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        response = await client.post(url, headers=headers, json={"status": "APPROVED"})
+        assert response.status_code == 200
+
+        response = await client.post(
+            url, headers=headers, json={"status": "REJECTED", "rejection_reason": "不當內容"}
+        )
+        assert response.status_code == 409
+
 
 @pytest.mark.asyncio
 class TestPhotoUploadWithModeration:
@@ -350,7 +365,8 @@ class TestPhotoUploadWithModeration:
             mock_save.return_value = (
                 str(uuid.uuid4()),
                 "/uploads/photos/test/new.jpg",
-                "/uploads/photos/test/new_thumb.jpg"
+                "/uploads/photos/test/new_thumb.jpg",
+                []
             )
 
             response = await client.post(
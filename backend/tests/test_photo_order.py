@@ -24,11 +24,12 @@ def create_test_image():
 def mock_file_storage():
     """Mock 檔案儲存服務"""
     with patch("app.api.profile.file_storage") as mock:
-        # save_photo 返回 (photo_id, photo_url, thumbnail_url)
+        # save_photo 返回 (photo_id, photo_url, thumbnail_url, variants)
         mock.save_photo = AsyncMock(return_value=(
             str(uuid.uuid4()),
             "/uploads/photos/test/test.jpg",
-            "/uploads/photos/test/test_thumb.jpg"
+            "/uploads/photos/test/test_thumb.jpg",
+            []
         ))
         mock.delete_photo = AsyncMock(return_value=True)
         yield mock
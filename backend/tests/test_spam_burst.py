@@ -0,0 +1,147 @@
+"""群發垃圾訊息偵測測試（MinHash 分段簽章、Redis 滑動窗口）"""
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core.config import settings
+from app.services.spam_burst import BAND_COUNT, SpamBurstDetector
+
+SCAM = "您好，我是投資顧問，最近有一個穩賺不賠的機會，加我私訊了解詳情喔"
+
+
+class _FakePipeline:
+    """只支援偵測器使用指令的假 pipeline"""
+
+    def __init__(self, redis):
+        self._redis = redis
+        self._commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+        return queue
+
+    async def execute(self):
+        results = []
+        for name, args, kwargs in self._commands:
+            results.append(await getattr(self._redis, name)(*args, **kwargs))
+        return results
+
+
+class _FakeRedis:
+    """記憶體內的 ZSET / SET 實作"""
+
+    def __init__(self):
+        self.zsets = {}
+        self.strings = {}
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        for member in [m for m, score in zset.items() if score <= high]:
+            del zset[member]
+
+    async def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    async def expire(self, key, seconds):
+        return True
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        return True
+
+
+class TestFingerprint:
+    """MinHash 分段簽章測試"""
+
+    def test_near_duplicates_share_bands(self):
+        """測試：略加改寫或規避寫法的內容仍有相同分段，不相關內容沒有"""
+        base = SpamBurstDetector.fingerprint(SCAM)
+        edited = SpamBurstDetector.fingerprint("您好，我是投資顧問，最近有個穩賺不賠的好機會，加我私訊了解詳情喔！")
+        evasive = SpamBurstDetector.fingerprint("您好，我是 投資顧問，最近有一個\u200b穩賺不賠的機會，加我私訊了解詳情喔")
+        other = SpamBurstDetector.fingerprint("今天天氣很好，我們週末要不要一起去陽明山走走看看風景呢")
+
+        assert len(base) == BAND_COUNT
+        assert set(base) & set(edited)
+        assert base == evasive
+        assert not set(base) & set(other)
+
+    def test_short_messages_ignored(self):
+        """測試：短句（打招呼）不列入偵測"""
+        assert SpamBurstDetector.fingerprint("嗨，你好呀！") is None
+
+
+@pytest.fixture
+def detector_deps():
+    """隔離信任分數與審核日誌"""
+    with patch(
+        "app.services.spam_burst.TrustScoreService.adjust_score", new_callable=AsyncMock
+    ) as adjust, patch(
+        "app.services.spam_burst.moderation_log_writer.log", new_callable=AsyncMock
+    ) as log:
+        yield adjust, log
+
+
+@pytest.mark.asyncio
+class TestSpamBurstDetector:
+    """滑動窗口群發偵測測試"""
+
+    async def test_flags_once_when_threshold_reached(self, detector_deps):
+        """測試：相似內容發送到門檻數的配對時扣分一次，之後同窗口不重複扣分"""
+        adjust, log = detector_deps
+        redis = _FakeRedis()
+        sender_id = uuid.uuid4()
+        threshold = settings.SPAM_BURST_MATCH_THRESHOLD
+
+        flags = [
+            await SpamBurstDetector.check_message(redis, None, sender_id, uuid.uuid4(), SCAM)
+            for _ in range(threshold + 3)
+        ]
+
+        assert flags == [False] * (threshold - 1) + [True] + [False] * 3
+        adjust.assert_awaited_once()
+        assert adjust.await_args.args[2] == "spam_burst"
+        assert log.await_args.kwargs["violations"] == [f"SPAM_BURST: 相似內容發送至 {threshold} 個配對"]
+
+    async def test_same_match_counted_once(self, detector_deps):
+        """測試：在同一配對重複發送只算一個配對"""
+        adjust, _ = detector_deps
+        redis = _FakeRedis()
+        sender_id, match_id = uuid.uuid4(), uuid.uuid4()
+
+        for _ in range(settings.SPAM_BURST_MATCH_THRESHOLD * 2):
+            await SpamBurstDetector.check_message(redis, None, sender_id, match_id, SCAM)
+
+        assert await SpamBurstDetector.record_message(redis, sender_id, match_id, SCAM) == 1
+        adjust.assert_not_awaited()
+
+    async def test_old_messages_leave_window(self, detector_deps):
+        """測試：超出滑動窗口的發送紀錄不再計入"""
+        redis = _FakeRedis()
+        sender_id = uuid.uuid4()
+
+        with patch("app.services.spam_burst.time.time", return_value=1_000.0):
+            for _ in range(3):
+                await SpamBurstDetector.record_message(redis, sender_id, uuid.uuid4(), SCAM)
+
+        later = 1_000.0 + settings.SPAM_BURST_WINDOW_SECONDS + 1
+        with patch("app.services.spam_burst.time.time", return_value=later):
+            assert await SpamBurstDetector.record_message(redis, sender_id, uuid.uuid4(), SCAM) == 1
+
+    async def test_senders_tracked_separately(self, detector_deps):
+        """測試：不同用戶發送相同內容各自計算"""
+        redis = _FakeRedis()
+
+        for _ in range(3):
+            await SpamBurstDetector.record_message(redis, uuid.uuid4(), uuid.uuid4(), SCAM)
+
+        assert await SpamBurstDetector.record_message(redis, uuid.uuid4(), uuid.uuid4(), SCAM) == 1
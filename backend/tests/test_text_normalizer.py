@@ -0,0 +1,91 @@
+"""審核用文字正規化測試"""
+import pytest
+
+from app.services.text_normalizer import (
+    normalize_pattern, normalize_text, normalize_with_offsets, original_span, replace_spans
+)
+
+
+class TestNormalizeText:
+    """normalize_text 測試"""
+
+    @pytest.mark.parametrize("raw, expected", [
+        ("ｌｉｎｅ：ａｂｃ", "line:abc"),  # 全形
+        ("sc​am﻿", "scam"),  # 零寬字元
+        ("ѕсаm", "scam"),  # 西里爾形近字
+        ("s̶c̶a̶m", "scam"),  # 組合符號
+        ("诈骗", "詐騙"),  # 簡體
+        ("詐 騙 集團", "詐騙集團"),  # CJK 間空白
+        ("l i n e id 1234", "line id 1234"),  # 空白拆字
+        ("a\t\n  b", "a b"),  # 空白合併
+        ("𝐥𝐢𝐧𝐞 𝐈𝐃", "line id"),  # BMP 以外的數學字母
+    ])
+    def test_evasions_folded(self, raw, expected):
+        """測試：常見規避寫法折疊為同一形式"""
+        assert normalize_text(raw) == expected
+
+    def test_ordinary_text_only_lowercased(self):
+        """測試：一般文字除小寫外不變"""
+        assert normalize_text("I am OK, 你好嗎?") == "i am ok, 你好嗎?"
+
+
+class TestNormalizeWithOffsets:
+    """normalize_with_offsets 測試"""
+
+    @pytest.mark.parametrize("raw", [
+        "ｌｉｎｅ：ａｂｃ",
+        "加我 l i n e 詐 騙  ok",
+        "sc​am ﬁne ①",
+        "加 𝐥 𝐢 𝐧 𝐞 🅻🅸🅽🅴",
+        "",
+    ])
+    def test_same_as_normalize_text(self, raw):
+        """測試：正規化結果與 normalize_text 相同，位置對照長度一致"""
+        normalized, offsets = normalize_with_offsets(raw)
+
+        assert normalized == normalize_text(raw)
+        assert len(offsets) == len(normalized)
+
+    def test_offsets_point_into_original(self):
+        """測試：位置對照可還原原文範圍"""
+        raw = "加我 ｌ i n e 好嗎"
+        normalized, offsets = normalize_with_offsets(raw)
+
+        start = normalized.index("line")
+        end = start + len("line") - 1
+        assert raw[offsets[start]:offsets[end] + 1] == "ｌ i n e"
+
+
+class TestNormalizePattern:
+    """normalize_pattern 測試"""
+
+    @pytest.mark.parametrize("raw, expected", [
+        ("后门.*", "後門.*"),  # 簡體
+        (r"ＬＩＮＥ\d+", r"line\d+"),  # 全形，跳脫序列保留
+        (r"（\d+）", r"\(\d+\)"),  # 全形括號折疊為字面括號
+        (r"[Ａ-Ｚ]\s", r"[a-z]\s"),
+    ])
+    def test_literal_runs_folded(self, raw, expected):
+        """測試：正則中的非 ASCII 字元與內容以同一方式折疊"""
+        assert normalize_pattern(raw) == expected
+
+
+class TestReplaceSpans:
+    """replace_spans 測試"""
+
+    def test_overlapping_spans_merged(self):
+        """測試：重疊範圍合併，使用最長範圍的替換文字"""
+        assert replace_spans("abc def", [(0, 2, "*"), (1, 3, "*"), (4, 7, "#")]) == "* #"
+        assert replace_spans("abc def", [(0, 7, "[all]"), (1, 2, "*")]) == "[all]"
+
+    def test_span_mapped_back_to_original(self):
+        """測試：正規化文字上的範圍對回原文（含被移除的字元）"""
+        raw = "加 l \u200bi n e 好"
+        normalized, offsets = normalize_with_offsets(raw)
+        start = normalized.index("line")
+
+        assert raw[slice(*original_span(offsets, start, start + 4))] == "l \u200bi n e"
+
+    def test_no_spans_returns_original(self):
+        """測試：沒有範圍時回傳原文"""
+        assert replace_spans("原文", []) == "原文"
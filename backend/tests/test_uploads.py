@@ -0,0 +1,158 @@
+"""上傳檔案路由測試（快取標頭、ETag、Range）"""
+import hashlib
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.api import uploads
+from app.core.config import settings
+from app.services.file_storage import FileStorageService
+from app.services.storage_backends import LocalStorageBackend
+
+CONTENT = bytes(range(256)) * 40  # 10240 bytes
+ETAG = f'"{hashlib.sha256(CONTENT).hexdigest()}"'
+
+
+@pytest.fixture
+def upload_root():
+    """建立臨時上傳目錄與一張照片"""
+    temp_dir = tempfile.mkdtemp()
+    photo_path = Path(temp_dir) / "photos" / "user-1" / "photo.jpg"
+    photo_path.parent.mkdir(parents=True)
+    photo_path.write_bytes(CONTENT)
+    # 不對外提供的內容物件與處理結果快取
+    for hidden in ("objects/ab/cd/abcd.jpg", "derived/ab/manifest.json"):
+        hidden_path = Path(temp_dir) / hidden
+        hidden_path.parent.mkdir(parents=True)
+        hidden_path.write_bytes(CONTENT)
+    yield temp_dir
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+@pytest.fixture
+async def uploads_client(upload_root):
+    """只掛載上傳檔案路由的測試客戶端"""
+    app = FastAPI()
+    app.include_router(uploads.router)
+    service = FileStorageService(backend=LocalStorageBackend(upload_root))
+    with patch("app.api.uploads.file_storage", service):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+
+
+class TestServeUpload:
+    """上傳檔案路由測試"""
+
+    @pytest.mark.asyncio
+    async def test_serves_file_with_immutable_cache(self, uploads_client):
+        """測試：回傳檔案內容、immutable 快取與內容雜湊 ETag"""
+        response = await uploads_client.get("/uploads/photos/user-1/photo.jpg")
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+        assert response.headers["content-type"] == "image/jpeg"
+        assert "immutable" in response.headers["cache-control"]
+        assert response.headers["etag"] == ETAG
+        assert response.headers["accept-ranges"] == "bytes"
+
+    @pytest.mark.asyncio
+    async def test_if_none_match_returns_304(self, uploads_client):
+        """測試：ETag 相符時回傳 304"""
+        response = await uploads_client.get(
+            "/uploads/photos/user-1/photo.jpg", headers={"If-None-Match": f"W/{ETAG}"}
+        )
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    @pytest.mark.asyncio
+    async def test_range_request(self, uploads_client):
+        """測試：Range 請求回傳 206 與部分內容"""
+        response = await uploads_client.get(
+            "/uploads/photos/user-1/photo.jpg", headers={"Range": "bytes=100-199"}
+        )
+
+        assert response.status_code == 206
+        assert response.content == CONTENT[100:200]
+        assert response.headers["content-range"] == f"bytes 100-199/{len(CONTENT)}"
+
+    @pytest.mark.asyncio
+    async def test_suffix_range_request(self, uploads_client):
+        """測試：後綴 Range 回傳最後 N bytes"""
+        response = await uploads_client.get(
+            "/uploads/photos/user-1/photo.jpg", headers={"Range": "bytes=-10"}
+        )
+
+        assert response.status_code == 206
+        assert response.content == CONTENT[-10:]
+
+    @pytest.mark.asyncio
+    async def test_unsatisfiable_range_returns_416(self, uploads_client):
+        """測試：超出檔案大小的 Range 回傳 416"""
+        response = await uploads_client.get(
+            "/uploads/photos/user-1/photo.jpg", headers={"Range": f"bytes={len(CONTENT)}-"}
+        )
+
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+    @pytest.mark.asyncio
+    async def test_invalid_range_returns_full_content(self, uploads_client):
+        """測試：格式無效的 Range（結尾小於起點）依 RFC 9110 忽略，回傳完整內容"""
+        for value in ("bytes=5-3", "bytes=abc-", "bytes=--5"):
+            response = await uploads_client.get(
+                "/uploads/photos/user-1/photo.jpg", headers={"Range": value}
+            )
+
+            assert response.status_code == 200, value
+            assert response.content == CONTENT
+
+    @pytest.mark.asyncio
+    async def test_stale_if_range_returns_full_content(self, uploads_client):
+        """測試：If-Range 不符時忽略 Range，回傳完整內容"""
+        response = await uploads_client.get(
+            "/uploads/photos/user-1/photo.jpg",
+            headers={"Range": "bytes=0-9", "If-Range": '"stale"'},
+        )
+
+        assert response.status_code == 200
+        assert response.content == CONTENT
+
+    @pytest.mark.asyncio
+    async def test_head_request(self, uploads_client):
+        """測試：HEAD 只回傳標頭"""
+        response = await uploads_client.head("/uploads/photos/user-1/photo.jpg")
+
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers["content-length"] == str(len(CONTENT))
+
+    @pytest.mark.asyncio
+    async def test_rejects_non_public_and_missing_paths(self, uploads_client):
+        """測試：內容物件、跳出目錄與不存在的路徑回傳 404"""
+        for path in (
+            "/uploads/objects/ab/cd/abcd.jpg",
+            "/uploads/photos/../../etc/passwd",
+            "/uploads/photos/%2E%2E/derived/ab/manifest.json",
+            "/uploads/photos/%2E%2E/objects/ab/cd/abcd.jpg",
+            "/uploads/photos/user-1/missing.jpg",
+            "/uploads/photos/user-1",
+        ):
+            response = await uploads_client.get(path)
+            assert response.status_code == 404, path
+
+    @pytest.mark.asyncio
+    async def test_accel_redirect(self, uploads_client):
+        """測試：設定 UPLOADS_ACCEL_REDIRECT_PREFIX 時交由前端代理傳送"""
+        with patch.object(settings, "UPLOADS_ACCEL_REDIRECT_PREFIX", "/_uploads/"):
+            response = await uploads_client.get("/uploads/photos/user-1/photo.jpg")
+
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers["x-accel-redirect"] == "/_uploads/photos/user-1/photo.jpg"
+        assert response.headers["etag"] == ETAG
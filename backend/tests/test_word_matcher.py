@@ -0,0 +1,234 @@
+"""敏感詞比對器測試（Aho–Corasick、合併正則、行程內快取）"""
+import random
+import re
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services.content_moderation import ContentModerationService
+from app.services.text_normalizer import normalize_text
+from app.services.word_matcher import AhoCorasick, SensitiveWordMatcher
+
+
+def _word(word: str, is_regex: bool = False) -> dict:
+    return {
+        "id": "00000000-0000-0000-0000-000000000000",
+        "word": word,
+        "category": "TEST",
+        "severity": "LOW",
+        "action": "WARN",
+        "is_regex": is_regex,
+        "description": None,
+    }
+
+
+class TestAhoCorasick:
+    """Aho–Corasick 自動機測試"""
+
+    def test_overlapping_keywords(self):
+        """測試：重疊與互為後綴的關鍵字都能找到"""
+        automaton = AhoCorasick(["he", "she", "his", "hers"])
+
+        assert automaton.search("ushers") == {0, 1, 3}
+        assert automaton.search("this") == {2}
+        assert automaton.search("nothing") == set()
+
+    def test_matches_substring_search(self):
+        """測試：結果與逐詞 in 比對一致（含中文）"""
+        rng = random.Random(7)
+        alphabet = "ab詐騙賭博色"
+        keywords = [
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+            for _ in range(200)
+        ]
+        automaton = AhoCorasick(keywords)
+
+        for _ in range(200):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+            expected = {i for i, keyword in enumerate(keywords) if keyword in text}
+            assert automaton.search(text) == expected
+
+    def test_spans_include_overlaps(self):
+        """測試：spans 回傳每次出現的位置（含重疊）"""
+        automaton = AhoCorasick(["he", "she", "hers"])
+
+        assert sorted(automaton.spans("ushers")) == [(1, 4), (2, 4), (2, 6)]
+
+    def test_empty_keyword_ignored(self):
+        """測試：空字串關鍵字不會匹配"""
+        assert AhoCorasick([""]).search("anything") == set()
+
+
+class TestSensitiveWordMatcher:
+    """敏感詞比對器測試"""
+
+    def test_literal_and_regex_in_list_order(self):
+        """測試：一般詞與正則詞皆可匹配，結果依列表順序"""
+        matcher = SensitiveWordMatcher([
+            _word(r"\d{4}-\d{4}", is_regex=True),
+            _word("詐騙"),
+            _word("scam"),
+        ])
+
+        assert matcher.match(normalize_text("這是詐騙 call 0912-3456")) == [0, 1]
+        assert matcher.match(normalize_text("SCAM")) == [2]
+        assert matcher.match(normalize_text("hello")) == []
+
+    def test_literal_words_normalized(self):
+        """測試：敏感詞與內容經同一正規化，規避寫法仍可匹配"""
+        matcher = SensitiveWordMatcher([_word("詐騙"), _word("LINE")])
+
+        assert matcher.match(normalize_text("诈 骗")) == [0]
+        assert matcher.match(normalize_text("加ｌ\u200bｉｎｅ")) == [1]
+
+    def test_regex_words_normalized(self):
+        """測試：正則詞中的簡體、全形字元與內容一同折疊"""
+        matcher = SensitiveWordMatcher([
+            _word("后门.*", is_regex=True),
+            _word(r"ＬＩＮＥ\d+", is_regex=True),
+        ])
+
+        assert matcher.match(normalize_text("這裡有后门程式")) == [0]
+        assert matcher.match(normalize_text("加 LINE123")) == [1]
+        assert matcher.match(normalize_text("ｌｉｎｅ９９")) == [1]
+
+    def test_all_matching_regexes_reported(self):
+        """測試：多個正則在同一位置匹配時全部回報"""
+        matcher = SensitiveWordMatcher([
+            _word(r"free\s+money", is_regex=True),
+            _word(r"free", is_regex=True),
+        ])
+
+        assert matcher.match(normalize_text("Free money!")) == [0, 1]
+
+    def test_backreference_and_invalid_regex(self):
+        """測試：含反向參照的正則單獨比對，無效正則略過"""
+        matcher = SensitiveWordMatcher([
+            _word(r"(\w)\1{3}", is_regex=True),
+            _word(r"([", is_regex=True),
+            _word(r"win", is_regex=True),
+        ])
+
+        assert matcher.match(normalize_text("aaaa")) == [0]
+        assert matcher.match(normalize_text("you win")) == [2]
+
+    def test_spans_for_literal_and_regex(self):
+        """測試：spans 涵蓋一般詞與正則詞的所有出現位置"""
+        matcher = SensitiveWordMatcher([_word("詐騙"), _word(r"\d{4}", is_regex=True)])
+
+        assert sorted(matcher.spans("詐騙 1234 詐騙")) == [(0, 2), (3, 7), (8, 10)]
+
+
+@pytest.fixture
+def matcher_state():
+    """隔離 ContentModerationService 的比對器與 Redis 狀態"""
+    redis = AsyncMock()
+    redis.get.return_value = b"1"
+    loader = AsyncMock(return_value=[_word("詐騙")])
+    with patch.multiple(
+        ContentModerationService,
+        _redis=redis,
+        _use_redis=True,
+        _matcher=None,
+        _matcher_version=None,
+        _matcher_built_at=0.0,
+        _matcher_checked_at=0.0,
+        _load_sensitive_words=loader,
+    ):
+        yield redis, loader
+
+
+class TestMatcherCache:
+    """行程內比對器快取與版本失效測試"""
+
+    @pytest.mark.asyncio
+    async def test_steady_state_needs_no_network(self, matcher_state):
+        """測試：輪詢間隔內重複取得比對器不呼叫 Redis"""
+        redis, loader = matcher_state
+
+        first = await ContentModerationService._get_matcher(db=None)
+        for _ in range(10):
+            assert await ContentModerationService._get_matcher(db=None) is first
+
+        assert redis.get.await_count == 1
+        assert loader.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_version_bump_triggers_rebuild(self, matcher_state):
+        """測試：版本號改變後重新載入並編譯"""
+        redis, loader = matcher_state
+
+        with patch.object(ContentModerationService, "_version_poll_interval", 0):
+            first = await ContentModerationService._get_matcher(db=None)
+            assert await ContentModerationService._get_matcher(db=None) is first
+            assert loader.await_count == 1
+
+            redis.get.return_value = b"2"
+            loader.return_value = [_word("賭博")]
+            second = await ContentModerationService._get_matcher(db=None)
+
+        assert second is not first
+        assert second.match("賭博") == [0]
+
+    @pytest.mark.asyncio
+    async def test_clear_cache_bumps_version(self, matcher_state):
+        """測試：clear_cache 遞增 Redis 版本號並丟棄本行程比對器"""
+        redis, _ = matcher_state
+        await ContentModerationService._get_matcher(db=None)
+
+        await ContentModerationService.clear_cache()
+
+        redis.incr.assert_awaited_once_with("moderation:words:version")
+        assert ContentModerationService._matcher is None
+
+
+class TestSanitize:
+    """以比對器遮蔽內容測試"""
+
+    @pytest.mark.asyncio
+    async def test_masks_evasions_in_original_text(self, matcher_state):
+        """測試：規避寫法也被遮蔽，其餘原文保持不變"""
+        sanitized = await ContentModerationService.sanitize_content("Hi 诈 骗！和詐騙", db=None)
+
+        assert sanitized == "Hi ***！和***"
+
+    @pytest.mark.asyncio
+    async def test_link_covers_words_inside(self, matcher_state):
+        """測試：連結整段替換，涵蓋其中的敏感詞"""
+        sanitized = await ContentModerationService.sanitize_content(
+            "看 HTTP://x.com/詐騙 這個", db=None
+        )
+
+        assert sanitized == "看 [已移除連結] 這個"
+
+
+class TestSuspiciousScanner:
+    """合併可疑模式掃描測試"""
+
+    def test_reports_every_category(self):
+        """測試：一次掃描回報所有命中的模式，依模式順序"""
+        hits = ContentModerationService._find_suspicious_patterns(
+            "加我 wechat: abc，或 line：xyz，匯款 nt$500 到 0912345678 https://x.com"
+        )
+
+        assert hits == [0, 1, 2, 3, 4]
+        assert ContentModerationService._find_suspicious_patterns("晚安，明天見") == []
+
+    def test_overlapping_matches_found(self):
+        """測試：被其他模式匹配範圍涵蓋的模式也會回報"""
+        hits = ContentModerationService._find_suspicious_patterns("https://line.me/line:abc")
+
+        assert hits == [1, 3]
+
+    def test_matches_per_pattern_search(self):
+        """測試：結果與逐一模式比對一致"""
+        rng = random.Random(11)
+        pieces = ["line", "LINE:", "wechat ", "http://", "https://a", "$", "NT", "US", "USD",
+                  "0912345678", "12345678901234567", " ", "：", "a", "9", "詐", "\n"]
+        for _ in range(500):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            expected = [
+                i for i, pattern in enumerate(ContentModerationService.SUSPICIOUS_PATTERNS)
+                if re.search(pattern, text, re.IGNORECASE)
+            ]
+            assert ContentModerationService._find_suspicious_patterns(text) == expected, text
@@ -84,6 +84,11 @@ export const useNotificationStore = defineStore('notification', () => {
       createdAt: new Date()
     }
 
+    // 合併通知（相同 ID）：移除舊的一筆，以最新內容插入到列表開頭
+    if (notification.id) {
+      notifications.value = notifications.value.filter(n => n.id !== notification.id)
+    }
+
     // 插入到列表開頭
     notifications.value.unshift(newNotification)
 
@@ -165,11 +170,17 @@ export const useNotificationStore = defineStore('notification', () => {
   const handleLikedNotification = (data) => {
     logger.debug('[Notification] Received notification_liked:', data)
 
+    // 熱門用戶的 Like 會由後端合併，group_count 為合併的人數
+    const count = data.group_count || 1
+
     addNotification({
       id: data.notification_id,  // 使用資料庫通知 ID
       type: NotificationType.SOMEONE_LIKED_YOU,
-      title: '有人喜歡你',
-      content: '有人對你表示好感，快去探索看看吧！',
+      title: count > 1 ? `${count} 人喜歡你` : '有人喜歡你',
+      content: count > 1
+        ? `有 ${count} 個人對你表示好感，快去探索看看吧！`
+        : '有人對你表示好感，快去探索看看吧！',
+      groupCount: count,
       data: {},  // 不透露是誰喜歡，保持神秘感
       timestamp: data.timestamp,
       fromAPI: !!data.notification_id  // 有資料庫 ID 則標記為 API 來源
@@ -280,17 +291,19 @@ export const useNotificationStore = defineStore('notification', () => {
    * 從 API 載入通知
    * @param {object} options - 查詢選項
    * @param {number} options.limit - 每頁數量（預設 20）
-   * @param {number} options.offset - 偏移量（預設 0）
+   * @param {string|null} options.cursor - 分頁游標（上次回應的 next_cursor，預設 null 表示第一頁）
    * @param {boolean} options.unreadOnly - 只取未讀（預設 false）
    */
   const fetchNotifications = async (options = {}) => {
-    const { limit = 20, offset = 0, unreadOnly = false } = options
+    const { limit = 20, cursor = null, unreadOnly = false } = options
 
     loading.value = true
     try {
       const params = new URLSearchParams()
       params.append('limit', limit)
-      params.append('offset', offset)
+      // 使用 cursor 分頁，不需要總數
+      params.append('include_total', 'false')
+      if (cursor) params.append('cursor', cursor)
       if (unreadOnly) params.append('unread_only', 'true')
 
       const response = await apiClient.get(`/notifications?${params.toString()}`)
@@ -303,6 +316,7 @@ export const useNotificationStore = defineStore('notification', () => {
         title: n.title,
         content: n.content,
         data: n.data || {},
+        groupCount: n.group_count || 1,
         read: n.is_read,
         createdAt: new Date(n.created_at),
         // 用於區分 API 載入的通知和 WebSocket 即時通知
@@ -310,13 +324,13 @@ export const useNotificationStore = defineStore('notification', () => {
       }))
 
       // 如果是第一頁，覆蓋現有通知；否則追加
-      if (offset === 0) {
+      if (!cursor) {
         notifications.value = apiNotifications
       } else {
         notifications.value = [...notifications.value, ...apiNotifications]
       }
 
-      logger.debug('[Notification] Fetched from API:', apiNotifications.length, 'total:', data.total)
+      logger.debug('[Notification] Fetched from API:', apiNotifications.length, 'has_more:', data.has_more)
       return data
     } catch (error) {
       logger.error('[Notification] Failed to fetch:', error)